@@ -4,6 +4,7 @@ using Supabase.Postgrest.Responses;
 using api.models;
 using api.contracts;
 using api.services;
+using api.services.mqtt;
 
 [ApiController]
 [Route("[controller]")]
@@ -11,11 +12,13 @@ using api.services;
 public class AuthorisedCardController : ControllerBase
 {
     private readonly CardLookupService _cardService;
+    private readonly AllowlistPublisher _allowlistPublisher;
 
     // Constructor injection - ASP.NET Core DI container provides the service
-    public AuthorisedCardController(CardLookupService cardService)
+    public AuthorisedCardController(CardLookupService cardService, AllowlistPublisher allowlistPublisher)
     {
         _cardService = cardService;
+        _allowlistPublisher = allowlistPublisher;
     }
 
     [HttpPost]
@@ -27,9 +30,45 @@ public class AuthorisedCardController : ControllerBase
         AuthorisedCardsModel authorisedCard = new AuthorisedCardsModel(request);
         ModeledResponse<AuthorisedCardsModel> response = await client.From<AuthorisedCardsModel>().Insert(authorisedCard);
         AuthorisedCardsModel newAuthorisedCard = response.Models.First();
+
+        // Push the updated allowlist to the device cache
+        await _allowlistPublisher.PublishAsync();
         return Ok(newAuthorisedCard);
     }
 
+    // PUT by internal database ID (UUID) - e.g. set isActive = false to revoke a card
+    [HttpPut("{id:guid}")]
+    public async Task<IActionResult> OnPutAsync(
+        Guid id,
+        [FromBody] AuthorisedCardsRequest request,
+        [FromServices] Client client
+    )
+    {
+        AuthorisedCardsModel? authorisedCard = await _cardService.GetByIdAsync(id);
+        if (authorisedCard is null) return NotFound();
+
+        authorisedCard.CardId = request.CardId;
+        authorisedCard.UserId = request.UserId;
+        authorisedCard.IsActive = request.IsActive;
+        ModeledResponse<AuthorisedCardsModel> response = await client.From<AuthorisedCardsModel>().Update(authorisedCard);
+
+        // Revocations must reach the device cache too, or a disabled card keeps opening the door offline
+        await _allowlistPublisher.PublishAsync();
+        return Ok(response.Models.FirstOrDefault() ?? authorisedCard);
+    }
+
+    [HttpDelete("{id:guid}")]
+    public async Task<IActionResult> OnDeleteAsync(Guid id, [FromServices] Client client)
+    {
+        AuthorisedCardsModel? authorisedCard = await _cardService.GetByIdAsync(id);
+        if (authorisedCard is null) return NotFound();
+
+        await client.From<AuthorisedCardsModel>().Where(x => x.Id == id).Delete();
+
+        await _allowlistPublisher.PublishAsync();
+        return NoContent();
+    }
+
     // GET by internal database ID (UUID)
     [HttpGet("{id:guid}")]
     public async Task<IActionResult> GetByIdAsync(Guid id)
@@ -68,6 +68,7 @@ internal static class Program
 
         // Register MQTT publisher (shared by handlers)
         builder.Services.AddSingleton<api.services.mqtt.MqttPublisher>();
+        builder.Services.AddSingleton<api.services.mqtt.AllowlistPublisher>();
 
         // Register background services
         builder.Services.AddHostedService<api.services.mqtt.MqttBackgroundService>();
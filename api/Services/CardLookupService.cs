@@ -48,6 +48,20 @@ public class CardLookupService
         return response.Models.FirstOrDefault();
     }
 
+    /// <summary>
+    /// Get the card_id of every active card (used to build the device allowlist)
+    /// </summary>
+    /// <returns>List of RFID card identifiers with is_active = true</returns>
+    public async Task<List<string>> GetActiveCardIdsAsync()
+    {
+        ModeledResponse<AuthorisedCardsModel> response = await _supabase
+            .From<AuthorisedCardsModel>()
+            .Where(x => x.IsActive == true)
+            .Get();
+
+        return response.Models.Select(x => x.CardId).ToList();
+    }
+
     /// <summary>
     /// Check if a card is valid for access control.
     /// A card is valid if it exists AND is_active = true.
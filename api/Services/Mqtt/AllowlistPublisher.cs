@@ -0,0 +1,92 @@
+using System.Text;
+using System.Text.Json;
+
+namespace api.services.mqtt;
+
+/// <summary>
+/// Publishes the authorised-card allowlist to the ESP32 as a retained MQTT message.
+/// Pattern: devices/{deviceId}/rfid/allowlist
+///
+/// The device caches the list in flash and opens the door immediately on a hit, without
+/// waiting for the rfid/check round trip. Only 64-bit FNV-1a hashes of card IDs are sent -
+/// 64 bits so a hash collision cannot realistically let an unlisted card in.
+/// Published on broker connect, whenever a card is added, updated or deleted, and every
+/// AllowlistRefreshMinutes so changes made straight in the database still reach the device.
+/// </summary>
+public class AllowlistPublisher
+{
+    private readonly IServiceScopeFactory _scopeFactory;
+    private readonly MqttPublisher _mqttPublisher;
+    private readonly ILogger<AllowlistPublisher> _logger;
+    private readonly IConfiguration _configuration;
+    private long _lastVersion;
+
+    public AllowlistPublisher(
+        IServiceScopeFactory scopeFactory,
+        MqttPublisher mqttPublisher,
+        ILogger<AllowlistPublisher> logger,
+        IConfiguration configuration)
+    {
+        _scopeFactory = scopeFactory;
+        _mqttPublisher = mqttPublisher;
+        _logger = logger;
+        _configuration = configuration;
+    }
+
+    /// <summary>
+    /// FNV-1a 64-bit hash of a card ID. Must match card_hash() in esp32/utils/card_cache.py.
+    /// </summary>
+    public static ulong CardHash(string cardId)
+    {
+        ulong hash = 0xCBF29CE484222325;
+        foreach (byte b in Encoding.UTF8.GetBytes(cardId))
+        {
+            hash ^= b;
+            hash = unchecked(hash * 0x100000001B3);
+        }
+        return hash;
+    }
+
+    /// <summary>
+    /// Next allowlist version: Unix milliseconds, bumped past the previous version so two
+    /// publishes in the same millisecond (or a clock step backwards) still strictly increase.
+    /// The device drops any version not newer than the one it holds.
+    /// </summary>
+    public long NextVersion()
+    {
+        while (true)
+        {
+            long last = Interlocked.Read(ref _lastVersion);
+            long next = Math.Max(DateTimeOffset.UtcNow.ToUnixTimeMilliseconds(), last + 1);
+            if (Interlocked.CompareExchange(ref _lastVersion, next, last) == last)
+                return next;
+        }
+    }
+
+    public async Task PublishAsync()
+    {
+        try
+        {
+            using var scope = _scopeFactory.CreateScope();
+            var cardService = scope.ServiceProvider.GetRequiredService<CardLookupService>();
+            var cardIds = await cardService.GetActiveCardIdsAsync();
+
+            var message = new
+            {
+                version = NextVersion(),
+                hashes = cardIds.Select(CardHash).Distinct().OrderBy(h => h).ToList()
+            };
+
+            var deviceId = _configuration.GetValue<string>("DeviceId") ?? "esp32_main";
+            var topic = $"devices/{deviceId}/rfid/allowlist";
+            await _mqttPublisher.PublishAsync(topic, JsonSerializer.Serialize(message), retain: true);
+
+            _logger.LogInformation("Published RFID allowlist v{Version} ({Count} cards) to {Topic}",
+                message.version, message.hashes.Count, topic);
+        }
+        catch (Exception ex)
+        {
+            _logger.LogError(ex, "Failed to publish RFID allowlist");
+        }
+    }
+}
@@ -0,0 +1,72 @@
+using System.Buffers.Binary;
+using System.Text.Json;
+
+namespace api.services.mqtt;
+
+/// <summary>
+/// Decodes the 11-byte struct frame the ESP32 sends on topics configured with PAYLOAD_CODECS = "struct".
+/// Frame layout (little-endian): magic (0xB1), kind, flags, float32 value, uint32 seconds since 2000-01-01 UTC.
+///
+/// Frames are transcoded into the same JSON the device sends in JSON mode, so SensorDataHandler,
+/// StatusUpdateHandler and the other handlers work unchanged. Tables must match esp32/comms/codec.py.
+/// </summary>
+public static class BinaryPayloadDecoder
+{
+    public const byte Magic = 0xB1;
+    public const int FrameSize = 11;
+
+    private const byte HasValue = 0x01;
+    private const byte HasDetected = 0x02;
+    private const byte Detected = 0x04;
+    private const byte BoolValue = 0x08;
+    private const byte HasState = 0x10;
+    private const int StateShift = 5;
+
+    private static readonly string[] Kinds = { "", "temperature", "humidity", "motion", "gas", "steam", "asthma_alert" };
+    private static readonly string[] States = { "closed", "open", "off", "on" };
+    private static readonly DateTimeOffset DeviceEpoch = new(2000, 1, 1, 0, 0, 0, TimeSpan.Zero);
+
+    /// <summary>
+    /// JSON payloads always start with '{', so the magic byte is enough to tell the formats apart.
+    /// </summary>
+    public static bool IsBinary(ReadOnlySpan<byte> payload)
+    {
+        return payload.Length == FrameSize && payload[0] == Magic;
+    }
+
+    public static string ToJson(ReadOnlySpan<byte> frame)
+    {
+        if (!IsBinary(frame))
+            throw new FormatException("Not a binary telemetry frame");
+
+        byte kind = frame[1];
+        byte flags = frame[2];
+        float value = BinaryPrimitives.ReadSingleLittleEndian(frame.Slice(3, 4));
+        uint seconds = BinaryPrimitives.ReadUInt32LittleEndian(frame.Slice(7, 4));
+
+        var record = new Dictionary<string, object>();
+        if (kind > 0)
+        {
+            if (kind >= Kinds.Length)
+                throw new FormatException($"Unknown sensor kind {kind}");
+            record["sensor_type"] = Kinds[kind];
+        }
+        if ((flags & HasValue) != 0 && (flags & HasState) != 0)
+            record["duty"] = (int)MathF.Round(value); // Fan status: state plus actual duty %
+        else if ((flags & HasValue) != 0)
+            record["value"] = (flags & BoolValue) != 0 ? (object)(value != 0) : value;
+        if ((flags & HasDetected) != 0)
+            record["detected"] = (flags & Detected) != 0;
+        if ((flags & HasState) != 0)
+            record["state"] = States[(flags >> StateShift) & 0x03];
+
+        // Units are implied by the sensor type on the wire
+        if (kind == 1)
+            record["unit"] = "C";
+        else if (kind == 2)
+            record["unit"] = "%";
+
+        record["timestamp"] = DeviceEpoch.AddSeconds(seconds).ToString("yyyy-MM-dd'T'HH:mm:ss'Z'");
+        return JsonSerializer.Serialize(record);
+    }
+}
@@ -1,6 +1,7 @@
 using Microsoft.Extensions.Hosting;
 using Microsoft.Extensions.Logging;
 using MQTTnet;
+using System.Buffers;
 using System.Text;
 
 namespace api.services.mqtt;
@@ -14,19 +15,23 @@ public class MqttBackgroundService : IHostedService, IDisposable
     private readonly IConfiguration _configuration;
     private readonly IEnumerable<IMqttMessageHandler> _handlers;
     private readonly MqttPublisher _mqttPublisher;
+    private readonly AllowlistPublisher _allowlistPublisher;
     private readonly ILogger<MqttBackgroundService> _logger;
     private IMqttClient? _mqttClient;
     private Timer? _reconnectTimer;
+    private Timer? _allowlistTimer;
 
     public MqttBackgroundService(
         IConfiguration configuration,
         IEnumerable<IMqttMessageHandler> handlers,
         MqttPublisher mqttPublisher,
+        AllowlistPublisher allowlistPublisher,
         ILogger<MqttBackgroundService> logger)
     {
         _configuration = configuration;
         _handlers = handlers;
         _mqttPublisher = mqttPublisher;
+        _allowlistPublisher = allowlistPublisher;
         _logger = logger;
     }
 
@@ -39,6 +44,16 @@ public class MqttBackgroundService : IHostedService, IDisposable
         _mqttClient.DisconnectedAsync += OnDisconnectedAsync;
 
         await ConnectAsync();
+
+        // Periodic republish picks up revocations that bypassed the API (e.g. edited in Supabase)
+        var refresh = TimeSpan.FromMinutes(_configuration.GetValue("AllowlistRefreshMinutes", 15));
+        _allowlistTimer = new Timer(async _ =>
+        {
+            if (_mqttClient?.IsConnected == true)
+            {
+                await _allowlistPublisher.PublishAsync();
+            }
+        }, null, refresh, refresh);
     }
 
     private async Task ConnectAsync()
@@ -76,6 +91,9 @@ public class MqttBackgroundService : IHostedService, IDisposable
 
         await _mqttClient.SubscribeAsync(subscribeOptions);
         _logger.LogInformation("📬 Subscribed to MQTT topics: devices/+/data, devices/+/rfid/check, devices/+/status/#");
+
+        // Refresh the retained allowlist so devices pick up card changes made while we were offline
+        await _allowlistPublisher.PublishAsync();
     }
 
     private async Task OnMessageReceivedAsync(MqttApplicationMessageReceivedEventArgs e)
@@ -83,7 +101,11 @@ public class MqttBackgroundService : IHostedService, IDisposable
         try
         {
             var topic = e.ApplicationMessage.Topic;
-            var payload = Encoding.UTF8.GetString(e.ApplicationMessage.Payload);
+            var raw = e.ApplicationMessage.Payload.ToArray();
+            // Struct-encoded telemetry is transcoded to JSON so handlers see one format
+            var payload = BinaryPayloadDecoder.IsBinary(raw)
+                ? BinaryPayloadDecoder.ToJson(raw)
+                : Encoding.UTF8.GetString(raw);
 
             _logger.LogInformation("📨 MQTT Message Received - Topic: {Topic}, Payload: {Payload}", topic, payload);
 
@@ -129,6 +151,7 @@ public class MqttBackgroundService : IHostedService, IDisposable
 
     public async Task StopAsync(CancellationToken cancellationToken)
     {
+        _allowlistTimer?.Change(Timeout.Infinite, Timeout.Infinite);
         if (_mqttClient != null && _mqttClient.IsConnected)
         {
             await _mqttClient.DisconnectAsync();
@@ -138,6 +161,7 @@ public class MqttBackgroundService : IHostedService, IDisposable
     public void Dispose()
     {
         _reconnectTimer?.Dispose();
+        _allowlistTimer?.Dispose();
         _mqttClient?.Dispose();
     }
 }
@@ -30,7 +30,8 @@ public class MqttPublisher
     /// </summary>
     /// <param name="topic">The MQTT topic to publish to</param>
     /// <param name="payload">The message payload (usually JSON)</param>
-    public async Task PublishAsync(string topic, string payload)
+    /// <param name="retain">Ask the broker to keep the message for future subscribers</param>
+    public async Task PublishAsync(string topic, string payload, bool retain = false)
     {
         if (_mqttClient == null || !_mqttClient.IsConnected)
         {
@@ -42,7 +43,7 @@ public class MqttPublisher
             .WithTopic(topic)
             .WithPayload(payload)
             .WithQualityOfServiceLevel(MQTTnet.Protocol.MqttQualityOfServiceLevel.AtLeastOnce)
-            .WithRetainFlag(false)
+            .WithRetainFlag(retain)
             .Build();
 
         await _mqttClient.PublishAsync(message);
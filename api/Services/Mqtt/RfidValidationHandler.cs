@@ -1,3 +1,4 @@
+using System.Globalization;
 using System.Text.Json;
 using api.models;
 using Microsoft.Extensions.Logging;
@@ -7,6 +8,9 @@ namespace api.services.mqtt;
 /// <summary>
 /// Handles RFID validation requests from ESP32 devices.
 /// Pattern: devices/{deviceId}/rfid/check
+///
+/// A scan older than RfidMaxScanAgeSeconds (e.g. one replayed after an outage) is logged
+/// but never answered, so a late "granted" cannot open the door with nobody at it.
 /// </summary>
 public class RfidValidationHandler : IMqttMessageHandler
 {
@@ -75,20 +79,47 @@ public class RfidValidationHandler : IMqttMessageHandler
         var supabase = scope.ServiceProvider.GetRequiredService<Supabase.Client>();
 
         bool isValid = await cardService.IsCardValidAsync(cardId);
+        var accessResult = isValid ? "granted" : "denied";
 
-        // Publish validation response back to ESP32
-        var response = new
+        // Device may have already decided from its cached allowlist (audit-only report)
+        string? localDecision = null;
+        if (data.TryGetValue("local_decision", out var localDecisionElement) &&
+            localDecisionElement.ValueKind == JsonValueKind.String)
         {
-            access = isValid ? "granted" : "denied",
-            card_id = cardId,
-            timestamp = DateTimeOffset.UtcNow.ToString("O")
-        };
+            localDecision = localDecisionElement.GetString();
+        }
+
+        var maxAgeSeconds = _configuration.GetValue("RfidMaxScanAgeSeconds", 30);
+        bool stale = data.TryGetValue("timestamp", out var timestampElement) &&
+            timestampElement.ValueKind == JsonValueKind.String &&
+            DateTimeOffset.TryParse(timestampElement.GetString(), CultureInfo.InvariantCulture,
+                DateTimeStyles.AssumeUniversal, out var scannedAt) &&
+            DateTimeOffset.UtcNow - scannedAt > TimeSpan.FromSeconds(maxAgeSeconds);
 
-        var responseJson = JsonSerializer.Serialize(response);
-        var responseTopic = $"devices/{deviceId}/rfid/response";
-        await _mqttPublisher.PublishAsync(responseTopic, responseJson);
+        if (localDecision == accessResult)
+        {
+            _logger.LogInformation("RFID card {CardId} already {Result} by device allowlist - no response needed", cardId, accessResult);
+        }
+        else if (stale && accessResult == "granted")
+        {
+            _logger.LogWarning("RFID scan for card {CardId} is older than {MaxAge} s - logged only, not granted", cardId, maxAgeSeconds);
+        }
+        else
+        {
+            // Publish validation response back to ESP32 (also corrects a stale device allowlist)
+            var response = new
+            {
+                access = accessResult,
+                card_id = cardId,
+                timestamp = DateTimeOffset.UtcNow.ToString("O")
+            };
+
+            var responseJson = JsonSerializer.Serialize(response);
+            var responseTopic = $"devices/{deviceId}/rfid/response";
+            await _mqttPublisher.PublishAsync(responseTopic, responseJson);
+        }
 
-        _logger.LogInformation("RFID validation for card {CardId}: {Result}", cardId, isValid ? "granted" : "denied");
+        _logger.LogInformation("RFID validation for card {CardId}: {Result}", cardId, accessResult);
 
         // Log scan to database
         try
@@ -109,7 +140,7 @@ public class RfidValidationHandler : IMqttMessageHandler
                 Id = Guid.NewGuid(),
                 DeviceId = deviceUuid,
                 CardId = cardId,
-                AccessResult = isValid ? "granted" : "denied",
+                AccessResult = accessResult,
                 AuthorisedCardId = authorisedCard?.Id,
                 Username = authorisedCard?.Username,
                 Timestamp = DateTimeOffset.UtcNow
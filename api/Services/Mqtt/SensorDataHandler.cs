@@ -10,6 +10,7 @@ namespace api.services.mqtt;
 ///
 /// Temperature/Humidity: Stores latest readings in memory for the SensorDataWriter to write to database every 30 minutes.
 /// Motion: Writes immediately to database as events occur.
+/// Binary struct frames are transcoded to this JSON shape by BinaryPayloadDecoder before they arrive here.
 /// </summary>
 public class SensorDataHandler : IMqttMessageHandler
 {
@@ -5,6 +5,7 @@ namespace api.services.mqtt;
 /// Pattern: devices/{deviceId}/status/{output}
 ///
 /// Currently just logs status changes - could be extended to track device state in future.
+/// Binary struct frames are transcoded to {"state", "timestamp"} JSON by BinaryPayloadDecoder before they arrive here.
 /// </summary>
 public class StatusUpdateHandler : IMqttMessageHandler
 {
@@ -4,7 +4,16 @@ from utils.memory import Memory
 class SmartHomeApp:
     def __init__(self):
         self.memory = Memory()
-        from config import TOPIC_RFID_RESPONSE, TOPIC_CONTROL_DOOR, TOPIC_CONTROL_WINDOW, TOPIC_CONTROL_FAN, TOPIC_REQUEST_STATUS
+        from utils.devices import DeviceRegistry, register_defaults
+
+        # Single owner of every driver - handlers borrow from here instead of re-creating them
+        self.devices = register_defaults(DeviceRegistry())
+        self.devices.preload('pir', 'gas', 'button_gas', 'button_pir')
+        import config
+        from config import DEVICE_ID, TOPIC_RFID_RESPONSE, TOPIC_CONTROL_DOOR, TOPIC_CONTROL_WINDOW, TOPIC_CONTROL_FAN, TOPIC_REQUEST_STATUS
+        # Newer topics fall back to the standard layout so older config.py files still boot
+        TOPIC_RFID_ALLOWLIST = getattr(config, 'TOPIC_RFID_ALLOWLIST', f"devices/{DEVICE_ID}/rfid/allowlist")
+        TOPIC_CONTROL_ALL = getattr(config, 'TOPIC_CONTROL_ALL', f"devices/{DEVICE_ID}/control/+")
         from handlers.control_handler import ControlHandler
         from outputs.rgb import RGBManager
         from outputs.oled import OLEDManager
@@ -12,58 +21,59 @@ class SmartHomeApp:
         from outputs.servo import WindowServoManager
         from outputs.buzzer import BuzzerManager
         from outputs.fan import FanManager
+        from outputs.power import get_power
 
         self.rgb_manager = RGBManager()
-        self.oled_manager = OLEDManager()
+        self.oled_manager = OLEDManager(self.devices.get('oled'))
         self.door_servo_manager = DoorServoManager()
         self.window_servo_manager = WindowServoManager()
         self.buzzer_manager = BuzzerManager()
         self.fan_manager = FanManager()
+        self.power = get_power()    # PWM channels of every actuator above
 
         # Create environment handler early for status requests
         from handlers.environment_handler import EnvironmentHandler
-        self.environment = EnvironmentHandler()
+        self.environment = EnvironmentHandler(self.devices)
 
-        from outputs.oled import OLED
-        oled = OLED()
+        oled = self.devices.get('oled')
         oled.show_text("MQTT Broker", "Connecting...")
 
         # Create persistent MQTT connection (can't be deleted)
         from comms.mqtt_client import SmartHomeMQTTClient
         self.mqtt = SmartHomeMQTTClient()
 
-        max_retries = 3
-        for attempt in range(max_retries):
-            if self.mqtt.connect():
-                oled.show_text("MQTT Broker", "Connected")
-                time.sleep(1)
-                break
-            else:
-                print(f"MQTT connection attempt {attempt + 1}/{max_retries} failed")
-                if attempt < max_retries - 1:
-                    oled.show_text("MQTT Retry", f"Attempt {attempt + 2}/{max_retries}")
-                    time.sleep(2)
-                else:
-                    oled.show_text("MQTT FAILED", "System halted")
-                    time.sleep(3)
-                    raise RuntimeError("MQTT connection failed after all retries - system cannot operate without broker")
-
-        # Give door servo manager access to MQTT for auto-close status updates
-        self.door_servo_manager.set_mqtt(self.mqtt)
+        # One attempt here - if the broker is down, local automations still start and
+        # the 'mqtt_supervisor' job keeps retrying with backoff
+        if self.mqtt.connect():
+            oled.show_text("MQTT Broker", "Connected")
+        else:
+            oled.show_text("MQTT Offline", "Retrying...")
+        time.sleep(1)
+
+        # Local allowlist for instant door decisions (loaded from flash, refreshed over MQTT)
+        from utils.card_cache import CardCache
+        self.card_cache = CardCache()
+
+        # Give door servo manager access to MQTT - it publishes door status when each move completes
+        self.door_servo_manager.set_mqtt(self.mqtt, self.devices.get('codec'))
+        self.fan_manager.set_mqtt(self.mqtt, self.devices.get('codec'))
 
         self.control = ControlHandler(self.rgb_manager, self.oled_manager, self.door_servo_manager, self.window_servo_manager, self.buzzer_manager, self.fan_manager)
-        # Give control handler access to MQTT for publishing door status on RFID access
-        self.control.set_mqtt(self.mqtt)
+        # Give control handler access to MQTT for status messages
+        self.control.set_mqtt(self.mqtt, self.devices.get('codec'))
 
-        # Subscribe to MQTT topics with control handler methods as callbacks
+        # Subscribe to MQTT topics with control handler methods as callbacks.
+        # One wildcard SUBSCRIBE covers every control topic - the router splits them locally
+        self.mqtt.subscribe_filter(TOPIC_CONTROL_ALL)
         self.mqtt.subscribe(TOPIC_RFID_RESPONSE, self.control.handle_rfid_response)
+        self.mqtt.subscribe(TOPIC_RFID_ALLOWLIST, self.card_cache.handle_allowlist)
         self.mqtt.subscribe(TOPIC_CONTROL_DOOR, lambda t, m: self.control.handle_door_control(t, m, self.mqtt))
         self.mqtt.subscribe(TOPIC_CONTROL_WINDOW, lambda t, m: self.control.handle_window_control(t, m, self.mqtt))
         self.mqtt.subscribe(TOPIC_CONTROL_FAN, lambda t, m: self.control.handle_fan_control(t, m, self.mqtt))
         self.mqtt.subscribe(TOPIC_REQUEST_STATUS, lambda t, m: self.control.handle_status_request(t, m, self.mqtt, self.environment))
         self.memory.collect("After MQTT setup")
         oled.show_text("System Ready", "App Running")
-        del oled
+        self.devices.report()
 
     def run(self):
         from handlers.motion_handler import MotionHandler
@@ -72,46 +82,64 @@ class SmartHomeApp:
         from handlers.gas_handler import GasHandler
         from handlers.rfid_handler import RFIDHandler
         from handlers.button_handler import ButtonHandler
-
-        motion = MotionHandler()
-        lighting = LightingHandler()
-        steam = SteamHandler()
-        gas = GasHandler()
-        rfid = RFIDHandler()
-        button = ButtonHandler()
+        from utils.scheduler import Scheduler
+        from utils.timers import get_timers
+
+        motion = MotionHandler(self.devices)
+        lighting = LightingHandler(self.devices)
+        steam = SteamHandler(self.devices)
+        gas = GasHandler(self.devices)
+        rfid = RFIDHandler(self.devices, self.card_cache, self.control)
+        button = ButtonHandler(self.devices)
+
+        # Each job runs as its own task - periods in ms, delays stagger startup load
+        scheduler = Scheduler()
+        # Output manager timeouts (door auto-close, display/LED/buzzer durations, PWM
+        # release) are Timers - this task sleeps until the next one is due
+        timers = get_timers()
+        scheduler.service('timers', timers.run)
+        scheduler.every('outputs', 100, self._update_outputs)
+        scheduler.every('rgb', 20, self.rgb_manager.update)    # 50 fps for blink/breathe/fade effects
+        scheduler.every('servos', 20, self._update_servos)     # One motion-profile step per 50 Hz PWM period
+        scheduler.every('buzzer', 10, self.buzzer_manager.update)  # Note steps accurate to ~10 ms
+        scheduler.every('mqtt', 50, self.mqtt.check_messages)
+        scheduler.every('mqtt_supervisor', 500, self.mqtt.supervise)
+        scheduler.every('outbox', 1000, self.mqtt.flush_outbox, delay_ms=1000)
+        scheduler.every('buttons', 50, lambda: button.handle_buttons(self.oled_manager))
+        scheduler.every('rfid', 200, lambda: rfid.handle_rfid_detection(self.mqtt, self.oled_manager))
+        scheduler.every('motion', 100, lambda: motion.handle_motion_detection(self.mqtt, self.rgb_manager, self.oled_manager, button), delay_ms=2000)
+        # Gas was checked every 10 s in the old loop, leaving up to 10 s before the alarm.
+        # The sensor now queues edges from its IRQ and the idle path is a single flag
+        # test, so 100 ms costs almost nothing and bounds alarm latency to 0.1 s
+        scheduler.every('gas', 100, lambda: gas.handle_gas_detection(self.mqtt, self.rgb_manager, self.oled_manager, self.buzzer_manager, button, self.fan_manager), delay_ms=500)
+        scheduler.every('steam', 10000, lambda: steam.handle_steam_detection(self.mqtt, self.rgb_manager, self.oled_manager, self.window_servo_manager), delay_ms=10000)
+        scheduler.every('environment', 1000, lambda: self.environment.handle_environment_detection(self.mqtt, self.oled_manager))
+        scheduler.every('fan_control', 5000, lambda: self.fan_manager.control(self.environment.last_temp, self.environment.last_humidity), delay_ms=5000)
+        scheduler.every('lighting', 60000, lighting.handle_time_based_lighting, delay_ms=60000)
+        scheduler.every('memory', 1000, lambda: self.memory.policy.idle(1000), delay_ms=1000)
+        scheduler.every('memory_report', 300000, self.memory.policy.report, delay_ms=300000)
+        clock = self.devices.get('time_sync')
+        scheduler.every('ntp', 10000, clock.resync_job, delay_ms=30000)
+        scheduler.every('clock_telemetry', 300000, self._publish_clock, delay_ms=300000)
+        scheduler.every('mqtt_report', 300000, lambda: print(f"[MQTT] {self.mqtt.stats()}"), delay_ms=300000)
+        scheduler.every('power_report', 300000, lambda: print(f"[Power] {self.power.stats()}"), delay_ms=300000)
+        scheduler.every('timers_report', 300000, lambda: print(f"[TimerService] {timers.stats()}"), delay_ms=300000)
 
         print("App running...")
-        loop_count = 1  # Start at 1 to avoid startup spike (0 % n == 0 for all n)
-        while True:
-            self.rgb_manager.update()
-            self.oled_manager.update()
-            self.door_servo_manager.update()
-            self.window_servo_manager.update()
-            self.buzzer_manager.update()
-            self.fan_manager.update()
-            self.mqtt.check_messages()
-
-            button.handle_buttons(self.oled_manager)
-
-            if loop_count % 60 == 0:
-                lighting.handle_time_based_lighting()
-
-            if loop_count % 2 == 0:
-                motion.handle_motion_detection(self.mqtt, self.rgb_manager, self.oled_manager, button)
-
-            if loop_count % 10 == 0:
-                steam.handle_steam_detection(self.mqtt, self.rgb_manager, self.oled_manager, self.window_servo_manager)
-
-            if loop_count % 10 == 5:
-                gas.handle_gas_detection(self.mqtt, self.rgb_manager, self.oled_manager, self.buzzer_manager, button, self.fan_manager)
-
-            rfid.handle_rfid_detection(self.mqtt, self.oled_manager)
-
-            self.environment.handle_environment_detection(self.mqtt, self.oled_manager)
-
-            if loop_count % 10 == 1:
-                self.memory.collect("App loop")
-
-            loop_count += 1
-            print(f"--- Loop {loop_count} complete ---")
-            time.sleep(1)  # Loop runs every 1 second
\ No newline at end of file
+        scheduler.run()
+
+    def _publish_clock(self):
+        """Clock offset and drift as telemetry, so slow crystals show up on the dashboard."""
+        import config
+        topic = getattr(config, 'TOPIC_STATUS_CLOCK', f"devices/{config.DEVICE_ID}/status/clock")
+        payload = self.devices.get('codec').encode(topic, self.devices.get('time_sync').stats())
+        if not self.mqtt.publish(topic, payload):
+            print("[SmartHomeApp] MQTT publish failed - clock telemetry")
+
+    def _update_servos(self):
+        self.door_servo_manager.step()
+        self.window_servo_manager.step()
+
+    def _update_outputs(self):
+        """Fan soft-start ramp. Output durations are fired by the timer service, not polled here."""
+        self.fan_manager.update()
@@ -0,0 +1,183 @@
+import struct
+
+MAGIC = 0xB1
+FRAME = '<BBBfI'    # magic, kind, flags, value, timestamp
+FRAME_SIZE = 11
+
+# Index = kind byte on the wire. Must match BinaryPayloadDecoder in the API.
+KINDS = ('', 'temperature', 'humidity', 'motion', 'gas', 'steam', 'asthma_alert')
+STATES = ('closed', 'open', 'off', 'on')
+
+HAS_VALUE = 0x01
+HAS_DETECTED = 0x02
+DETECTED = 0x04
+BOOL_VALUE = 0x08
+HAS_STATE = 0x10     # With HAS_VALUE, the value is the fan duty %
+STATE_SHIFT = 5     # Bits 5-6 hold the index into STATES
+
+class JsonCodec:
+    """Default format - readable by the web dashboard and every API handler.
+
+    Recurring shapes come from PayloadBuilder templates; anything else goes
+    through ujson.dumps.
+    """
+    name = 'json'
+
+    def __init__(self, time_sync):
+        from comms.payloads import PayloadBuilder
+        self.time_sync = time_sync
+        self.payloads = PayloadBuilder(time_sync)
+
+    def encode(self, record):
+        import ujson
+        record["timestamp"] = self.time_sync.get_iso_timestamp()
+        return ujson.dumps(record)
+
+    def status(self, state):
+        payload = self.payloads.status(state)
+        return payload if payload is not None else self.encode({"state": state})
+
+    def fan_status(self, state, duty):
+        payload = self.payloads.fan_status(state, duty)
+        return payload if payload is not None else self.encode({"state": state, "duty": duty})
+
+    def event(self, sensor_type, detected):
+        return self.payloads.event(sensor_type, detected)
+
+    def reading(self, sensor_type, value, unit):
+        payload = self.payloads.reading(sensor_type, value, unit)
+        if payload is None:
+            payload = self.encode({"sensor_type": sensor_type, "value": value, "unit": unit})
+        return payload
+
+class StructCodec:
+    """Fixed 11-byte frame for sensor readings and on/off/open/closed states.
+
+    Field names become bit flags, the sensor type and state become table indexes,
+    units are implied by the sensor type and the timestamp is the synced clock's
+    seconds since the MicroPython epoch (2000-01-01 UTC). The frame is packed into one reused
+    bytearray. Records the tables cannot express fall back to JSON.
+    """
+    name = 'struct'
+
+    def __init__(self, time_sync):
+        self.time_sync = time_sync
+        self.json = JsonCodec(time_sync)
+        self.buf = bytearray(FRAME_SIZE)
+        self.view = memoryview(self.buf)
+
+    def _pack(self, kind, flags, value):
+        struct.pack_into(FRAME, self.buf, 0, MAGIC, kind, flags, value, self.time_sync.now())
+        return self.view
+
+    def status(self, state):
+        if state not in STATES:
+            return self.json.status(state)
+        return self._pack(0, HAS_STATE | (STATES.index(state) << STATE_SHIFT), 0.0)
+
+    def fan_status(self, state, duty):
+        """Fan state with the actual duty % as the frame value."""
+        if state not in STATES:
+            return self.json.fan_status(state, duty)
+        return self._pack(0, HAS_STATE | HAS_VALUE | (STATES.index(state) << STATE_SHIFT), duty)
+
+    def event(self, sensor_type, detected):
+        if sensor_type not in KINDS:
+            return self.json.event(sensor_type, detected)
+        return self._pack(KINDS.index(sensor_type), HAS_DETECTED | (DETECTED if detected else 0), 0.0)
+
+    def reading(self, sensor_type, value, unit):
+        if sensor_type not in KINDS:
+            return self.json.reading(sensor_type, value, unit)
+        return self._pack(KINDS.index(sensor_type), HAS_VALUE, value)
+
+    def encode(self, record):
+        kind = 0
+        flags = 0
+        value = 0.0
+        sensor_type = record.get("sensor_type")
+        if sensor_type is not None:
+            if sensor_type not in KINDS:
+                return self.json.encode(record)
+            kind = KINDS.index(sensor_type)
+        if "value" in record:
+            value = record["value"]
+            flags |= HAS_VALUE | (BOOL_VALUE if value is True or value is False else 0)
+        elif "duty" in record:
+            value = record["duty"]
+            flags |= HAS_VALUE
+        if "detected" in record:
+            flags |= HAS_DETECTED | (DETECTED if record["detected"] else 0)
+        if "state" in record:
+            if record["state"] not in STATES:
+                return self.json.encode(record)
+            flags |= HAS_STATE | (STATES.index(record["state"]) << STATE_SHIFT)
+        return self._pack(kind, flags, value)
+
+    @staticmethod
+    def decode(frame):
+        """Inverse of encode (timestamp left as device-epoch seconds). Used by tests."""
+        magic, kind, flags, value, timestamp = struct.unpack(FRAME, frame)
+        if magic != MAGIC:
+            raise ValueError("not a struct frame")
+        record = {"timestamp": timestamp}
+        if kind:
+            record["sensor_type"] = KINDS[kind]
+        if flags & HAS_VALUE:
+            if flags & HAS_STATE:
+                record["duty"] = round(value)   # Only fan status carries both
+            else:
+                record["value"] = bool(value) if flags & BOOL_VALUE else value
+        if flags & HAS_DETECTED:
+            record["detected"] = bool(flags & DETECTED)
+        if flags & HAS_STATE:
+            record["state"] = STATES[(flags >> STATE_SHIFT) & 0x03]
+        return record
+
+class TelemetryCodec:
+    """Picks the payload codec for each outgoing topic and stamps the timestamp.
+
+    PAYLOAD_CODECS in config.py maps topic -> 'json' | 'struct'. Unlisted topics
+    use JSON.
+    """
+
+    def __init__(self, time_sync, codecs=None):
+        if codecs is None:
+            import config
+            codecs = getattr(config, 'PAYLOAD_CODECS', {})
+        self.json = JsonCodec(time_sync)
+        self.struct = StructCodec(time_sync)
+        self.by_topic = {}
+        for topic, name in codecs.items():
+            self.by_topic[topic] = self.struct if name == 'struct' else self.json
+
+    def encode(self, topic, record):
+        """Generic record - allocates. Prefer status/event/reading for recurring messages."""
+        return self.by_topic.get(topic, self.json).encode(record)
+
+    def status(self, topic, state):
+        return self.by_topic.get(topic, self.json).status(state)
+
+    def fan_status(self, topic, state, duty):
+        return self.by_topic.get(topic, self.json).fan_status(state, duty)
+
+    def event(self, topic, sensor_type, detected):
+        return self.by_topic.get(topic, self.json).event(sensor_type, detected)
+
+    def reading(self, topic, sensor_type, value, unit):
+        return self.by_topic.get(topic, self.json).reading(sensor_type, value, unit)
+
+    def status_snapshot(self, fan_state, door_state, window_state, temperature, humidity, fan_duty=None):
+        """Dashboard status response - always JSON."""
+        payload = self.json.payloads.status_snapshot(fan_state, door_state, window_state, temperature, humidity, fan_duty)
+        if payload is None:
+            import ujson
+            timestamp = self.json.time_sync.get_iso_timestamp()
+            payload = ujson.dumps({
+                "fan": {"state": fan_state, "duty": fan_duty, "timestamp": timestamp},
+                "door": {"state": door_state, "timestamp": timestamp},
+                "window": {"state": window_state, "timestamp": timestamp},
+                "temperature": temperature,
+                "humidity": humidity
+            })
+        return payload
@@ -1,10 +1,52 @@
 from umqtt.simple import MQTTClient
 from config import MQTT_BROKER, MQTT_PORT, MQTT_USER, MQTT_PASSWORD
+from comms.outbox import Outbox, LATEST
+from comms.topic_router import TopicRouter, covers
+from utils.deadline import Deadline
+import random
 import time
 
+MIN_BACKOFF_MS = 1000
+PING_INTERVAL_MS = 30000    # Detects half-open connections that check_msg alone would not notice
+
+def _outbox_policies():
+    """Status topics only need their newest value. Everything else (alarms, RFID audit) is kept."""
+    import config
+    policies = {}
+    for name in ('TOPIC_STATUS_DOOR', 'TOPIC_STATUS_WINDOW', 'TOPIC_STATUS_FAN', 'TOPIC_RESPONSE_STATUS'):
+        topic = getattr(config, name, None)
+        if topic:
+            policies[topic] = LATEST
+    policies[getattr(config, 'TOPIC_STATUS_CLOCK', f"devices/{config.DEVICE_ID}/status/clock")] = LATEST
+    return policies
+
 class SmartHomeMQTTClient:
     def __init__(self):
-        self.callbacks = {}
+        self.router = TopicRouter()
+        self.filters = []           # Filters actually subscribed at the broker
+        self.outbox = Outbox(_outbox_policies())
+        import config
+        self.max_backoff_ms = getattr(config, 'MQTT_MAX_BACKOFF_MS', 60000)
+        self.drain_max = getattr(config, 'MQTT_DRAIN_MAX', 10)
+        self.drain_budget_ms = getattr(config, 'MQTT_DRAIN_BUDGET_MS', 20)
+        # Caps each socket wait in connect() - without it a dead network stalls the loop
+        # for the lwIP default of tens of seconds
+        self.connect_timeout_ms = getattr(config, 'MQTT_CONNECT_TIMEOUT_MS', 1500)
+        self.dispatched = 0         # Incremented by _dispatch - tells drain whether a read delivered a message
+        self.last_drained = 0
+        self.max_drained = 0        # Largest backlog cleared in one tick
+        self.drain_cutoffs = 0      # Ticks that hit the budget with messages possibly left
+        self.connected = False
+        self.backoff_ms = MIN_BACKOFF_MS
+        self.retry = Deadline()
+        self.ping = Deadline()
+        self.down_since = None      # When the drop was detected
+        self.last_ok = None         # Last successful broker I/O
+        self.attempts = 0           # Attempts during the current outage
+        self.outages = 0
+        self.last_outage_ms = 0
+        self.max_outage_ms = 0
+        self.last_reconnect_ms = 0
         self.client_id = "test-esp32-" + str(time.ticks_cpu() & 0xffff)
         self.client = MQTTClient(
             self.client_id,
@@ -18,24 +60,147 @@ class SmartHomeMQTTClient:
     
     def connect(self):
         try:
-            self.client.connect()
+            self.client.connect(timeout=self.connect_timeout_ms / 1000)
             print("Connected to MQTT broker")
-            return True
         except Exception as e:
             print("Error connecting to MQTT broker:", e)
+            self._schedule_retry()
             return False
+
+        now = time.ticks_ms()
+        if self.down_since is not None:
+            self.last_reconnect_ms = time.ticks_diff(now, self.down_since)
+            self.last_outage_ms = time.ticks_diff(now, self.last_ok if self.last_ok is not None else self.down_since)
+            self.max_outage_ms = max(self.max_outage_ms, self.last_outage_ms)
+            print(f"[MQTT] Reconnected after {self.attempts} attempts, outage {self.last_outage_ms} ms")
+        self.connected = True
+        self.down_since = None
+        self.last_ok = now
+        self.attempts = 0
+        self.backoff_ms = MIN_BACKOFF_MS
+        self.retry.cancel()
+        self.ping.start(PING_INTERVAL_MS)
+        self._resubscribe()
+        return True
+
+    def _schedule_retry(self):
+        if self.down_since is None:
+            self.down_since = time.ticks_ms()
+        self.attempts += 1
+        # Equal jitter: half the backoff fixed, half random, so reboot storms do not retry in step
+        half = self.backoff_ms // 2
+        delay = half + random.getrandbits(16) % (half + 1)
+        self.retry.start(delay)
+        self.backoff_ms = min(self.backoff_ms * 2, self.max_backoff_ms)
+        print(f"[MQTT] Retrying in {delay} ms (attempt {self.attempts})")
+
+    def _mark_down(self, reason):
+        if not self.connected:
+            return
+        print(f"[MQTT] Connection lost ({reason}) - reconnecting in background")
+        self.connected = False
+        self.outages += 1
+        self.down_since = time.ticks_ms()
+        self.attempts = 0
+        self.ping.cancel()
+        try:
+            self.client.sock.close()
+        except Exception:
+            pass
+        self._schedule_retry()
+
+    def _resubscribe(self):
+        # umqtt uses clean sessions, so the broker forgets subscriptions on every connect
+        self.client.set_callback(self._dispatch)
+        for topic in self.filters:
+            try:
+                self.client.subscribe(topic)
+            except Exception as e:
+                print(f"Error re-subscribing to {topic}: {e}")
+                self._mark_down(e)
+                return
+
+    def supervise(self):
+        """Scheduler job: reconnect when the retry deadline passes, ping while idle.
+
+        Local automations keep running between attempts. The attempt itself blocks
+        the loop for the TLS handshake, with every socket wait capped at
+        MQTT_CONNECT_TIMEOUT_MS, so an unreachable broker costs one timeout per
+        backoff period. Gas edges that arrive meanwhile are queued by the pin IRQ
+        and handled by the next 'gas' job.
+        """
+        if not self.connected:
+            if self.retry.expired():
+                self.connect()
+            return
+        if self.ping.expired():
+            try:
+                self.client.ping()
+                self.ping.start(PING_INTERVAL_MS)
+            except Exception as e:
+                self._mark_down(e)
+
+    def stats(self):
+        outage_ms = 0
+        if self.down_since is not None:
+            outage_ms = time.ticks_diff(time.ticks_ms(), self.last_ok if self.last_ok is not None else self.down_since)
+        return {
+            "connected": self.connected,
+            "outages": self.outages,
+            "attempts": self.attempts,
+            "current_outage_ms": outage_ms,
+            "last_outage_ms": self.last_outage_ms,
+            "max_outage_ms": self.max_outage_ms,
+            "last_reconnect_ms": self.last_reconnect_ms,
+            "last_drained": self.last_drained,
+            "max_drained": self.max_drained,
+            "drain_cutoffs": self.drain_cutoffs,
+        }
     
-    def publish(self, topic, payload):
+    def publish(self, topic, payload, queue=True):
+        """Publish now, or queue in the outbox if the broker is unreachable.
+
+        Returns True only if the message reached the socket. A False return means it
+        was queued (or dropped by the outbox policy) and will be replayed in order.
+        With queue=False the message is sent now or not at all - for requests whose
+        answer is only meaningful while someone is waiting for it.
+        """
+        if not queue:
+            return self._send(topic, payload)
+        if not self.outbox.is_empty():
+            # Older messages are waiting - queue behind them to keep order
+            self.outbox.put(topic, payload)
+            self.flush_outbox()
+            return self.outbox.is_empty()
+        if self._send(topic, payload):
+            return True
+        self.outbox.put(topic, payload)
+        return False
+
+    def _send(self, topic, payload):
+        if not self.connected:
+            return False
         try:
             self.client.publish(topic, payload)
+            self.last_ok = time.ticks_ms()
             return True
         except OSError as e:
             print(f"MQTT publish timeout/error for {topic}: {e}")
+            self._mark_down(e)
             return False
         except Exception as e:
             print(f"Error publishing to MQTT broker ({topic}): {e}")
             return False
 
+    def flush_outbox(self, limit=8):
+        """Replay queued messages in order. Returns the number sent."""
+        if not self.connected or self.outbox.is_empty():
+            return 0
+        sent = self.outbox.replay(self._send, limit)
+        if sent:
+            print(f"[MQTT] Replayed {sent} queued messages - {self.outbox.stats()}")
+        return sent
+
     def _dispatch(self, topic, msg):
         """
         Route incoming MQTT messages to the correct handler.
@@ -43,43 +208,93 @@ class SmartHomeMQTTClient:
         Flow:
         1. MQTT broker sends message → umqtt library receives it
         2. umqtt calls THIS function (registered via set_callback)
-        3. We look up which handler to call based on topic
-        4. Call the handler with (topic, msg)
+        3. The topic router finds every handler whose filter matches the topic
+        4. Call each handler with (topic, msg)
 
         Example:
-        - Message arrives on "devices/esp32_main/rfid/response"
-        - _dispatch looks up self.callbacks["devices/esp32_main/rfid/response"]
-        - Finds control.handle_rfid_response
-        - Calls control.handle_rfid_response(topic, msg)
+        - Message arrives on b"devices/esp32_main/control/door"
+        - Broker delivered it via the "devices/esp32_main/control/+" subscription
+        - Router matches the "devices/esp32_main/control/door" handler
+        - Calls control.handle_door_control(topic, msg, mqtt)
         """
-        topic_str = topic.decode() if isinstance(topic, bytes) else topic
-        callback = self.callbacks.get(topic_str)
-        if callback:
-            callback(topic_str, msg)
-        else:
+        self.dispatched += 1
+        if not self.router.route(topic, msg):
             print(f"No callback found for topic: {topic}")
 
+    def subscribe_filter(self, topic_filter):
+        """
+        Subscribe at the broker without adding a handler.
+
+        Later subscribe() calls for topics this filter covers only register their
+        handler, so several topics share one SUBSCRIBE packet and one broker entry.
+        """
+        if topic_filter in self.filters:
+            return True
+        self.filters.append(topic_filter)
+        return self._subscribe_broker(topic_filter)
+
     def subscribe(self, topic, callback):
         """
-        Subscribe to MQTT topic and register handler.
+        Subscribe to MQTT topic (or +/# filter) and register handler.
 
-        Note: set_callback is called EVERY time subscribe() is called,
-        but umqtt only keeps ONE global callback (_dispatch), which
-        then routes to multiple topic-specific handlers via self.callbacks dict.
+        Several handlers may share a topic. No SUBSCRIBE is sent if an existing
+        broker filter already covers the topic. While disconnected the filter is
+        only recorded - connect() subscribes to every recorded filter.
         """
+        self.router.add(topic, callback)
+        for topic_filter in self.filters:
+            if covers(topic_filter, topic):
+                print(f"Routing {topic} via {topic_filter}")
+                return True
+        self.filters.append(topic)
+        return self._subscribe_broker(topic)
+
+    def _subscribe_broker(self, topic_filter):
+        if not self.connected:
+            print(f"Subscription to {topic_filter} deferred until connected")
+            return False
         try:
-            self.callbacks[topic] = callback
             self.client.set_callback(self._dispatch)
-            self.client.subscribe(topic)
-            print(f"Subscribed to topic: {topic}")
+            self.client.subscribe(topic_filter)
+            print(f"Subscribed to topic: {topic_filter}")
+            return True
         except Exception as e:
             print("Error subscribing to MQTT broker:", e)
+            self._mark_down(e)
             return False
 
     def check_messages(self):
+        """Handle every pending inbound message, up to drain_max or drain_budget_ms.
+
+        check_msg() reads at most one packet, so a burst of dashboard commands would
+        otherwise be spread across ticks. The loop stops on the first read that
+        delivers nothing. Returns the number of messages handled, or False if offline.
+        """
+        if not self.connected:
+            return False
+        start = time.ticks_ms()
+        drained = 0
         try:
-            self.client.check_msg()
-            return True
+            while drained < self.drain_max:
+                before = self.dispatched
+                self.client.check_msg()
+                if self.dispatched == before:
+                    break
+                self.last_ok = time.ticks_ms()
+                drained += 1
+                if time.ticks_diff(self.last_ok, start) >= self.drain_budget_ms:
+                    self.drain_cutoffs += 1
+                    break
+            else:
+                self.drain_cutoffs += 1
         except Exception as e:
             print("Error checking messages from MQTT broker:", e)
+            self._mark_down(e)
             return False
+        finally:
+            self.last_drained = drained
+            if drained > self.max_drained:
+                self.max_drained = drained
+        if drained > 1:
+            print(f"[MQTT] Drained {drained} messages")
+        return drained
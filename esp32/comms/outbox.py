@@ -0,0 +1,184 @@
+import os
+import struct
+
+LOG_FILE = 'outbox.log'
+RECORD_HEADER = '<IHH'  # sequence number, topic length, payload length
+RECORD_HEADER_SIZE = 8
+
+KEEP = 'keep'       # Every message matters (alarms, audit) - spill to flash when RAM is full
+LATEST = 'latest'   # Only the newest value matters (status) - replaces any queued one, RAM only
+
+class Outbox:
+    """Bounded store-and-forward queue for messages that could not be published.
+
+    Messages wait in a small RAM queue. Once that is full, KEEP messages are appended
+    to a flash log instead. LATEST messages replace an older queued message on the
+    same topic and are never written to flash. Every message gets a sequence number
+    when queued, and replay merges RAM and the log by it, so messages go out in the
+    order they were queued wherever they wait.
+    """
+
+    def __init__(self, policies=None, ram_size=16, max_log_bytes=16384, path=LOG_FILE):
+        self.policies = policies or {}
+        self.ram_size = ram_size
+        self.max_log_bytes = max_log_bytes
+        self.path = path
+        self.ram = []
+        self.log_bytes = 0
+        self.log_offset = 0     # Bytes of the log already replayed
+        self.seq = 0            # Sequence number for the next queued message
+        self.queued = 0
+        self.replayed = 0
+        self.dropped = 0
+        self.spilled = 0
+        self._scan_log()
+
+    def _scan_log(self):
+        """Pick up messages left over from before a reboot and continue their sequence."""
+        try:
+            size = os.stat(self.path)[6]
+        except OSError:
+            return
+        offset = 0
+        try:
+            with open(self.path, 'rb') as f:
+                while offset < size:
+                    seq, topic_len, payload_len = struct.unpack(RECORD_HEADER, f.read(RECORD_HEADER_SIZE))
+                    offset += RECORD_HEADER_SIZE + topic_len + payload_len
+                    f.seek(offset)
+                    self.seq = seq + 1
+        except (OSError, ValueError):
+            offset = -1
+        if offset != size:
+            print("[Outbox] Flash log corrupt, discarding")
+            self._reset_log()
+            self.seq = 0
+            return
+        self.log_bytes = size
+
+    def policy(self, topic):
+        return self.policies.get(topic, KEEP)
+
+    def is_empty(self):
+        return not self.ram and self.log_offset >= self.log_bytes
+
+    def put(self, topic, payload):
+        # Callers may reuse their buffer (memoryview/bytearray) - take a copy
+        if not isinstance(payload, (str, bytes)):
+            payload = bytes(payload)
+        self.queued += 1
+        seq = self.seq
+        self.seq += 1
+
+        if self.policy(topic) == LATEST:
+            for i in range(len(self.ram)):
+                if self.ram[i][1] == topic:
+                    del self.ram[i]
+                    self.dropped += 1   # Superseded value
+                    break
+            if len(self.ram) >= self.ram_size:
+                self._drop_oldest_latest()
+            if len(self.ram) < self.ram_size:
+                self.ram.append((seq, topic, payload))
+            else:
+                self.dropped += 1
+            return
+
+        # Once anything has spilled, later KEEP messages follow it to flash
+        if self.log_bytes == 0 and len(self.ram) < self.ram_size:
+            self.ram.append((seq, topic, payload))
+        else:
+            self._append_log(seq, topic, payload)
+
+    def _drop_oldest_latest(self):
+        for i in range(len(self.ram)):
+            if self.policy(self.ram[i][1]) == LATEST:
+                del self.ram[i]
+                self.dropped += 1
+                return
+
+    def _append_log(self, seq, topic, payload):
+        topic_b = topic.encode() if isinstance(topic, str) else topic
+        payload_b = payload.encode() if isinstance(payload, str) else payload
+        size = RECORD_HEADER_SIZE + len(topic_b) + len(payload_b)
+        if self.log_bytes + size > self.max_log_bytes:
+            self.dropped += 1
+            print(f"[Outbox] Flash log full - dropped message for {topic}")
+            return
+        try:
+            with open(self.path, 'ab') as f:
+                f.write(struct.pack(RECORD_HEADER, seq, len(topic_b), len(payload_b)))
+                f.write(topic_b)
+                f.write(payload_b)
+            self.log_bytes += size
+            self.spilled += 1
+        except OSError as e:
+            self.dropped += 1
+            print(f"[Outbox] Flash write failed: {e}")
+
+    def replay(self, send, limit=8):
+        """Send up to limit queued messages in order with send(topic, payload) -> bool.
+
+        Stops at the first failure and leaves that message queued. Returns the number sent.
+        """
+        sent = 0
+        f = None
+        record = None       # Next unsent log record: (seq, topic, payload, size)
+        try:
+            while sent < limit:
+                if record is None and self.log_offset < self.log_bytes:
+                    if f is None:
+                        f = open(self.path, 'rb')
+                        f.seek(self.log_offset)
+                    record = self._read_record(f)
+                if self.ram and (record is None or self.ram[0][0] < record[0]):
+                    _, topic, payload = self.ram[0]
+                    if not send(topic, payload):
+                        break
+                    self.ram.pop(0)
+                elif record is not None:
+                    if not send(record[1], record[2]):
+                        break
+                    self.log_offset += record[3]
+                    record = None
+                else:
+                    break
+                self.replayed += 1
+                sent += 1
+        except (OSError, ValueError) as e:
+            print(f"[Outbox] Flash log unreadable, discarding: {e}")
+            self.log_offset = self.log_bytes
+        finally:
+            if f is not None:
+                f.close()
+
+        if self.log_bytes and self.log_offset >= self.log_bytes:
+            self._reset_log()
+        return sent
+
+    def _read_record(self, f):
+        header = f.read(RECORD_HEADER_SIZE)
+        if len(header) < RECORD_HEADER_SIZE:
+            raise ValueError("truncated record")
+        seq, topic_len, payload_len = struct.unpack(RECORD_HEADER, header)
+        topic = f.read(topic_len).decode()
+        payload = f.read(payload_len)
+        return seq, topic, payload, RECORD_HEADER_SIZE + topic_len + payload_len
+
+    def _reset_log(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+        self.log_bytes = 0
+        self.log_offset = 0
+
+    def stats(self):
+        return {
+            "queued": self.queued,
+            "replayed": self.replayed,
+            "dropped": self.dropped,
+            "spilled": self.spilled,
+            "pending_ram": len(self.ram),
+            "pending_log_bytes": self.log_bytes - self.log_offset,
+        }
@@ -0,0 +1,173 @@
+SPACE = 0x20
+ZERO = 0x30
+TIMESTAMP_WIDTH = 20    # 2026-01-01T00:00:00Z
+
+# Quoted JSON strings as bytes constants - writing them into a template allocates nothing
+QUOTED = {
+    'open': b'"open"',
+    'closed': b'"closed"',
+    'on': b'"on"',
+    'off': b'"off"',
+}
+
+class PayloadTemplate:
+    """One preallocated JSON message whose variable fields are patched in place.
+
+    Parts are literal strings or integer slot widths. Slots are filled by index
+    and padded with spaces, which JSON ignores between tokens, so the message
+    length never changes. view is a memoryview over the whole buffer that can be
+    handed straight to publish().
+    """
+
+    def __init__(self, *parts):
+        text = ''
+        self.slots = []
+        for part in parts:
+            if isinstance(part, int):
+                self.slots.append((len(text), part))
+                text += ' ' * part
+            else:
+                text += part
+        self.buf = bytearray(text.encode())
+        self.view = memoryview(self.buf)
+
+    def put_bytes(self, index, value):
+        at, width = self.slots[index]
+        if len(value) > width:
+            raise ValueError("value wider than slot")
+        buf = self.buf
+        for i in range(width):
+            buf[at + i] = value[i] if i < len(value) else SPACE
+
+    def put_int(self, index, value):
+        """Write an int (or null for None), left-aligned."""
+        if value is None:
+            self.put_bytes(index, b'null')
+            return
+        if not isinstance(value, int):
+            raise TypeError("slot takes int")
+        at, width = self.slots[index]
+        buf = self.buf
+        negative = value < 0
+        if negative:
+            value = -value
+        digits = 1
+        n = value
+        while n >= 10:
+            n //= 10
+            digits += 1
+        length = digits + negative
+        if length > width:
+            raise ValueError("value wider than slot")
+        if negative:
+            buf[at] = 0x2D  # '-'
+        end = at + length
+        for i in range(digits):
+            buf[end - 1 - i] = ZERO + value % 10
+            value //= 10
+        for i in range(end, at + width):
+            buf[i] = SPACE
+
+    def put_timestamp(self, index, iso):
+        """Copy a TIMESTAMP_WIDTH timestamp buffer (TimeSync.iso_bytes) into a slot."""
+        at = self.slots[index][0]
+        buf = self.buf
+        for i in range(TIMESTAMP_WIDTH):
+            buf[at + i] = iso[i]
+
+class PayloadBuilder:
+    """Recurring JSON messages built from cached templates instead of ujson.dumps.
+
+    Each message shape gets one template the first time it is used. After that a
+    publish only patches the state, value and timestamp bytes in place. Callers
+    get a memoryview that is valid until the next call for the same shape -
+    publish() sends it synchronously and the outbox copies anything it queues.
+    Shapes the templates cannot express return None so the caller can fall back.
+    """
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.status_template = None
+        self.fan_template = None
+        self.events = {}        # sensor_type -> template, detected slot
+        self.readings = {}      # sensor_type -> template, value slot
+        self.snapshot = None
+
+    def status(self, state):
+        """{"state": ..., "timestamp": ...} for door, window and fan status topics."""
+        quoted = QUOTED.get(state)
+        if quoted is None:
+            return None
+        t = self.status_template
+        if t is None:
+            t = PayloadTemplate('{"state":', 8, ',"timestamp":"', TIMESTAMP_WIDTH, '"}')
+            self.status_template = t
+        t.put_bytes(0, quoted)
+        t.put_timestamp(1, self.clock.iso_bytes())
+        return t.view
+
+    def fan_status(self, state, duty):
+        """{"state": ..., "duty": ..., "timestamp": ...} - duty is the actual fan duty in %."""
+        quoted = QUOTED.get(state)
+        if quoted is None:
+            return None
+        t = self.fan_template
+        if t is None:
+            t = PayloadTemplate('{"state":', 8, ',"duty":', 3, ',"timestamp":"', TIMESTAMP_WIDTH, '"}')
+            self.fan_template = t
+        t.put_bytes(0, quoted)
+        try:
+            t.put_int(1, duty)
+        except (TypeError, ValueError):
+            return None
+        t.put_timestamp(2, self.clock.iso_bytes())
+        return t.view
+
+    def event(self, sensor_type, detected):
+        """{"sensor_type": ..., "detected": ..., "timestamp": ...} for motion, gas and steam."""
+        t = self.events.get(sensor_type)
+        if t is None:
+            t = PayloadTemplate('{"sensor_type":"' + sensor_type + '","detected":', 5,
+                                ',"timestamp":"', TIMESTAMP_WIDTH, '"}')
+            self.events[sensor_type] = t
+        t.put_bytes(0, b'true' if detected else b'false')
+        t.put_timestamp(1, self.clock.iso_bytes())
+        return t.view
+
+    def reading(self, sensor_type, value, unit):
+        """{"sensor_type": ..., "value": ..., "unit": ..., "timestamp": ...} for integer readings."""
+        t = self.readings.get(sensor_type)
+        if t is None:
+            t = PayloadTemplate('{"sensor_type":"' + sensor_type + '","value":', 6,
+                                ',"unit":"' + unit + '","timestamp":"', TIMESTAMP_WIDTH, '"}')
+            self.readings[sensor_type] = t
+        try:
+            t.put_int(0, value)
+        except (TypeError, ValueError):
+            return None
+        t.put_timestamp(1, self.clock.iso_bytes())
+        return t.view
+
+    def status_snapshot(self, fan_state, door_state, window_state, temperature, humidity, fan_duty=None):
+        """Full status response for the dashboard's periodic status request."""
+        t = self.snapshot
+        if t is None:
+            t = PayloadTemplate('{"fan":{"state":', 8, ',"duty":', 4, ',"timestamp":"', TIMESTAMP_WIDTH,
+                                '"},"door":{"state":', 8, ',"timestamp":"', TIMESTAMP_WIDTH,
+                                '"},"window":{"state":', 8, ',"timestamp":"', TIMESTAMP_WIDTH,
+                                '"},"temperature":', 6, ',"humidity":', 6, '}')
+            self.snapshot = t
+        try:
+            t.put_bytes(0, QUOTED[fan_state])
+            t.put_int(1, fan_duty)
+            t.put_bytes(3, QUOTED[door_state])
+            t.put_bytes(5, QUOTED[window_state])
+            t.put_int(7, temperature)
+            t.put_int(8, humidity)
+        except (KeyError, TypeError, ValueError):
+            return None
+        now = self.clock.iso_bytes()
+        t.put_timestamp(2, now)
+        t.put_timestamp(4, now)
+        t.put_timestamp(6, now)
+        return t.view
@@ -0,0 +1,80 @@
+def _as_bytes(topic):
+    if isinstance(topic, bytes):
+        return topic
+    return topic.encode() if isinstance(topic, str) else bytes(topic)
+
+def covers(topic_filter, topic):
+    """True if topic_filter matches every topic that topic (itself possibly a filter) matches."""
+    f_levels = _as_bytes(topic_filter).split(b'/')
+    t_levels = _as_bytes(topic).split(b'/')
+    for i, level in enumerate(f_levels):
+        if level == b'#':
+            return True
+        if i >= len(t_levels):
+            return False
+        if level == b'+':
+            if t_levels[i] == b'#':
+                return False
+        elif level != t_levels[i]:
+            return False
+    return len(f_levels) == len(t_levels)
+
+class TopicRouter:
+    """Topic trie that routes incoming messages to handlers by MQTT filter.
+
+    Filters may use + (one level) and # (rest of the topic), and any number of
+    handlers can share a filter. Filters are split once when added. The first
+    message on a topic walks the trie and caches (topic_str, handlers) under the
+    raw topic bytes, so repeat topics cost one dict lookup and no decode().
+    """
+
+    def __init__(self, cache_size=16):
+        self.root = ({}, [])    # (children by level, handlers)
+        self.cache = {}
+        self.cache_size = cache_size
+
+    def add(self, topic_filter, handler):
+        node = self.root
+        for level in _as_bytes(topic_filter).split(b'/'):
+            child = node[0].get(level)
+            if child is None:
+                child = ({}, [])
+                node[0][level] = child
+            node = child
+        node[1].append(handler)
+        self.cache.clear()
+
+    def _match(self, node, levels, i, out):
+        children = node[0]
+        multi = children.get(b'#')
+        if multi is not None:
+            out.extend(multi[1])        # 'a/#' matches 'a' and everything below it
+        if i == len(levels):
+            out.extend(node[1])
+            return
+        child = children.get(levels[i])
+        if child is not None:
+            self._match(child, levels, i + 1, out)
+        single = children.get(b'+')
+        if single is not None:
+            self._match(single, levels, i + 1, out)
+
+    def lookup(self, topic):
+        """Return (topic_str, handlers) for a topic given as bytes or str."""
+        key = _as_bytes(topic)
+        entry = self.cache.get(key)
+        if entry is None:
+            handlers = []
+            self._match(self.root, key.split(b'/'), 0, handlers)
+            entry = (key.decode(), tuple(handlers))
+            if len(self.cache) >= self.cache_size:
+                self.cache.clear()      # Cheap bound - a device only sees a handful of topics
+            self.cache[key] = entry
+        return entry
+
+    def route(self, topic, msg):
+        """Call every handler matching topic. Returns how many were called."""
+        topic_str, handlers = self.lookup(topic)
+        for handler in handlers:
+            handler(topic_str, msg)
+        return len(handlers)
@@ -22,6 +22,10 @@ MQTT_BROKER = "your-broker.hivemq.cloud"
 MQTT_PORT = 8883  # SSL/TLS
 MQTT_USER = "your_username"
 MQTT_PASSWORD = "your_password"
+MQTT_MAX_BACKOFF_MS = 60000  # Longest wait between reconnect attempts (optional)
+MQTT_DRAIN_MAX = 10          # Most inbound messages handled per tick (optional)
+MQTT_DRAIN_BUDGET_MS = 20    # Stop draining after this long so other jobs are not starved (optional)
+MQTT_CONNECT_TIMEOUT_MS = 1500  # Cap on each socket wait while connecting - bounds how long a reconnect blocks the loop (optional)
 # MQTT Topics Outgoing
 # Sensor Data
 TOPIC_SENSOR_DATA = f"devices/{DEVICE_ID}/data"
@@ -32,15 +36,60 @@ TOPIC_RFID_REQUEST = f"devices/{DEVICE_ID}/rfid/check"
 TOPIC_STATUS_DOOR = f"devices/{DEVICE_ID}/status/door"
 TOPIC_STATUS_WINDOW = f"devices/{DEVICE_ID}/status/window"
 TOPIC_STATUS_FAN = f"devices/{DEVICE_ID}/status/fan"
+# Clock offset / drift telemetry (every 5 minutes)
+TOPIC_STATUS_CLOCK = f"devices/{DEVICE_ID}/status/clock"
+# Full status snapshot (reply to TOPIC_REQUEST_STATUS)
+TOPIC_RESPONSE_STATUS = f"devices/{DEVICE_ID}/response/status"
 # MQTT Topics Incoming
 # RFID Response
 TOPIC_RFID_RESPONSE = f"devices/{DEVICE_ID}/rfid/response"
+# Authorised-card allowlist (retained, published by the API)
+TOPIC_RFID_ALLOWLIST = f"devices/{DEVICE_ID}/rfid/allowlist"
 # Control Commands (for web remote control - FR9.1, FR9.2, FR9.3)
 TOPIC_CONTROL_DOOR = f"devices/{DEVICE_ID}/control/door"
 TOPIC_CONTROL_WINDOW = f"devices/{DEVICE_ID}/control/window"
 TOPIC_CONTROL_FAN = f"devices/{DEVICE_ID}/control/fan"
+# Single broker subscription covering all control topics above
+TOPIC_CONTROL_ALL = f"devices/{DEVICE_ID}/control/+"
+# Dashboard status request
+TOPIC_REQUEST_STATUS = f"devices/{DEVICE_ID}/request/status"
+
+# Payload format per outgoing topic (optional - unlisted topics use JSON).
+# "struct" sends an 11-byte binary frame the API decodes; the web dashboard
+# subscribes to these topics directly and only understands JSON.
+PAYLOAD_CODECS = {
+    # TOPIC_SENSOR_DATA: "struct",
+}
 
 # Time Configuration (NTP)
 TIMEZONE_OFFSET_HOURS = 10  # AEDT (Melbourne/Sydney) UTC+10
 NIGHT_START_HOUR = 20       # 8pm
 NIGHT_END_HOUR = 7          # 7am
+
+# Garbage Collection (optional - defaults shown)
+GC_LOW_WATER = 16384   # Always collect below this many free bytes
+GC_HIGH_WATER = 32768  # Collect during idle slack below this many free bytes
+GC_THRESHOLD = 8192    # gc.threshold() - VM collects automatically after this many bytes allocated
+GC_LOG = False         # Print a line for every collect
+
+# I2C bus shared by the LCD1602 (0x27) and RFID reader (0x28) on SCL=22 / SDA=21
+I2C_BUS = "soft"         # "soft" = machine.SoftI2C, "hw" = machine.I2C(0) peripheral
+I2C_FREQ = 100000        # PCF8574 backpack is rated for 100 kHz
+RFID_TRANSPORT = "i2c"   # "i2c" = shared bus above, "soft_iic" = legacy bit-banged lib/soft_iic.py
+RFID_SCAN_BUDGET_MS = 150     # Hard cap on one card scan - command waits abort past this
+RFID_MAX_BACKOFF_MS = 10000   # Longest pause between scans after repeated NACK/timeout errors
+RFID_RESPONSE_TIMEOUT_MS = 5000  # API access decisions arriving later than this after the scan are ignored (optional)
+
+# Servos (optional - default shown)
+SERVO_SPEED_DPS = 120    # Door/window travel speed in degrees per second - 0->180 takes 1.5 s
+SERVO_SETTLE_MS = 500    # Servo PWM is released this long after a move ends
+DOOR_SERVO_RELEASE = False  # Release the door servo too - saves holding current but leaves the door back-drivable (optional)
+PWM_IDLE_MS = 2000       # Fan/buzzer PWM is released this long after switching off
+
+# Fan (optional - defaults shown). Dashboard control topic also accepts {"speed": 0-100} and {"mode": "auto"}
+FAN_RAMP_MS = 2000         # Soft start - time to ramp from stop to full speed
+FAN_TARGET_TEMP = 26       # Auto mode: fan starts above this temperature (C)
+FAN_TARGET_HUMIDITY = 60   # Auto mode: humidity above this adds speed
+FAN_KP = 20                # Auto mode: % speed per degree over target
+FAN_KI = 2                 # Auto mode: % speed per degree-minute over target
+FAN_KH = 2                 # Auto mode: % speed per % humidity over target
@@ -1,5 +1,9 @@
+from outputs.buzzer import INFO, WARNING
+from utils.deadline import Deadline
+
 class ControlHandler:
     def __init__(self, rgb_manager, oled_manager, door_servo_manager, window_servo_manager, buzzer_manager, fan_manager):
+        import config
         self.rgb_manager = rgb_manager
         self.oled_manager = oled_manager
         self.door_servo_manager = door_servo_manager
@@ -7,10 +11,29 @@ class ControlHandler:
         self.buzzer_manager = buzzer_manager
         self.fan_manager = fan_manager
         self.mqtt = None
-
-    def set_mqtt(self, mqtt):
-        """Store MQTT client for publishing door status on RFID access."""
+        self.codec = None
+        self.local_grant_card = None  # Card last let in by the local allowlist, pending API confirmation
+        self.response_timeout_ms = getattr(config, 'RFID_RESPONSE_TIMEOUT_MS', 5000)
+        self.pending_card = None      # Card sent to the API for a decision
+        self.pending = Deadline()     # API decisions for pending_card count only until this expires
+
+    def set_mqtt(self, mqtt, codec):
+        """Store the MQTT client and the payload codec for status messages. Door status is published by the door manager."""
         self.mqtt = mqtt
+        self.codec = codec
+
+    def expect_response(self, card_id):
+        """Accept an API decision for card_id until RFID_RESPONSE_TIMEOUT_MS passes."""
+        self.pending_card = card_id
+        self.pending.start(self.response_timeout_ms)
+
+    def _take_pending(self, card_id):
+        """True if card_id is the scan still waiting for an answer - consumes it."""
+        if card_id is None or card_id != self.pending_card or self.pending.remaining_ms() == 0:
+            return False
+        self.pending_card = None
+        self.pending.cancel()
+        return True
 
     def handle_rfid_response(self, topic, msg):
         import ujson
@@ -19,113 +42,114 @@ class ControlHandler:
         try:
             data = ujson.loads(msg.decode())
             print(f"[ControlHandler] Parsed RFID data: {data}")
+            card_id = data.get('card_id')
             if data.get('access') == 'granted':
-                print("[ControlHandler] ACCESS GRANTED - opening door")
-                self.rgb_manager.show('rfid', (0, 255, 0), 3)
-                self.oled_manager.show('rfid', "ACCESS", 3, "GRANTED")
-                self.door_servo_manager.open(duration=5)
-                self._publish_door_status("open")
+                # Only a scan someone is standing at may open the door - never a late or replayed one
+                if self._take_pending(card_id):
+                    self.grant_access()
+                else:
+                    print(f"[ControlHandler] Ignoring grant for {card_id} - no scan waiting for it")
             elif data.get('access') == 'denied':
-                print("[ControlHandler] ACCESS DENIED - activating buzzer")
-                self.rgb_manager.show('rfid', (255, 0, 0), 3)
-                self.oled_manager.show('rfid', "ACCESS", 3, "DENIED")
-                self.buzzer_manager.start(duration=5)
+                overruled = card_id is not None and card_id == self.local_grant_card
+                if overruled and self.door_servo_manager.opening():
+                    # Local allowlist was stale - the API revoked this card
+                    print("[ControlHandler] API overruled local grant - closing door")
+                    self.door_servo_manager.close()
+                if overruled:
+                    self.local_grant_card = None
+                if self._take_pending(card_id) or overruled:
+                    self.deny_access()
             else:
                 print(f"[ControlHandler] Unknown access value: {data.get('access')}")
         except (ValueError, AttributeError) as e:
             print(f"[ControlHandler] Error parsing RFID response: {e}")
 
+    def grant_access(self, card_id=None):
+        """Open the door. card_id is set when the decision came from the local allowlist."""
+        print("[ControlHandler] ACCESS GRANTED - opening door")
+        self.local_grant_card = card_id
+        self.rgb_manager.show('rfid', (0, 255, 0), 3)
+        self.oled_manager.show('rfid', "ACCESS", 3, "GRANTED")
+        self.buzzer_manager.play('access_granted', INFO)
+        self.door_servo_manager.open(duration=5)    # Publishes "open" once the door gets there
+
+    def deny_access(self):
+        print("[ControlHandler] ACCESS DENIED - activating buzzer")
+        self.rgb_manager.show('rfid', (255, 0, 0), 3)
+        self.oled_manager.show('rfid', "ACCESS", 3, "DENIED")
+        self.buzzer_manager.play('access_denied', WARNING, duration=5)
+
     def handle_door_control(self, topic, msg, mqtt):
+        """The door manager publishes the new status when the move completes."""
         import ujson
-        from config import TOPIC_STATUS_DOOR
-        from utils.time_sync import TimeSync
 
         try:
             data = ujson.loads(msg.decode())
-            timestamp = TimeSync().get_iso_timestamp()
 
             if data.get('state') == 'open':
                 self.door_servo_manager.open(duration=5)
-                payload = ujson.dumps({
-                    "state": "open",
-                    "timestamp": timestamp
-                })
-                if not mqtt.publish(TOPIC_STATUS_DOOR, payload):
-                    print("[ControlHandler] MQTT publish failed - door status (open)")
             elif data.get('state') == 'closed':
                 self.door_servo_manager.close()
-                payload = ujson.dumps({
-                    "state": "closed",
-                    "timestamp": timestamp
-                })
-                if not mqtt.publish(TOPIC_STATUS_DOOR, payload):
-                    print("[ControlHandler] MQTT publish failed - door status (close)")
         except (ValueError, AttributeError) as e:
             print(f"Error parsing door control: {e}")
 
     def handle_window_control(self, topic, msg, mqtt):
         import ujson
         from config import TOPIC_STATUS_WINDOW
-        from utils.time_sync import TimeSync
 
         try:
             data = ujson.loads(msg.decode())
             state = data.get('state')
-            timestamp = TimeSync().get_iso_timestamp()
-
-            if state in ('open', 'close'):
+            angle = data.get('angle')
+
+            if isinstance(angle, (int, float)) and not isinstance(angle, bool):
+                # Partial opening - 0 is closed, 180 fully open. JSON may send 90.0
+                self.window_servo_manager.move_to(round(max(0, min(180, angle))))
+                state = "open" if self.window_servo_manager.is_open else "closed"
+                payload = self.codec.status(TOPIC_STATUS_WINDOW, state)
+                if not mqtt.publish(TOPIC_STATUS_WINDOW, payload):
+                    print(f"[ControlHandler] MQTT publish failed - window status ({state})")
+            elif state in ('open', 'close'):
                 if state == 'open':
                     self.window_servo_manager.open()
-                    payload = ujson.dumps({
-                        "state": "open",
-                        "timestamp": timestamp
-                    })
+                    payload = self.codec.status(TOPIC_STATUS_WINDOW, "open")
                     if not mqtt.publish(TOPIC_STATUS_WINDOW, payload):
                         print("[ControlHandler] MQTT publish failed - window status (open)")
                 elif state == 'close':
                     self.window_servo_manager.close()
-                    payload = ujson.dumps({
-                        "state": "closed",
-                        "timestamp": timestamp
-                    })
+                    payload = self.codec.status(TOPIC_STATUS_WINDOW, "closed")
                     if not mqtt.publish(TOPIC_STATUS_WINDOW, payload):
                         print("[ControlHandler] MQTT publish failed - window status (closed)")
         except (ValueError, AttributeError) as e:
             print(f"Error parsing window control: {e}")
 
     def handle_fan_control(self, topic, msg, mqtt):
+        """{"state": "on"|"off"}, {"speed": 0-100} or {"mode": "auto"|"manual"}."""
         import ujson
-        from config import TOPIC_STATUS_FAN
-        from utils.time_sync import TimeSync
+        from outputs.fan import AUTO, MANUAL
 
         try:
             data = ujson.loads(msg.decode())
             state = data.get('state')
-            timestamp = TimeSync().get_iso_timestamp()
-
-            if state in ('on', 'off'):
-                if state == 'on':
-                    self.fan_manager.on()
-                    payload = ujson.dumps({
-                        "state": "on",
-                        "timestamp": timestamp
-                    })
-                    if not mqtt.publish(TOPIC_STATUS_FAN, payload):
-                        print("[ControlHandler] MQTT publish failed - fan status (on)")
-                elif state == 'off':
-                    self.fan_manager.off()
-                    payload = ujson.dumps({
-                        "state": "off",
-                        "timestamp": timestamp
-                    })
-                    if not mqtt.publish(TOPIC_STATUS_FAN, payload):
-                        print("[ControlHandler] MQTT publish failed - fan status (off)")
+            speed = data.get('speed')
+            mode = data.get('mode')
+
+            if isinstance(speed, (int, float)) and not isinstance(speed, bool):
+                self.fan_manager.set_speed(speed)
+            elif mode in (AUTO, MANUAL):
+                self.fan_manager.set_mode(mode)
+                self.fan_manager.control()
+            elif state == 'on':
+                self.fan_manager.on()
+            elif state == 'off':
+                self.fan_manager.off()
+            else:
+                return
+            self.fan_manager.publish_status()
         except (ValueError, AttributeError) as e:
             print(f"Error parsing fan control: {e}")
     
     def handle_status_request(self, topic, msg, mqtt, environment_handler):
-        import ujson
-        from utils.time_sync import TimeSync
         from config import TOPIC_RESPONSE_STATUS
 
         if self.fan_manager.is_on:
@@ -143,37 +167,8 @@ class ControlHandler:
         else:
             window_state = "closed"
 
-        payload = ujson.dumps({
-            "fan": {
-                "state": fan_state,
-                "timestamp": TimeSync().get_iso_timestamp()
-            },
-            "door": {
-                "state": door_state,
-                "timestamp": TimeSync().get_iso_timestamp()
-            },
-            "window": {
-                "state": window_state,
-                "timestamp": TimeSync().get_iso_timestamp()
-            },
-            "temperature": environment_handler.last_temp,
-            "humidity": environment_handler.last_humidity
-        })
+        payload = self.codec.status_snapshot(fan_state, door_state, window_state,
+                                             environment_handler.last_temp, environment_handler.last_humidity,
+                                             self.fan_manager.duty_percent())
         if not mqtt.publish(TOPIC_RESPONSE_STATUS, payload):
             print("[ControlHandler] MQTT publish failed - status request")
-
-    def _publish_door_status(self, state):
-        """Publish door status to MQTT (used by RFID access grant)."""
-        if self.mqtt is None:
-            print("[ControlHandler] Cannot publish door status - MQTT not set")
-            return
-        import ujson
-        from config import TOPIC_STATUS_DOOR
-        from utils.time_sync import TimeSync
-
-        payload = ujson.dumps({
-            "state": state,
-            "timestamp": TimeSync().get_iso_timestamp()
-        })
-        if not self.mqtt.publish(TOPIC_STATUS_DOOR, payload):
-            print(f"[ControlHandler] MQTT publish failed - door status ({state})")
\ No newline at end of file
@@ -1,62 +1,47 @@
 from utils.memory import Memory
+from utils.deadline import Deadline
 
 class EnvironmentHandler:
-    def __init__(self):
+    def __init__(self, devices):
         self.memory = Memory()
+        self.devices = devices      # DHT11 is borrowed per read - it is read once a minute
+        self.codec = devices.get('codec')  # Per-topic payload format (JSON or struct)
         self.last_temp = None
         self.last_humidity = None
-        self.loop_counter = 59
+        self.read_deadline = Deadline()  # Not started, so the first call reads the sensor
 
     def handle_environment_detection(self, mqtt, oled_manager):
-        self.loop_counter += 1
-        if self.loop_counter < 60:
-            if oled_manager.owner is None and self.last_temp is not None:
-                oled_manager.show('environment', f"Temp: {self.last_temp}C", 10, f"Humid: {self.last_humidity}%")
+        if self.read_deadline.active() and not self.read_deadline.expired():
             return
 
-        self.loop_counter = 0
+        self.read_deadline.start(60000)  # Read DHT11 every 60 seconds
         
-        import ujson
-        from utils.time_sync import TimeSync
         from config import TOPIC_SENSOR_DATA, TOPIC_ASTHMA_ALERT
-        from sensors.dht11 import DHT11Sensor
 
-        time_sync = TimeSync()
-        dht11 = DHT11Sensor()
-        temperature, humidity = dht11.read_data()
+        temperature, humidity = self.devices.get('dht11').read_data()
+        self.devices.release('dht11')
 
         if temperature is None or humidity is None:
             print("[EnvironmentHandler] Sensor read failed - skipping update")
-            del dht11
             self.memory.collect("After environment handling (error)")
             return
 
         if not (-20 <= temperature <= 60 and 0 <= humidity <= 100):
             print(f"[EnvironmentHandler] Invalid reading - {temperature}°C, {humidity}%")
-            del dht11, time_sync
             self.memory.collect("After environment handling (invalid)")
             return
 
         self.last_temp = temperature
         self.last_humidity = humidity
         
-        oled_manager.show('environment', f"Temp: {temperature}C", 10, f"Humid: {humidity}%")
+        # Idle text - the display manager falls back to it whenever no alert owns the screen
+        oled_manager.set_idle(f"Temp: {temperature}C", f"Humid: {humidity}%")
 
         try:
-            payload = ujson.dumps({
-                "sensor_type": "temperature",
-                "value": temperature,
-                "unit": "C",
-                "timestamp": time_sync.get_iso_timestamp()
-            })
+            payload = self.codec.reading(TOPIC_SENSOR_DATA, "temperature", temperature, "C")
             if not mqtt.publish(TOPIC_SENSOR_DATA, payload):
                 print("[EnvironmentHandler] MQTT publish failed - temperature")
-            payload = ujson.dumps({
-                "sensor_type": "humidity",
-                "value": humidity,
-                "unit": "%",
-                "timestamp": time_sync.get_iso_timestamp()
-            })
+            payload = self.codec.reading(TOPIC_SENSOR_DATA, "humidity", humidity, "%")
             if not mqtt.publish(TOPIC_SENSOR_DATA, payload):
                 print("[EnvironmentHandler] MQTT publish failed - humidity")
         except Exception as e:
@@ -66,14 +51,12 @@ class EnvironmentHandler:
             oled_manager.show('environment', "ASTHMA ALERT", 10, f"Humid: {humidity}%")
 
             try:
-                payload = ujson.dumps({
+                payload = self.codec.encode(TOPIC_ASTHMA_ALERT, {
                     "sensor_type": "asthma_alert",
-                    "value": True,
-                    "timestamp": time_sync.get_iso_timestamp()
+                    "value": True
                 })
                 if not mqtt.publish(TOPIC_ASTHMA_ALERT, payload):
                     print("[EnvironmentHandler] MQTT publish failed - asthma alert")
             except Exception as e:
                 print(f"[EnvironmentHandler] Unexpected error: {e}")
-        del dht11, time_sync
         self.memory.collect("After environment handling")
\ No newline at end of file
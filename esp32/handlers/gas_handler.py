@@ -1,70 +1,60 @@
 from utils.memory import Memory
+from utils.deadline import Deadline
+from outputs.buzzer import ALARM
 
 class GasHandler:
-    def __init__(self):
+    def __init__(self, devices):
         self.memory = Memory()
         self.gas_alarm_active = False
+        self.gas = devices.get('gas')  # IRQ-backed - queues output edges between calls
+        self.codec = devices.get('codec')  # Per-topic payload format (JSON or struct)
+        self.refresh_deadline = Deadline()  # Throttles alarm display refresh while active
 
     def handle_gas_detection(self, mqtt, rgb_manager, oled_manager, buzzer_manager, button_handler, fan_manager):
-        from sensors.gas import GasSensor
-        from config import TOPIC_SENSOR_DATA, TOPIC_STATUS_FAN
-        import ujson
-        from utils.time_sync import TimeSync
-
-        gas = GasSensor()
-        time_sync = TimeSync()
-
         if not button_handler.gas_alarm_enabled:
+            # Leave queued edges alone so the level is re-read once the alarm is re-enabled
             if self.gas_alarm_active:
                 self.gas_alarm_active = False
-                fan_manager.off()
+                fan_manager.set_gas(False)
                 buzzer_manager.stop()
-            del gas, time_sync
-            self.memory.collect("After gas handling (disabled)")
+                self.memory.collect("After gas handling (disabled)")
             return
 
+        # Idle path: no edge queued, and no alarm display due for a refresh
+        if not self.gas.has_changed():
+            if not self.gas_alarm_active:
+                return
+            if self.refresh_deadline.active() and not self.refresh_deadline.expired():
+                return
+
+        from config import TOPIC_SENSOR_DATA
+
+        gas = self.gas
+
         if not self.gas_alarm_active:
             if gas.is_gas_detected():
                 self.gas_alarm_active = True
-                fan_manager.on()
-                buzzer_manager.start(duration=10)
+                fan_manager.set_gas(True)
+                buzzer_manager.play('gas_alarm', ALARM, duration=10)
 
-                payload = ujson.dumps({
-                    "sensor_type": "gas",
-                    "detected": True,
-                    "timestamp": time_sync.get_iso_timestamp()
-                })
+                payload = self.codec.event(TOPIC_SENSOR_DATA, "gas", True)
                 if not mqtt.publish(TOPIC_SENSOR_DATA, payload):
                     print("[GasHandler] MQTT publish failed - gas detection")
 
-                payload = ujson.dumps({
-                    "state": "on",
-                    "timestamp": time_sync.get_iso_timestamp()
-                })
-                if not mqtt.publish(TOPIC_STATUS_FAN, payload):
-                    print("[GasHandler] MQTT publish failed - fan status (on)")
+                fan_manager.publish_status()
 
         if self.gas_alarm_active:
+            self.refresh_deadline.start(1000)
             rgb_manager.show('gas', (255, 0, 0), 10)
             oled_manager.show('gas', "Gas", 10, "detected")
             if not gas.is_gas_detected():
                 self.gas_alarm_active = False
-                fan_manager.off()
+                fan_manager.set_gas(False)
 
-                payload = ujson.dumps({
-                    "sensor_type": "gas",
-                    "detected": False,
-                    "timestamp": time_sync.get_iso_timestamp()
-                })
+                payload = self.codec.event(TOPIC_SENSOR_DATA, "gas", False)
                 if not mqtt.publish(TOPIC_SENSOR_DATA, payload):
                     print("[GasHandler] MQTT publish failed - gas cleared")
 
-                payload = ujson.dumps({
-                    "state": "off",
-                    "timestamp": time_sync.get_iso_timestamp()
-                })
-                if not mqtt.publish(TOPIC_STATUS_FAN, payload):
-                    print("[GasHandler] MQTT publish failed - fan status (off)")
+                fan_manager.publish_status()
 
-        del gas, time_sync
         self.memory.collect("After gas handling")
\ No newline at end of file
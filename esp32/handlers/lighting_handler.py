@@ -1,20 +1,18 @@
 from utils.memory import Memory
 
 class LightingHandler:
-    def __init__(self):
+    def __init__(self, devices):
         self.memory = Memory()
+        self.time_sync = devices.get('time_sync')
+        self.devices = devices      # LED is borrowed per run - it is only touched once a minute
 
     def handle_time_based_lighting(self):
-        from utils.time_sync import TimeSync
-        from outputs.led import LED
-
-        time_sync = TimeSync()
-        led = LED()
-
-        if time_sync.is_nighttime():
+        led = self.devices.get('led')
+        if self.time_sync.is_nighttime():
             led.on()
         else:
             led.off()
+        led = None      # Drop our reference so release() can free it
+        self.devices.release('led')
 
-        del time_sync, led
-        self.memory.collect("After time-based lighting")
\ No newline at end of file
+        self.memory.collect("After time-based lighting")
@@ -1,31 +1,23 @@
 from utils.memory import Memory
 
 class MotionHandler:
-    def __init__(self):
+    def __init__(self, devices):
         self.memory = Memory()
+        self.pir = devices.get('pir')  # IRQ-backed - queues motion edges between calls
+        self.codec = devices.get('codec')  # Per-topic payload format (JSON or struct)
         
     def handle_motion_detection(self, mqtt, rgb_manager, oled_manager, button_handler):
-        from sensors.pir import PIRSensor
-        from config import TOPIC_SENSOR_DATA
-        from utils.time_sync import TimeSync
-        import ujson
-
+        if not self.pir.is_motion_detected():
+            return  # Nothing queued - skip imports and allocations on the idle path
         if not button_handler.pir_enabled:
             return
 
-        pir = PIRSensor()
-        time_sync = TimeSync()
+        from config import TOPIC_SENSOR_DATA
 
-        if pir.is_motion_detected():
-            rgb_manager.show('motion', (255, 165, 0), 3)
-            oled_manager.show('motion', "Motion Sensor", 3, "Detected")
-            payload = ujson.dumps({
-                "sensor_type": "motion",
-                "detected": True,
-                "timestamp": time_sync.get_iso_timestamp()
-            })
-            if not mqtt.publish(TOPIC_SENSOR_DATA, payload):
-                print("[MotionHandler] MQTT publish failed - motion detection")
+        rgb_manager.show('motion', (255, 165, 0), 3)
+        oled_manager.show('motion', "Motion Sensor", 3, "Detected")
+        payload = self.codec.event(TOPIC_SENSOR_DATA, "motion", True)
+        if not mqtt.publish(TOPIC_SENSOR_DATA, payload):
+            print("[MotionHandler] MQTT publish failed - motion detection")
 
-        del pir, time_sync
-        self.memory.collect("After motion handling")
\ No newline at end of file
+        self.memory.collect("After motion handling")
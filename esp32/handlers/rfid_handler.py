@@ -1,41 +1,52 @@
 from utils.memory import Memory
-from sensors.rfid import RFIDSensor
 
 class RFIDHandler:
-    def __init__(self):
+    def __init__(self, devices, card_cache=None, control=None):
         self.memory = Memory()
-        self.rfid = RFIDSensor()
+        self.rfid = devices.get('rfid')
+        self.time_sync = devices.get('time_sync')
+        self.card_cache = card_cache
+        self.control = control
 
     def handle_rfid_detection(self, mqtt, oled_manager):
         from config import TOPIC_RFID_REQUEST
         import ujson
-        from utils.time_sync import TimeSync
-
-        time_sync = TimeSync()
 
         if self.rfid.scan_card():
             card_id = self.rfid.get_card_id()
             print(f"[RFIDHandler] Card detected: {card_id}")
         else:
-            del time_sync
-            self.memory.collect("After RFID detection")
             return
 
         if card_id:
             self.rfid.clear_card()
 
-            payload = ujson.dumps({
+            request = {
                 "card_id": card_id,
-                "timestamp": time_sync.get_iso_timestamp()
-            })
+                "timestamp": self.time_sync.get_iso_timestamp()
+            }
+            # Allowlist hit: open now, then report the scan for the audit log (queued if offline).
+            # Misses still go to the API, which may know about newly added cards - but only
+            # live: a check replayed from the outbox minutes later must not open the door.
+            local = self.card_cache is not None and self.control is not None and self.card_cache.is_authorised(card_id)
+            if local:
+                self.control.grant_access(card_id)
+                request["local_decision"] = "granted"
+            else:
+                oled_manager.show('rfid', "Card", 2, "detected")
+
+            payload = ujson.dumps(request)
             print(f"[RFIDHandler] Publishing RFID request: {payload}")
-            if mqtt.publish(TOPIC_RFID_REQUEST, payload):
+            if mqtt.publish(TOPIC_RFID_REQUEST, payload, queue=local):
                 print(f"[RFIDHandler] RFID validation request sent to {TOPIC_RFID_REQUEST}")
+                if not local and self.control is not None:
+                    self.control.expect_response(card_id)
+            elif local:
+                print("[RFIDHandler] MQTT publish failed - RFID audit record queued")
             else:
-                print("[RFIDHandler] MQTT publish failed - RFID request (card cleared to prevent re-scan)")
-            oled_manager.show('rfid', "Card", 2, "detected")
+                print("[RFIDHandler] MQTT offline - RFID check dropped, card must be presented again")
+                oled_manager.show('rfid', "Offline", 3, "Try again")
         else:
             print(f"[RFIDHandler] Card scan succeeded but card_id is None/empty")
 
-        del time_sync
         self.memory.collect("After RFID detection")
\ No newline at end of file
@@ -1,46 +1,36 @@
 from utils.memory import Memory
+from utils.deadline import Deadline
+from outputs.rgb import BLINK
+
+STEAM_COOLDOWN_MS = 60000   # Same re-arm time as the old six-tick flash countdown
 
 class SteamHandler:
-    def __init__(self):
+    def __init__(self, devices):
         self.memory = Memory()
-        self.flash_count = 0
+        self.devices = devices      # Steam sensor is borrowed per check - it is read every 10 s
+        self.codec = devices.get('codec')  # Per-topic payload format (JSON or struct)
+        self.cooldown = Deadline()
 
     def handle_steam_detection(self, mqtt, rgb_manager, oled_manager, window_servo_manager):
-        from sensors.steam import SteamSensor
         from config import TOPIC_SENSOR_DATA, TOPIC_STATUS_WINDOW
-        import ujson
-        from utils.time_sync import TimeSync
 
-        steam = SteamSensor()
-        time_sync = TimeSync()
+        detected = self.devices.get('steam').is_moisture_detected()
+        self.devices.release('steam')
 
-        if steam.is_moisture_detected():
-            if self.flash_count == 0:
-                self.flash_count = 6
+        if detected:
+            if not self.cooldown.active() or self.cooldown.expired():
+                self.cooldown.start(STEAM_COOLDOWN_MS)
                 window_servo_manager.close()
+                # RGBManager animates the blink itself, so one request covers the whole alert
+                rgb_manager.show('steam', (0, 0, 255), 6, BLINK, 1000)
+                oled_manager.show('steam', "Steam", 3, "detected")
 
-                payload = ujson.dumps({
-                    "sensor_type": "steam",
-                    "detected": True,
-                    "timestamp": time_sync.get_iso_timestamp()
-                })
+                payload = self.codec.event(TOPIC_SENSOR_DATA, "steam", True)
                 if not mqtt.publish(TOPIC_SENSOR_DATA, payload):
                     print("[SteamHandler] MQTT publish failed - steam detection")
 
-                payload = ujson.dumps({
-                    "state": "closed",
-                    "timestamp": time_sync.get_iso_timestamp()
-                })
+                payload = self.codec.status(TOPIC_STATUS_WINDOW, "closed")
                 if not mqtt.publish(TOPIC_STATUS_WINDOW, payload):
                     print("[SteamHandler] MQTT publish failed - window status")
 
-        if self.flash_count > 0:
-            oled_manager.show('steam', "Steam", 3, "detected")
-            self.flash_count -= 1
-            if self.flash_count % 2 == 0:
-                rgb_manager.show('steam', (0, 0, 255), 1)
-            else:
-                rgb_manager.show('steam', (0, 0, 0), 1)
-
-        del steam, time_sync
         self.memory.collect("After steam handling")
\ No newline at end of file
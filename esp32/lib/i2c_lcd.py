@@ -12,10 +12,18 @@ MASK_E = 0x04
 SHIFT_BACKLIGHT = 3 
 SHIFT_DATA = 4 
 class I2cLcd(LcdApi): 
-    """Implements a HD44780 character LCD connected via PCF8574 on I2C.""" 
+    """Implements a HD44780 character LCD connected via PCF8574 on I2C. 
+    Each LCD byte is sent as four PCF8574 writes (high nibble with E high, E low, 
+    then the low nibble). Those are packed into preallocated buffers so a command 
+    is one writeto, and write_burst() sends a whole run of characters in one writeto. 
+    """ 
     def __init__(self, i2c, i2c_addr, num_lines, num_columns): 
         self.i2c = i2c 
         self.i2c_addr = i2c_addr 
+        self.transactions = 0   # writeto calls issued - for display traffic stats 
+        self._one = bytearray(4) 
+        self._burst = bytearray(4 * num_columns) 
+        self._burst_view = memoryview(self._burst) 
         self.i2c.writeto(self.i2c_addr, bytearray([0])) 
         sleep_ms(20)   # Allow LCD time to powerup 
         # Send reset 3 times 
@@ -33,37 +41,73 @@ class I2cLcd(LcdApi):
         if num_lines > 1: 
             cmd |= self.LCD_FUNCTION_2LINES 
         self.hal_write_command(cmd) 
+    def _pack(self, buf, at, flags, value): 
+        """Write the 4-byte E-high/E-low sequence for one LCD byte into buf at offset at.""" 
+        byte = flags | (((value >> 4) & 0x0f) << SHIFT_DATA) 
+        buf[at] = byte | MASK_E 
+        buf[at + 1] = byte 
+        byte = flags | ((value & 0x0f) << SHIFT_DATA) 
+        buf[at + 2] = byte | MASK_E 
+        buf[at + 3] = byte 
     def hal_write_init_nibble(self, nibble): 
         """Writes an initialization nibble to the LCD. 
         This particular function is only used during initialization. 
         """ 
         byte = ((nibble >> 4) & 0x0f) << SHIFT_DATA 
-        self.i2c.writeto(self.i2c_addr, bytearray([byte | MASK_E])) 
-        self.i2c.writeto(self.i2c_addr, bytearray([byte])) 
+        self.i2c.writeto(self.i2c_addr, bytes((byte | MASK_E, byte))) 
+        self.transactions += 1 
     def hal_backlight_on(self): 
         """Allows the hal layer to turn the backlight on.""" 
         self.i2c.writeto(self.i2c_addr, bytearray([1 << SHIFT_BACKLIGHT])) 
+        self.transactions += 1 
     def hal_backlight_off(self): 
         """Allows the hal layer to turn the backlight off.""" 
         self.i2c.writeto(self.i2c_addr, bytearray([0])) 
+        self.transactions += 1 
     def hal_write_command(self, cmd): 
         """Writes a command to the LCD. 
         Data is latched on the falling edge of E. 
         """ 
-        byte = ((self.backlight << SHIFT_BACKLIGHT) | (((cmd >> 4) & 0x0f) << SHIFT_DATA)) 
-        self.i2c.writeto(self.i2c_addr, bytearray([byte | MASK_E])) 
-        self.i2c.writeto(self.i2c_addr, bytearray([byte])) 
-        byte = ((self.backlight << SHIFT_BACKLIGHT) | ((cmd & 0x0f) << SHIFT_DATA)) 
-        self.i2c.writeto(self.i2c_addr, bytearray([byte | MASK_E])) 
-        self.i2c.writeto(self.i2c_addr, bytearray([byte])) 
+        self._pack(self._one, 0, self.backlight << SHIFT_BACKLIGHT, cmd) 
+        self.i2c.writeto(self.i2c_addr, self._one) 
+        self.transactions += 1 
         if cmd <= 3: 
             # The home and clear commands require a worst case delay of 4.1 msec 
             sleep_ms(5) 
     def hal_write_data(self, data): 
         """Write data to the LCD.""" 
-        byte = (MASK_RS | (self.backlight << SHIFT_BACKLIGHT) | (((data >> 4) & 0x0f) << SHIFT_DATA)) 
-        self.i2c.writeto(self.i2c_addr, bytearray([byte | MASK_E])) 
-        self.i2c.writeto(self.i2c_addr, bytearray([byte])) 
-        byte = (MASK_RS | (self.backlight << SHIFT_BACKLIGHT) | ((data & 0x0f) << SHIFT_DATA)) 
-        self.i2c.writeto(self.i2c_addr, bytearray([byte | MASK_E])) 
-        self.i2c.writeto(self.i2c_addr, bytearray([byte]))
\ No newline at end of file
+        self._pack(self._one, 0, MASK_RS | (self.backlight << SHIFT_BACKLIGHT), data) 
+        self.i2c.writeto(self.i2c_addr, self._one) 
+        self.transactions += 1 
+    def write_burst(self, data, start=0, count=None): 
+        """Write count bytes of data (from offset start) at the cursor, one writeto per line-sized chunk. 
+        At 100 kHz each PCF8574 byte takes ~90 us, far longer than the 37 us the 
+        LCD needs per character, so no delays are needed inside the burst. 
+        The cursor is not moved back - callers that track it (putstr) update it. 
+        """ 
+        if count is None: 
+            count = len(data) - start 
+        flags = MASK_RS | (self.backlight << SHIFT_BACKLIGHT) 
+        chunk = len(self._burst) // 4 
+        while count > 0: 
+            n = count if count < chunk else chunk 
+            for i in range(n): 
+                self._pack(self._burst, i * 4, flags, data[start + i]) 
+            if n == chunk: 
+                self.i2c.writeto(self.i2c_addr, self._burst) 
+            else: 
+                self.i2c.writeto(self.i2c_addr, self._burst_view[:n * 4]) 
+            self.transactions += 1 
+            start += n 
+            count -= n 
+    def putstr(self, string): 
+        """Burst-write string when it fits on the current line; otherwise fall back 
+        to LcdApi.putstr, which handles newlines and wrapping one character at a time. 
+        """ 
+        data = string.encode() 
+        if len(data) != len(string) or '\n' in string or self.cursor_x + len(string) >= self.num_columns: 
+            LcdApi.putstr(self, string) 
+            return 
+        self.write_burst(data) 
+        self.cursor_x += len(string) 
+        self.implied_newline = False 
@@ -1,15 +1,34 @@
 from machine import Pin
 import time
 from mfrc522_config import mfrc522Config
-from soft_iic import softIIC
+from soft_iic import softIIC, IICNackError
+
+class RFIDTimeoutError(Exception):
+    """Raised when the MFRC522 does not finish a command before its deadline."""
+    pass
 
 class mfrc522(mfrc522Config,softIIC):
+    command_timeout_ms = 40   # Wait limit per command - longer than the 25 ms chip timer set in PCD_Init()
+    budget_due = None         # Optional ticks_ms deadline for a whole scan, set by the caller
    
     def __init__(self, scl_, sda_, addr_):
         # Invoke the parent class's constructor
         softIIC.__init__(self, scl_, sda_, addr_)
 
 
+    # Deadline for a command wait loop: command_timeout_ms from now, or the scan budget if sooner.
+    def _wait_deadline(self):
+        due = time.ticks_add(time.ticks_ms(), self.command_timeout_ms)
+        if self.budget_due is not None and time.ticks_diff(self.budget_due, due) < 0:
+            return self.budget_due
+        return due
+
+
+    # Return the bus to idle after a NACK or timeout.
+    def PCD_Recover(self):
+        self.IIC_recover()
+
+
     # Writes a byte to the specified register in the MFRC522 chip.
     # The interface is described in the datasheet section 8.1.2. 
     def PCD_WriteRegister(self,  
@@ -112,10 +131,14 @@ class mfrc522(mfrc522Config,softIIC):
     def PCD_Reset(self):
         # Issue the SoftReset command.
         self.PCD_WriteRegister(self.CommandReg, self.PCD_SoftReset)
-        time.sleep(1)
-        
-        if self.PCD_ReadRegister(self.CommandReg) & (1<<4):
-            print("Reset error!")
+        # The oscillator needs ~38us to start. Poll PowerDown instead of sleeping a full second.
+        deadline = time.ticks_add(time.ticks_ms(), 150)
+        time.sleep_ms(50)
+        while self.PCD_ReadRegister(self.CommandReg) & (1<<4):
+            if time.ticks_diff(deadline, time.ticks_ms()) <= 0:
+                print("Reset error!")
+                break
+            time.sleep_ms(5)
 
 
     # Turns the antenna on by enabling pins TX1 and TX2.
@@ -166,13 +189,15 @@ class mfrc522(mfrc522Config,softIIC):
         self.PCD_SetRegisterBitMask(self.FIFOLevelReg, 0x80)        # FlushBuffer = 1, FIFO initialization
         self.PCD_WriteRegister_(self.FIFODataReg, length, data)      # Write data to the FIFO
         self.PCD_WriteRegister(self.CommandReg, self.PCD_CalcCRC)   # Start the calculation
-        # Wait for the CRC calculation to complete. Each iteration of the while-loop takes 17.73�s.
+        # Wait for the CRC calculation to complete.
+        deadline = self._wait_deadline()
         while True:
             n = self.PCD_ReadRegister(self.DivIrqReg)    # DivIrqReg[7..0] bits are: Set2 reserved reserved MfinActIRq reserved CRCIRq reserved reserved
             if (n & 0x04):                               # CRCIRq bit set - calculation done
                 break
-            if (--i == 0):                               # The emergency break. We will eventually terminate on this one after 89ms. Communication with the MFRC522 might be down.
-                return self.STATUS_TIMEOUT
+            if time.ticks_diff(deadline, time.ticks_ms()) <= 0:  # The emergency break. Communication with the MFRC522 might be down.
+                self.PCD_WriteRegister(self.CommandReg, self.PCD_Idle)
+                raise RFIDTimeoutError("CRC calculation timed out")
         self.PCD_WriteRegister(self.CommandReg, self.PCD_Idle)     # Stop calculating CRC for new content in the FIFO. 
         
         # Transfer the result from the registers to the result buffer
@@ -230,16 +255,18 @@ class mfrc522(mfrc522Config,softIIC):
 
         # Wait for the command to complete.
         # In PCD_Init() we set the TAuto flag in TModeReg. This means the timer automatically starts when the PCD stops transmitting.
-        # Each iteration of the do-while-loop takes 17.86�s.
-        i = 2000
+        # The chip timer (TimerIRq) ends the wait for a normal no-card timeout. The ticks_ms
+        # deadline only fires if the MFRC522 stops responding.
+        deadline = self._wait_deadline()
         while True:
             n = self.PCD_ReadRegister(self.ComIrqReg)    #ComIrqReg[7..0] bits are: Set1 TxIRq RxIRq IdleIRq HiAlertIRq LoAlertIRq ErrIRq TimerIRq
             if n & waitIRq:
                 break
             if n & 0x01:
                 return self.STATUS_TIMEOUT
-            if --i == 0:
-                return self.STATUS_TIMEOUT
+            if time.ticks_diff(deadline, time.ticks_ms()) <= 0:
+                self.PCD_WriteRegister(self.CommandReg, self.PCD_Idle)
+                raise RFIDTimeoutError("Command 0x{:02X} timed out".format(command))
         
         # Stop now if any errors except collisions were detected.
         errorRegValue = self.PCD_ReadRegister(self.ErrorReg)    # ErrorReg[7..0] bits are: WrErr TempErr reserved BufferOvfl CollErr CRCErr ParityErr ProtocolErr
@@ -479,7 +506,7 @@ class mfrc522(mfrc522Config,softIIC):
                     buffer[i] = responseBuffer[i-bufferFlag]
 
                 if result == self.STATUS_COLLISION:    # More than one PICC in the field => collision.
-                    result = self.PCD_ReadRegister(CollReg) # CollReg[7..0] bits are: ValuesAfterColl reserved CollPosNotValid CollPos[4:0]
+                    result = self.PCD_ReadRegister(self.CollReg) # CollReg[7..0] bits are: ValuesAfterColl reserved CollPosNotValid CollPos[4:0]
                     if result & 0x20:
                         return self.STATUS_COLLISION   # Without a valid collision position we cannot continue
                     collisionPos = result & 0x1F       # Values 0-31, 0 means bit 32.
@@ -578,4 +605,64 @@ class mfrc522(mfrc522Config,softIIC):
         print("MFRC522 Software Version:" + version)
 
 
+# MFRC522 driver over a machine.I2C / SoftI2C bus object instead of the bit-banged softIIC.
+# Each register access is one readfrom_mem/writeto_mem call, FIFO transfers are a single
+# multi-byte transaction, and no Pin objects are created per access. Because the bus object
+# is passed in, it can be shared with other devices on the same pins (the LCD1602 at 0x27).
+class mfrc522_hwi2c(mfrc522):
+
+    def __init__(self, i2c, addr_):
+        self.i2c  = i2c
+        self.addr = addr_
+        self._reg_buf = bytearray(1)   # Reused for single-register reads/writes
+
+
+    # The bus driver already sends STOP after a failed transfer, so there is nothing to clock out.
+    # Touching the pins directly here would break the shared bus for the LCD.
+    def PCD_Recover(self):
+        pass
+
 
+    # Writes a byte to the specified register in the MFRC522 chip.
+    def PCD_WriteRegister(self, _reg, _dat):
+        self._reg_buf[0] = _dat
+        try:
+            self.i2c.writeto_mem(self.addr, _reg, self._reg_buf)
+        except OSError as e:
+            raise IICNackError("I2C write failed: {}".format(e))
+
+
+    # Writes count bytes from lst to the specified register (FIFO writes) in one transaction.
+    def PCD_WriteRegister_(self, reg, count, lst):
+        if count == 0:
+            return
+        try:
+            self.i2c.writeto_mem(self.addr, reg, bytes(lst[0:count]))
+        except OSError as e:
+            raise IICNackError("I2C write failed: {}".format(e))
+
+
+    # Reads a byte from the specified register in the MFRC522 chip.
+    def PCD_ReadRegister(self, _reg):
+        try:
+            self.i2c.readfrom_mem_into(self.addr, _reg, self._reg_buf)
+        except OSError as e:
+            raise IICNackError("I2C read failed: {}".format(e))
+        return self._reg_buf[0]
+
+
+    # Reads count bytes from the specified register (FIFO reads) in one transaction.
+    # Only bit positions rxAlign..7 in values[0] are updated.
+    def PCD_ReadRegister_(self, reg, count, values, rxAlign = 0):
+        if count == 0:
+            return
+        first = values[0]
+        try:
+            data = self.i2c.readfrom_mem(self.addr, reg, count)
+        except OSError as e:
+            raise IICNackError("I2C read failed: {}".format(e))
+        for i in range(count):
+            values[i] = data[i]
+        if rxAlign != 0:
+            mask = (0xFF << rxAlign) & 0xFF
+            values[0] = (first & ~mask) | (data[0] & mask)
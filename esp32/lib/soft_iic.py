@@ -1,6 +1,10 @@
 from machine import Pin
 import time
 
+class IICNackError(OSError):
+    """Raised when the slave does not acknowledge a byte."""
+    pass
+
 class softIIC:
 
     def __init__(self, scl_, sda_, addr_):
@@ -67,11 +71,24 @@ class softIIC:
             time.sleep_us(1)
             i = i+1
             if i>20:
-                while 1 :
-                    print("IIC slave device not ack")
-                    time.sleep(1)
-                #return
-                    
+                # Release the bus and let the caller decide how to recover
+                self.IIC_stop()
+                raise IICNackError("IIC slave device not ack")
+
+
+    # Clock out up to 9 pulses so a slave stuck mid-byte releases SDA, then issue a STOP.
+    def IIC_recover(self):
+        Pin_sda = Pin(self.sda, Pin.IN, Pin.PULL_UP)
+        Pin_scl = Pin(self.scl, Pin.OUT, value=1)
+        for i in range(9):
+            if Pin_sda.value() == 1:
+                break
+            Pin_scl.value(0)
+            time.sleep_us(5)
+            Pin_scl.value(1)
+            time.sleep_us(5)
+        self.IIC_stop()
+
 
     def IIC_read_byte(self):
         dat = 0
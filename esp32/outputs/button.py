@@ -1,11 +1,43 @@
 from machine import Pin
+from utils.irq_input import IRQInput
+import time
 
 BUTTON_GAS_ALARM_PIN = 16
 BUTTON_PIR_TOGGLE_PIN = 27
+RELEASE_STABLE_MS = 100     # Button must stay released this long before the next fall counts as a press
 
 class Button:
-    def __init__(self, pin):
-        self.button = Pin(pin, Pin.IN, Pin.PULL_UP)
+    """Push button to ground with the internal pull-up, so pressed reads 0.
+
+    The IRQ queues both edges. A press is a 1 -> 0 transition after the button
+    has been released for RELEASE_STABLE_MS, so a release bounce that lands
+    after the debounce window cannot count as a second press.
+    """
+
+    def __init__(self, pin, stable_ms=RELEASE_STABLE_MS):
+        self.button = IRQInput(pin, Pin.PULL_UP, trigger=Pin.IRQ_FALLING | Pin.IRQ_RISING, debounce_ms=50)
+        self.stable_ms = stable_ms
+        self.level = self.button.value()
+        self.high_since = time.ticks_add(time.ticks_ms(), -stable_ms)
 
     def is_pressed(self):
         return self.button.value() == 0
+
+    def was_pressed(self):
+        """True if the button was pressed since the last call (drains queued edges)."""
+        # A bounce can leave the last queued edge low while the button is released
+        self.button.resync()
+        pressed = False
+        while True:
+            level = self.button.pop()
+            if level < 0:
+                return pressed
+            if level == self.level:
+                continue    # Repeated level - not a transition
+            at = self.button.popped_ms
+            if level == 0:
+                if time.ticks_diff(at, self.high_since) >= self.stable_ms:
+                    pressed = True
+            else:
+                self.high_since = at
+            self.level = level
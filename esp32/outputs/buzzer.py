@@ -1,38 +1,190 @@
-from machine import Pin, PWM
+from utils.timers import Timer
+import time
+
+BUZZER_MW = 150     # Passive buzzer at full drive - used for energy estimates
+DUTY = 10           # Default 10-bit duty - quiet but clearly audible
+
+# Pattern priorities - a pattern only replaces one of equal or lower priority
+INFO = 0
+WARNING = 1
+ALARM = 2
+
+# Patterns are tuples of (frequency Hz, duration ms, duty) steps. Frequency 0 is a rest.
+TONE = ((1000, 1000, DUTY),)
+GAS_ALARM = ((880, 250, DUTY), (1320, 250, DUTY))   # Two-tone siren
+ACCESS_DENIED = ((400, 150, DUTY), (0, 100, 0), (400, 150, DUTY), (0, 600, 0))
+ACCESS_GRANTED = ((1320, 80, DUTY), (1760, 120, DUTY))
+
+# Happy birthday from docs/reference-code/pj4_1_music.py
+BIRTHDAY = tuple((freq, 250, DUTY) for freq in (
+    294, 440, 392, 532, 494, 392, 440, 392, 587, 532,
+    392, 784, 659, 532, 494, 440, 698, 659, 532, 587)) + ((532, 500, DUTY),)
+
+PATTERNS = {
+    'tone': TONE,
+    'gas_alarm': GAS_ALARM,
+    'access_denied': ACCESS_DENIED,
+    'access_granted': ACCESS_GRANTED,
+    'birthday': BIRTHDAY,
+}
+
+MORSE = {
+    'A': '.-', 'B': '-...', 'C': '-.-.', 'D': '-..', 'E': '.', 'F': '..-.',
+    'G': '--.', 'H': '....', 'I': '..', 'J': '.---', 'K': '-.-', 'L': '.-..',
+    'M': '--', 'N': '-.', 'O': '---', 'P': '.--.', 'Q': '--.-', 'R': '.-.',
+    'S': '...', 'T': '-', 'U': '..-', 'V': '...-', 'W': '.--', 'X': '-..-',
+    'Y': '-.--', 'Z': '--..', '0': '-----', '1': '.----', '2': '..---',
+    '3': '...--', '4': '....-', '5': '.....', '6': '-....', '7': '--...',
+    '8': '---..', '9': '----.',
+}
+
+def morse(text, unit_ms=80, freq=800, duty=DUTY):
+    """Pattern that keys text in Morse - dot 1 unit, dash 3, gaps 1/3/7 units."""
+    steps = []
+    for word in text.upper().split():
+        if steps:
+            steps.append((0, 7 * unit_ms, 0))      # Word gap
+        for letter in word:
+            code = MORSE.get(letter)
+            if code is None:
+                continue
+            if steps and steps[-1][0]:
+                steps.append((0, 3 * unit_ms, 0))  # Letter gap
+            for i, symbol in enumerate(code):
+                if i:
+                    steps.append((0, unit_ms, 0))
+                steps.append((freq, unit_ms if symbol == '.' else 3 * unit_ms, duty))
+    return tuple(steps)
 
 class Buzzer:
     def __init__(self):
-        self.buzzer = PWM(Pin(25))
-        self.buzzer.duty(0)     # Ensure buzzer starts silent
+        import config
+        from outputs.power import get_power
+        # Channel starts released with the pin held low, so the buzzer starts silent
+        self.buzzer = get_power().channel('buzzer', 25, 1000, BUZZER_MW)
+        self.idle_ms = getattr(config, 'PWM_IDLE_MS', 2000)
+        self.freq = None
         self.is_running = False
 
-    def start(self):
-        self.buzzer.freq(1000)
-        self.buzzer.duty(10)  # ~10% duty cycle (quieter)
+    def tone(self, freq, duty=DUTY):
+        """Sound freq Hz, or go quiet (keeping the channel armed) for freq 0."""
+        if not freq or not duty:
+            if self.buzzer.armed():
+                self.buzzer.pwm.duty(0)
+            self.buzzer.load(0)
+            return
+        armed = self.buzzer.armed()
+        pwm = self.buzzer.arm()
+        if freq != self.freq or not armed:
+            pwm.freq(freq)
+            self.freq = freq
+        pwm.duty(duty)
+        self.buzzer.load(duty * 1000 // 1023)
         self.is_running = True
 
+    def start(self):
+        self.tone(1000)
+
     def stop(self):
-        self.buzzer.duty(0)
+        self.tone(0)
+        self.buzzer.park(self.idle_ms)
         self.is_running = False
 
 class BuzzerManager:
+    """Plays tone patterns without blocking.
+
+    update() runs from the 10 ms 'buzzer' scheduler job and moves to the next
+    step when the current one's time is up. Step times are chained from the
+    previous step's due time rather than from when update() happened to run, so
+    job jitter never accumulates across a melody. A pattern is refused while one
+    of higher priority plays; otherwise it pre-empts the current one.
+    """
+
     def __init__(self):
         self.buzzer = Buzzer()
-        self.countdown = 0
+        self.deadline = Timer(self._expire, name='buzzer')     # Whole-pattern duration for repeating patterns
         self.is_running = False
+        self.pattern = None
+        self.name = None
+        self.priority = INFO
+        self.repeat = False
+        self.index = 0
+        self.step_due = 0
+        self.played = 0
+        self.preempted = 0
+        self.refused = 0
 
     def start(self, duration):
-        self.buzzer.start()
+        """Constant 1 kHz tone for duration seconds."""
+        self.play('tone', WARNING, duration)
+
+    def play(self, pattern, priority=INFO, duration=None):
+        """Play a pattern by PATTERNS name or as a step tuple.
+
+        With duration (seconds) the pattern repeats until it runs out; without,
+        it plays once. Returns False if a higher-priority pattern is playing.
+        """
+        if self.is_running and priority < self.priority:
+            self.refused += 1
+            return False
+        if self.is_running:
+            self.preempted += 1
+        name = pattern if isinstance(pattern, str) else 'custom'
+        if isinstance(pattern, str):
+            pattern = PATTERNS[pattern]
+        self.pattern = pattern
+        self.name = name
+        self.priority = priority
+        self.repeat = duration is not None
+        if self.repeat:
+            self.deadline.start(duration * 1000)
+        else:
+            self.deadline.cancel()
+        self.index = 0
+        self.step_due = time.ticks_add(time.ticks_ms(), pattern[0][1])
         self.is_running = True
-        self.countdown = duration
+        self.played += 1
+        freq, _, duty = pattern[0]
+        self.buzzer.tone(freq, duty)
+        return True
 
     def stop(self):
         self.buzzer.stop()
         self.is_running = False
-        self.countdown = 0
+        self.pattern = None
+        self.name = None
+        self.priority = INFO
+        self.deadline.cancel()
+
+    def _expire(self):
+        if self.is_running:
+            self.stop()
 
     def update(self):
-        if self.countdown > 0:
-            self.countdown -= 1
-            if self.countdown == 0 and self.is_running:
-                self.stop()
\ No newline at end of file
+        """Advance to the next step when due. Timed repeats are ended by the timer service."""
+        if not self.is_running:
+            return
+        now = time.ticks_ms()
+        if time.ticks_diff(now, self.step_due) < 0:
+            return
+        pattern = self.pattern
+        # Skip any steps the job was too late for, so the pattern stays on time
+        while time.ticks_diff(now, self.step_due) >= 0:
+            self.index += 1
+            if self.index >= len(pattern):
+                if not self.repeat:
+                    self.stop()
+                    return
+                self.index = 0
+            self.step_due = time.ticks_add(self.step_due, pattern[self.index][1])
+        freq, _, duty = pattern[self.index]
+        self.buzzer.tone(freq, duty)
+
+    def stats(self):
+        return {
+            "playing": self.name,
+            "priority": self.priority,
+            "played": self.played,
+            "preempted": self.preempted,
+            "refused": self.refused,
+        }
@@ -1,36 +1,205 @@
-from machine import Pin, PWM
+from machine import Pin
+import time
+
+FAN_MW = 1000       # Motor at 5 V through the L9110 - used for energy estimates
+FULL_DUTY = 1023
+MIN_DUTY = 350      # Below this the motor stalls - 1% speed maps here
+ON_DUTY = 700       # Plain on() - the original fixed speed
+
+MANUAL = 'manual'
+AUTO = 'auto'
 
 class Fan:
     def __init__(self):
-        self._ina = PWM(Pin(19, Pin.OUT), 10000)
-        self._inb = PWM(Pin(18, Pin.OUT), 10000)
+        import config
+        from outputs.power import get_power
+        # Only one direction is used, so INA is held low as a plain output rather
+        # than a PWM at duty 0 - saves an LEDC channel
+        self._ina = Pin(19, Pin.OUT, value=0)
+        self._inb = get_power().channel('fan', 18, 10000, FAN_MW)
+        self.idle_ms = getattr(config, 'PWM_IDLE_MS', 2000)
+        self.duty = 0
         self._is_on = None
 
-    def on(self):
-        self._ina.duty(0)
-        self._inb.duty(700)
+    def set_duty(self, duty):
+        """Drive INB at duty (0-1023). 0 stops the motor and parks the channel."""
+        if duty <= 0:
+            self.off()
+            return
+        duty = min(duty, FULL_DUTY)
+        if duty != self.duty or not self._inb.armed():
+            self._inb.arm().duty(duty)
+            self._inb.load(duty * 1000 // FULL_DUTY)
+            self.duty = duty
         self._is_on = True
 
+    def on(self):
+        self.set_duty(ON_DUTY)
+
     def off(self):
-        self._ina.duty(0)
-        self._inb.duty(0)
+        if self._inb.armed():
+            self._inb.pwm.duty(0)
+        self._inb.load(0)
+        self._inb.park(self.idle_ms)
+        self.duty = 0
         self._is_on = False
 
     def is_on(self):
         return self._is_on
 
 class FanManager:
+    """Variable-speed fan with soft start and an optional closed-loop mode.
+
+    Speed requests set a target duty; update() (100 ms outputs job) ramps the
+    actual duty towards it at FAN_RAMP_MS from stop to full, starting from
+    MIN_DUTY so the motor never sits stalled. Speed drops take effect at once.
+
+    In AUTO mode control() - run from the 'fan_control' job - sets the speed
+    from a PI loop on DHT11 temperature above FAN_TARGET_TEMP, plus a
+    proportional term for humidity above FAN_TARGET_HUMIDITY. While gas is
+    detected it runs at full speed. The integral is clamped to the output range
+    so it cannot wind up while the fan is saturated. Any manual command
+    (on/off/set_speed) switches back to MANUAL.
+
+    Status messages carry the duty actually being driven, so one is sent when
+    a ramp finishes as well as when a command is applied.
+    """
+
     def __init__(self):
+        import config
         self.fan = Fan()
-        self.is_on = False 
-    
+        self.is_on = False
+        self.mode = MANUAL
+        self.target_duty = 0
+        self.ramp_ms = getattr(config, 'FAN_RAMP_MS', 2000)
+        self.target_temp = getattr(config, 'FAN_TARGET_TEMP', 26)
+        self.target_humidity = getattr(config, 'FAN_TARGET_HUMIDITY', 60)
+        self.kp = getattr(config, 'FAN_KP', 20)         # % per degree C over target
+        self.ki = getattr(config, 'FAN_KI', 2)          # % per degree C-minute
+        self.kh = getattr(config, 'FAN_KH', 2)          # % per % humidity over target
+        self.integral = 0                               # degree C-minutes
+        self.temperature = None
+        self.humidity = None
+        self.gas = False
+        self.tick = time.ticks_ms()
+        self.control_tick = time.ticks_ms()
+        self.mqtt = None
+        self.codec = None
+        self.published = None   # (state, duty %) last sent, to publish only on change
+
+    def set_mqtt(self, mqtt, codec):
+        self.mqtt = mqtt
+        self.codec = codec
+
     def on(self):
-        self.fan.on()
-        self.is_on = True
+        self.mode = MANUAL
+        self._set_target(ON_DUTY)
 
     def off(self):
-        self.fan.off()
-        self.is_on = False
-    
+        self.mode = MANUAL
+        self._set_target(0)
+
+    def set_speed(self, percent):
+        """Manual speed, 0-100 %. 0 stops the fan."""
+        self.mode = MANUAL
+        self._set_speed(percent)
+
+    def set_mode(self, mode):
+        self.mode = mode
+        if mode == AUTO:
+            self.integral = 0
+            self.control_tick = time.ticks_ms()
+
+    def _set_speed(self, percent):
+        percent = max(0, min(100, int(percent)))
+        self._set_target(0 if percent == 0 else MIN_DUTY + (FULL_DUTY - MIN_DUTY) * percent // 100)
+
+    def _set_target(self, duty):
+        self.target_duty = duty
+        self.is_on = duty > 0
+        if duty < self.fan.duty or duty == 0:
+            self.fan.set_duty(duty)
+        elif self.fan.duty < MIN_DUTY:
+            # Kick straight to the stall threshold, then ramp
+            self.fan.set_duty(min(duty, MIN_DUTY))
+        self.tick = time.ticks_ms()
+
+    def set_gas(self, detected):
+        """Gas alarm state. Manual mode keeps the plain on/off behaviour."""
+        self.gas = detected
+        if self.mode == MANUAL:
+            if detected:
+                self.on()
+            else:
+                self.off()
+        else:
+            self.control()
+
+    def control(self, temperature=None, humidity=None):
+        """AUTO mode step. Returns the commanded speed in %, or None in MANUAL."""
+        if self.mode != AUTO:
+            return None
+        now = time.ticks_ms()
+        dt_min = time.ticks_diff(now, self.control_tick) / 60000
+        self.control_tick = now
+        if temperature is not None:
+            self.temperature = temperature
+        if humidity is not None:
+            self.humidity = humidity
+        temperature = self.temperature
+        humidity = self.humidity
+
+        if self.gas:
+            percent = 100
+        elif temperature is None:
+            percent = 0
+        else:
+            error = temperature - self.target_temp
+            # A fan cannot cool below ambient, so the integral never goes negative,
+            # and it stops growing once it alone would drive the fan flat out
+            self.integral = max(0, min(100 / self.ki if self.ki else 0, self.integral + error * dt_min))
+            output = self.kp * error + self.ki * self.integral
+            if humidity is not None and humidity > self.target_humidity:
+                output += self.kh * (humidity - self.target_humidity)
+            percent = max(0, min(100, int(output)))
+        self._set_speed(percent)
+        self.publish_status()
+        return percent
+
+    def duty_percent(self):
+        """Actual duty now being driven, 0-100 % of full."""
+        return self.fan.duty * 100 // FULL_DUTY
+
+    def target_percent(self):
+        """Duty being ramped towards, 0-100 % of full."""
+        return self.target_duty * 100 // FULL_DUTY
+
+    def state(self):
+        return "on" if self.is_on else "off"
+
     def update(self):
-        pass
\ No newline at end of file
+        now = time.ticks_ms()
+        elapsed = time.ticks_diff(now, self.tick)
+        self.tick = now
+        duty = self.fan.duty
+        if duty >= self.target_duty:
+            return
+        step = elapsed * FULL_DUTY // self.ramp_ms if self.ramp_ms > 0 else FULL_DUTY
+        self.fan.set_duty(min(self.target_duty, max(duty, MIN_DUTY) + step))
+        if self.fan.duty == self.target_duty:
+            self.publish_status()
+
+    def publish_status(self):
+        """Send state and actual duty, unless that is what was last sent."""
+        if self.mqtt is None:
+            return True
+        status = (self.state(), self.duty_percent())
+        if status == self.published:
+            return True
+        from config import TOPIC_STATUS_FAN
+        payload = self.codec.fan_status(TOPIC_STATUS_FAN, status[0], status[1])
+        if not self.mqtt.publish(TOPIC_STATUS_FAN, payload):
+            print("[FanManager] MQTT publish failed - fan status")
+            return False
+        self.published = status
+        return True
@@ -1,52 +1,209 @@
 from machine import SoftI2C, Pin
 from i2c_lcd import I2cLcd
+from utils.timers import Timer
+import time
+
+ROWS = 2
+COLS = 16
+SPACE = 0x20
+PREEMPTED_WAIT_MS = 30000   # How long a pre-empted message may wait to finish its time
 
 class OLED:
-    def __init__(self):
-        self.i2c = SoftI2C(scl=Pin(22), sda=Pin(21), freq=100000)
-        self.lcd = I2cLcd(self.i2c, 0x27, 2, 16)
+    """2x16 character LCD with a shadow copy of what is on the glass.
+
+    show_text() lays the new text out in a frame buffer, compares it with the
+    shadow and only sends the runs of cells that changed - one cursor move per
+    run, then the characters in a single burst (the LCD auto-increments). Showing the same text
+    again sends nothing, and clear() only issues the slow clear command when
+    something is actually on screen.
+    """
+
+    def __init__(self, i2c=None):
+        # Accept a shared bus so the LCD and RFID reader (same pins) use one I2C object
+        self.i2c = i2c if i2c is not None else SoftI2C(scl=Pin(22), sda=Pin(21), freq=100000)
+        self.lcd = I2cLcd(self.i2c, 0x27, ROWS, COLS)
+        self.shadow = bytearray(b' ' * (ROWS * COLS))  # I2cLcd init leaves the screen clear
+        self.frame = bytearray(ROWS * COLS)
+        self.frames = 0         # show_text/clear calls
+        self.skipped = 0        # Calls that needed no I2C traffic
+        self.cells = 0          # Characters actually written
+        self.write_us = 0       # Time spent in LCD writes
+
+    def _layout(self, row, text):
+        frame = self.frame
+        at = row * COLS
+        n = len(text) if len(text) < COLS else COLS
+        for i in range(n):
+            frame[at + i] = ord(text[i]) & 0xFF
+        for i in range(at + n, at + COLS):
+            frame[i] = SPACE
 
     def show_text(self, line1, line2=""):
-        self.lcd.clear()
-        self.lcd.move_to(0, 0)
-        self.lcd.putstr(line1[:16])
-        if line2:
-            self.lcd.move_to(0, 1)
-            self.lcd.putstr(line2[:16])
+        self.frames += 1
+        self._layout(0, line1)
+        self._layout(1, line2)
+        if self.frame == self.shadow:
+            self.skipped += 1
+            return True
+
+        start = time.ticks_us()
+        lcd = self.lcd
+        frame = self.frame
+        shadow = self.shadow
+        for row in range(ROWS):
+            col = 0
+            while col < COLS:
+                i = row * COLS + col
+                if frame[i] == shadow[i]:
+                    col += 1
+                    continue
+                lcd.move_to(col, row)
+                run_start = i
+                while col < COLS and frame[i] != shadow[i]:
+                    shadow[i] = frame[i]
+                    col += 1
+                    i += 1
+                lcd.write_burst(frame, run_start, i - run_start)
+                self.cells += i - run_start
+        self.write_us += time.ticks_diff(time.ticks_us(), start)
         return True
 
     def clear(self):
+        self.frames += 1
+        for i in range(ROWS * COLS):
+            if self.shadow[i] != SPACE:
+                break
+        else:
+            self.skipped += 1
+            return True
+        start = time.ticks_us()
         self.lcd.clear()
+        for i in range(ROWS * COLS):
+            self.shadow[i] = SPACE
+        self.write_us += time.ticks_diff(time.ticks_us(), start)
         return True
 
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "skipped": self.skipped,
+            "cells": self.cells,
+            "i2c_transactions": self.lcd.transactions,
+            "write_us": self.write_us,
+        }
+
 class OLEDManager:
-    def __init__(self):
-        self.oled = OLED()
+    """Owns the display on behalf of the handlers.
+
+    A message that cannot be shown yet (a higher-priority owner holds the
+    screen) waits in a small queue, ordered by priority then arrival, for up to
+    max_wait seconds. A message that is pre-empted goes back in the queue with
+    its remaining time. When the current message expires, the timer service
+    shows the next pending one, or the idle text (e.g. the latest temperature)
+    if none.
+    """
+
+    def __init__(self, oled=None, size=4):
+        self.oled = oled if oled is not None else OLED()
         self.owner = None
-        self.countdown = 0
+        self.lines = None           # (line1, line2) currently shown by owner
+        self.deadline = Timer(self._expire, name='oled')     # Fired by the timer service
         self.priority = {'button': 5, 'gas': 4, 'rfid': 3, 'steam': 2, 'motion': 1, 'environment': 0}
+        self.size = size
+        self.pending = []           # (priority, owner, line1, line2, duration_ms, wait_until), highest priority first
+        self.idle = None            # (line1, line2) shown when nothing else is
+        self.queued = 0
+        self.dropped = 0
+        self.expired = 0
+        self.max_depth = 0
 
-    def show(self, owner, line1, duration, line2=""):
-        """Show text for duration seconds (if priority allows).
+    def show(self, owner, line1, duration, line2="", max_wait=30):
+        """Show text for duration seconds, or queue it behind a higher-priority owner.
 
         Args:
             owner: Handler name ('gas', 'rfid', 'steam', 'motion', 'environment')
             line1: First line of text (max 16 chars)
             duration: Seconds to display
             line2: Optional second line of text (max 16 chars)
+            max_wait: Seconds the message may wait in the queue before it is stale
+
+        Returns:
+            True if shown now, False if queued (or dropped when the queue is full)
         """
+        priority = self.priority[owner]
         # Block if current owner has higher priority (higher number = higher priority)
-        if self.owner and self.priority[owner] < self.priority[self.owner]:
+        if self.owner and priority < self.priority[self.owner]:
+            self._enqueue(priority, owner, line1, line2, duration * 1000, max_wait * 1000)
             return False
 
+        if self.owner and self.owner != owner and self.deadline.remaining_ms() > 0:
+            # Pre-empted - keep the rest of its time for later
+            old_line1, old_line2 = self.lines
+            self._enqueue(self.priority[self.owner], self.owner, old_line1, old_line2,
+                          self.deadline.remaining_ms(), PREEMPTED_WAIT_MS)
+        self._display(owner, line1, line2, duration * 1000)
+        return True
+
+    def set_idle(self, line1, line2=""):
+        """Background text shown whenever no message owns the screen."""
+        self.idle = (line1, line2)
+        if self.owner is None:
+            self.oled.show_text(line1, line2)
+
+    def _display(self, owner, line1, line2, duration_ms):
+        self._remove(owner)
         self.owner = owner
-        self.countdown = duration
+        self.lines = (line1, line2)
+        self.deadline.start(duration_ms)
         self.oled.show_text(line1, line2)
-        return True
-    
-    def update(self):
-        if self.countdown > 0:
-            self.countdown -= 1
-            if self.countdown == 0:
-                self.oled.clear()
-                self.owner = None
\ No newline at end of file
+
+    def _remove(self, owner):
+        for i in range(len(self.pending)):
+            if self.pending[i][1] == owner:
+                del self.pending[i]
+                return
+
+    def _enqueue(self, priority, owner, line1, line2, duration_ms, wait_ms):
+        # One pending message per owner - the newest replaces the older one
+        self._remove(owner)
+        if len(self.pending) >= self.size:
+            if priority <= self.pending[-1][0]:
+                self.dropped += 1
+                return
+            self.pending.pop()
+            self.dropped += 1
+        entry = (priority, owner, line1, line2, duration_ms, time.ticks_add(time.ticks_ms(), wait_ms))
+        i = 0
+        while i < len(self.pending) and self.pending[i][0] >= priority:
+            i += 1
+        self.pending.insert(i, entry)
+        self.queued += 1
+        if len(self.pending) > self.max_depth:
+            self.max_depth = len(self.pending)
+
+    def _show_next(self):
+        now = time.ticks_ms()
+        while self.pending:
+            priority, owner, line1, line2, duration_ms, wait_until = self.pending.pop(0)
+            if time.ticks_diff(wait_until, now) > 0:
+                self._display(owner, line1, line2, duration_ms)
+                return
+            self.expired += 1
+        if self.idle is not None:
+            self.oled.show_text(self.idle[0], self.idle[1])
+        else:
+            self.oled.clear()
+
+    def _expire(self):
+        self.owner = None
+        self.lines = None
+        self._show_next()
+
+    def stats(self):
+        return {
+            "depth": len(self.pending),
+            "max_depth": self.max_depth,
+            "queued": self.queued,
+            "dropped": self.dropped,
+            "expired": self.expired,
+        }
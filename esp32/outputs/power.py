@@ -0,0 +1,107 @@
+from machine import Pin, PWM
+from utils.timers import Timer
+import time
+
+class PwmChannel:
+    """One PWM output that is only configured while it is doing something.
+
+    arm() builds the PWM peripheral on first use after a release and returns it,
+    so actuators call it right before writing a duty - the channel is re-armed
+    just in time for each command. park(delay_ms) schedules a release: the PWM
+    is deinitialised and the pin held low, which stops the LEDC output and the
+    servo holding current. A later arm() cancels a pending release.
+
+    Usage is accounted as armed time and load-weighted time. Actuators report
+    their load in permille of full power with load(); energy is estimated as
+    load-weighted time x rated_mw.
+    """
+
+    def __init__(self, name, pin, freq, rated_mw):
+        self.name = name
+        self.pin = pin
+        self.freq = freq
+        self.rated_mw = rated_mw
+        self.pwm = None
+        self.release_at = Timer(self.release, name=name)
+        self.level = 0          # Current load, permille of rated_mw
+        self.armed_ms = 0
+        self.load_ms = 0        # Sum of load permille x ms / 1000
+        self.arms = 0
+        self.releases = 0
+        self.tick = time.ticks_ms()
+        Pin(pin, Pin.OUT, value=0)
+
+    def _account(self):
+        now = time.ticks_ms()
+        elapsed = time.ticks_diff(now, self.tick)
+        self.tick = now
+        if self.pwm is not None:
+            self.armed_ms += elapsed
+            self.load_ms += elapsed * self.level // 1000
+
+    def arm(self):
+        self.release_at.cancel()
+        if self.pwm is None:
+            self._account()
+            self.pwm = PWM(Pin(self.pin), freq=self.freq, duty=0)
+            self.arms += 1
+        return self.pwm
+
+    def load(self, permille):
+        self._account()
+        self.level = permille
+
+    def park(self, delay_ms=0):
+        """Release after delay_ms unless re-armed first."""
+        if self.pwm is not None:
+            self.release_at.start(delay_ms)
+
+    def release(self):
+        if self.pwm is None:
+            return
+        self._account()
+        self.pwm.deinit()
+        self.pwm = None
+        self.level = 0
+        Pin(self.pin, Pin.OUT, value=0)
+        self.releases += 1
+
+    def armed(self):
+        return self.pwm is not None
+
+    def stats(self):
+        self._account()
+        return {
+            "armed": self.pwm is not None,
+            "armed_ms": self.armed_ms,
+            "duty_ms": self.load_ms,
+            "energy_mj": self.load_ms * self.rated_mw // 1000,
+            "arms": self.arms,
+            "releases": self.releases,
+        }
+
+class PowerManager:
+    """Registry of every actuator PWM channel. Pending releases are fired by the timer service."""
+
+    def __init__(self):
+        self.channels = []
+
+    def channel(self, name, pin, freq, rated_mw):
+        ch = PwmChannel(name, pin, freq, rated_mw)
+        self.channels.append(ch)
+        return ch
+
+    def armed(self):
+        return [ch.name for ch in self.channels if ch.armed()]
+
+    def stats(self):
+        return {ch.name: ch.stats() for ch in self.channels}
+
+_power = None
+
+def get_power():
+    """Process-wide PowerManager, shared by every actuator."""
+    global _power
+    if _power is None:
+        _power = PowerManager()
+    return _power
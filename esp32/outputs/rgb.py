@@ -1,44 +1,110 @@
 from machine import Pin
 import neopixel
+import time
+from utils.timers import Timer
+
+SOLID = 0
+BLINK = 1       # On for the first half of each period, off for the second
+BREATHE = 2     # Triangle-wave brightness, dark -> full -> dark each period
+FADE = 3        # From the colour on the strip to the new colour over one period, then hold
 
 class RGB:
     def __init__(self):
         self.pin = Pin(26, Pin.OUT)
         self.np = neopixel.NeoPixel(self.pin, 4)
         self.color = (0, 0, 0)
-    
+        self.writes = 0
+        self.elided = 0     # Frames skipped because the strip already showed them
+
     def set_color(self, r, g, b):
+        color = self.color
+        if color[0] == r and color[1] == g and color[2] == b:
+            self.elided += 1
+            return False
         self.color = (r, g, b)
         self.np.fill(self.color)
         self.np.write()
+        self.writes += 1
+        return True
 
     def off(self):
-        self.color = (0, 0, 0)
-        self.np.fill((self.color))
-        self.np.write()
+        return self.set_color(0, 0, 0)
 
 class RGBManager:
-    """Manages RGB with priority and countdown timers (no time module needed)."""
+    """Manages RGB with priority, ticks_ms-based display deadlines and effects.
+
+    update() renders the current effect for the time elapsed since show(), so
+    it can run from a fast scheduler job (20 ms) for smooth animation. RGB skips
+    the NeoPixel write whenever a frame matches what is already shown, so a
+    solid colour costs one write however often update() runs.
+    """
 
     def __init__(self):
         self.rgb = RGB()
         self.owner = None
-        self.countdown = 0
+        self.deadline = Timer(self._expire, name='rgb')     # Fired by the timer service
         self.priority = {'gas': 3, 'rfid': 2, 'steam': 1, 'motion': 0}
+        self.effect = SOLID
+        self.color = (0, 0, 0)
+        self.start_color = (0, 0, 0)
+        self.period_ms = 1000
+        self.started = time.ticks_ms()
+
+    def show(self, owner, color, duration, effect=SOLID, period_ms=1000):
+        """Show color for duration seconds (if priority allows).
 
-    def show(self, owner, color, duration):
+        Args:
+            owner: Handler name ('gas', 'rfid', 'steam', 'motion')
+            color: (r, g, b) tuple
+            duration: Seconds to display
+            effect: SOLID, BLINK, BREATHE or FADE
+            period_ms: Blink/breathe period, or fade time
+        """
         if self.owner and self.priority[owner] <= self.priority[self.owner]:
             return False
 
         self.owner = owner
-        self.countdown = duration
-        self.rgb.set_color(*color)
+        self.deadline.start(duration * 1000)
+        self.effect = effect
+        self.start_color = self.rgb.color
+        self.color = color
+        self.period_ms = period_ms
+        self.started = time.ticks_ms()
+        self._render()
         return True
 
-    def update(self):
-        if self.countdown > 0:
-            self.countdown -= 1
-            if self.countdown == 0:
+    def _render(self):
+        r, g, b = self.color
+        if self.effect == SOLID:
+            self.rgb.set_color(r, g, b)
+            return
+        elapsed = time.ticks_diff(time.ticks_ms(), self.started)
+        period = self.period_ms
+        if self.effect == BLINK:
+            if elapsed % period < period // 2:
+                self.rgb.set_color(r, g, b)
+            else:
                 self.rgb.off()
-                self.owner = None
-            return True
\ No newline at end of file
+        elif self.effect == BREATHE:
+            level = elapsed % period * 510 // period
+            if level > 255:
+                level = 510 - level
+            self.rgb.set_color(r * level // 255, g * level // 255, b * level // 255)
+        elif self.effect == FADE:
+            if elapsed >= period:
+                self.rgb.set_color(r, g, b)
+                return
+            r0, g0, b0 = self.start_color
+            self.rgb.set_color(r0 + (r - r0) * elapsed // period,
+                               g0 + (g - g0) * elapsed // period,
+                               b0 + (b - b0) * elapsed // period)
+
+    def _expire(self):
+        self.rgb.off()
+        self.owner = None
+        self.effect = SOLID
+
+    def update(self):
+        """Render the next effect frame. Expiry is handled by the timer service."""
+        if self.owner is not None and self.effect != SOLID:
+            self._render()
@@ -1,4 +1,5 @@
-from machine import Pin, PWM
+from utils.timers import Timer
+import time
 
 '''
 The duty cycle corresponding to the angle
@@ -9,66 +10,193 @@ The duty cycle corresponding to the angle
 180°----12.5%----128
 '''
 
+PULSE_MIN_NS = 500000     # 0°   - 2.5% of the 20 ms period
+PULSE_MAX_NS = 2500000    # 180° - 12.5% of the 20 ms period
+SERVO_MW = 1250           # SG90 at 5 V under load - used for energy estimates
+HOLD_PERMILLE = 100       # Holding position draws roughly a tenth of moving current
+
 class Servo:
-    def __init__(self, pin):
-        self.servo = PWM(Pin(pin))
-        self.servo.freq(50)  # Standard servo frequency (50Hz)
-        self.angle_closed = 25   # 0° duty cycle
-        self.angle_open = 128    # 180° duty cycle
-        self.is_open = None 
+    """Hobby servo driven by pulse width, moved along a time-based profile.
+
+    move_to() only records the move. update() - run from the 20 ms 'servos'
+    scheduler job, once per PWM period - interpolates the angle along an
+    ease-in/ease-out curve and writes the pulse width with duty_ns, so the
+    mechanism accelerates gently instead of slamming and the supply never sees
+    the stall current of a full-travel jump. A new move_to() starts from the
+    position reached so far, which interrupts a move cleanly.
+
+    With release, the PWM channel is released SERVO_SETTLE_MS after a move
+    ends, leaving the servo unpowered at rest, and re-armed by the next
+    move_to(). An unpowered servo can be back-driven, so a servo that must hold
+    against force (the door lock) passes release=False and keeps its pulse.
+    """
+
+    def __init__(self, pin, speed_dps=None, name=None, release=True):
+        import config
+        from outputs.power import get_power
+        if speed_dps is None:
+            speed_dps = getattr(config, 'SERVO_SPEED_DPS', 120)
+        self.settle_ms = getattr(config, 'SERVO_SETTLE_MS', 500)
+        self.release = release
+        # Standard servo frequency (50Hz)
+        self.channel = get_power().channel(name or f"servo{pin}", pin, 50, SERVO_MW)
+        self.angle_closed = 0
+        self.angle_open = 180
+        self.speed_dps = speed_dps
+        self.is_open = None
+        self.angle = None       # Last angle written - None until the first command
+        self.target = None
+        self.move_from = 0
+        self.move_ms = 0
+        self.move_started = time.ticks_ms()
+        self.pulse_ns = None    # Last pulse written, so unchanged frames skip the PWM write
 
     def open(self):
-        self.servo.duty(self.angle_open)
+        self.move_to(self.angle_open)
         self.is_open = True
 
     def close(self):
-        self.servo.duty(self.angle_closed)
+        self.move_to(self.angle_closed)
         self.is_open = False
 
+    def move_to(self, angle, speed_dps=None):
+        angle = max(0, min(180, angle))
+        if self.angle is None:
+            # Position unknown after boot - the servo jumps there whatever we do
+            self.target = angle
+            self._write(angle)
+            self._settle()
+            return
+        self.move_from = self.angle
+        self.target = angle
+        self.move_ms = abs(angle - self.angle) * 1000 // (speed_dps or self.speed_dps)
+        self.move_started = time.ticks_ms()
+        self.pulse_ns = None    # Force a write so the channel is re-armed / kept armed
+        self.channel.load(1000)
+        if not self.update():
+            self._settle()
+
+    def moving(self):
+        return self.angle != self.target
+
+    def update(self):
+        """Advance the current move. Returns True while still moving."""
+        if self.angle == self.target:
+            return False
+        elapsed = time.ticks_diff(time.ticks_ms(), self.move_started)
+        if elapsed >= self.move_ms:
+            self._write(self.target)
+            self._settle()
+            return False
+        # Smoothstep 3t^2 - 2t^3 in fixed point (t scaled to 0..1000)
+        t = elapsed * 1000 // self.move_ms
+        eased = t * t * (3000 - 2 * t) // 1000000
+        self._write(self.move_from + (self.target - self.move_from) * eased / 1000)
+        return True
+
+    def _write(self, angle):
+        self.angle = angle
+        pulse_ns = int(PULSE_MIN_NS + (PULSE_MAX_NS - PULSE_MIN_NS) * angle / 180)
+        if pulse_ns != self.pulse_ns or not self.channel.armed():
+            self.channel.arm().duty_ns(pulse_ns)
+            self.pulse_ns = pulse_ns
+
+    def _settle(self):
+        """Hold briefly so the horn finishes travelling, then release the PWM if allowed."""
+        self.channel.load(HOLD_PERMILLE)
+        if self.release:
+            self.channel.park(self.settle_ms)
+
+    def position(self):
+        """Current and target angle in whole degrees."""
+        return {
+            "angle": None if self.angle is None else round(self.angle),
+            "target": self.target,
+            "moving": self.moving(),
+        }
+
 class DoorServoManager:
-    """Manages door servo with open and close methods and a countdown timer."""
+    """Manages door servo with open and close methods and an auto-close timer.
+
+    is_open and the published door status change only when step() sees the
+    move finish, and the auto-close timer starts from that moment, so a short
+    hold cannot start closing the door mid-swing.
+
+    The door keeps holding its position by default - released, it could be
+    pushed open while reported closed. Set DOOR_SERVO_RELEASE to trade that
+    for the holding current.
+    """
     def __init__(self):
-        self.servo = Servo(pin=13)
-        self.countdown = 0
-        self.is_open = None
+        import config
+        self.servo = Servo(pin=13, name='door', release=getattr(config, 'DOOR_SERVO_RELEASE', False))
+        self.deadline = Timer(self._auto_close, name='door')   # Fired by the timer service
+        self.is_open = None     # Position reached - None until the first move completes
+        self.pending = None     # 'open' or 'closed' while the door is moving there
+        self.hold_ms = None     # Auto-close delay, started once fully open
         self.mqtt = None
+        self.codec = None
 
-    def set_mqtt(self, mqtt):
+    def set_mqtt(self, mqtt, codec):
         self.mqtt = mqtt
+        self.codec = codec
 
     def open(self, duration=5):
+        """Open, then close duration seconds after the door is fully open."""
         self.servo.open()
-        self.is_open = True
-        self.countdown = duration
+        self._moving_to('open', duration * 1000)
 
     def close(self):
         self.servo.close()
-        self.is_open = False
-        self.countdown = 0
+        self._moving_to('closed')
 
-    def update(self):
-        if self.countdown > 0:
-            self.countdown -= 1
-            if self.countdown == 0 and self.is_open:
-                self.close()
-                self._publish_status()
+    def move_to(self, angle):
+        """Park the door part-way. Cancels any auto-close."""
+        self.servo.move_to(angle)
+        self._moving_to('open' if angle > self.servo.angle_closed else 'closed')
+
+    def _moving_to(self, state, hold_ms=None):
+        self.deadline.cancel()
+        self.pending = state
+        self.hold_ms = hold_ms
+
+    def opening(self):
+        """True if the door is open or on its way there."""
+        if self.pending is not None:
+            return self.pending == 'open'
+        return bool(self.is_open)
 
-    def _publish_status(self):
+    def position(self):
+        return self.servo.position()
+
+    def step(self):
+        """Advance the servo motion profile (20 ms 'servos' job). Returns True while moving."""
+        if self.servo.update():
+            return True
+        if self.pending is not None:
+            state = self.pending
+            self.pending = None
+            self.is_open = state == 'open'
+            if self.hold_ms is not None:
+                self.deadline.start(self.hold_ms)
+                self.hold_ms = None
+            self._publish_status(state)
+        return False
+
+    def _auto_close(self):
+        if self.is_open:
+            self.close()
+
+    def _publish_status(self, state):
         if self.mqtt is None:
             return
-        import ujson
         from config import TOPIC_STATUS_DOOR
-        from utils.time_sync import TimeSync
-        payload = ujson.dumps({
-            "state": "closed",
-            "timestamp": TimeSync().get_iso_timestamp()
-        })
+        payload = self.codec.status(TOPIC_STATUS_DOOR, state)
         if not self.mqtt.publish(TOPIC_STATUS_DOOR, payload):
-            print("[DoorServoManager] MQTT publish failed - door auto-close status")
+            print(f"[DoorServoManager] MQTT publish failed - door status ({state})")
 
 class WindowServoManager:
     def __init__(self):
-        self.servo = Servo(pin=5)
+        self.servo = Servo(pin=5, name='window')
         self.is_open = None
 
     def open(self):
@@ -79,5 +207,14 @@ class WindowServoManager:
         self.servo.close()
         self.is_open = False
 
-    def update(self):
-        pass
\ No newline at end of file
+    def move_to(self, angle):
+        """Leave the window ajar at angle degrees."""
+        self.servo.move_to(angle)
+        self.is_open = angle > self.servo.angle_closed
+
+    def position(self):
+        return self.servo.position()
+
+    def step(self):
+        """Advance the servo motion profile (20 ms 'servos' job)."""
+        return self.servo.update()
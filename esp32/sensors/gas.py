@@ -1,10 +1,20 @@
 from machine import Pin
+from utils.irq_input import IRQInput
 
 class GasSensor:
     def __init__(self):
-        self.gas = Pin(23, Pin.IN, Pin.PULL_UP)
+        self.gas = IRQInput(23, Pin.PULL_UP, trigger=Pin.IRQ_FALLING | Pin.IRQ_RISING, debounce_ms=100)
+        self._changed = True  # Force one level read at startup in case gas is already present
     
     def is_gas_detected(self):
         if self.gas.value() == 0:
             return True
-        return False
\ No newline at end of file
+        return False
+
+    def has_changed(self):
+        """True if the sensor output toggled since the last call (drains queued edges)."""
+        # A chattering comparator can settle inside the debounce window with no edge queued
+        self.gas.resync()
+        changed = self.gas.clear() > 0 or self._changed
+        self._changed = False
+        return changed
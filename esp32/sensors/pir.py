@@ -1,16 +1,11 @@
 from machine import Pin
-import time
+from utils.irq_input import IRQInput
 
 class PIRSensor:
     def __init__(self):
-        self.pir = Pin(14, Pin.IN)
-        self.last_trigger_time = 0
-        self.debounce_time = 500
+        # Rising edge = motion started. 500 ms debounce matches the old polling debounce.
+        self.pir = IRQInput(14, trigger=Pin.IRQ_RISING, debounce_ms=500)
 
     def is_motion_detected(self):
-        if self.pir.value() == 1:
-            now = time.ticks_ms()
-            if time.ticks_diff(now, self.last_trigger_time) > self.debounce_time:
-                self.last_trigger_time = now
-                return True
-        return False
\ No newline at end of file
+        """True if motion started since the last call (drains queued edges)."""
+        return self.pir.clear() > 0
@@ -1,17 +1,75 @@
 from machine import Pin
-from mfrc522_i2c import mfrc522
+from mfrc522_i2c import mfrc522, mfrc522_hwi2c, RFIDTimeoutError
+from soft_iic import IICNackError
+from utils.deadline import Deadline
+import time
 
 class RFIDSensor:
-    def __init__(self):
-        self.rfid = mfrc522(22, 21, 0x28)
-        self.rfid.PCD_Init()
-        self.rfid.ShowReaderDetails()
+    def __init__(self, i2c=None, budget_ms=150, max_backoff_ms=10000):
+        """Pass a shared I2C/SoftI2C bus to use readfrom_mem/writeto_mem transfers.
+        Without one, falls back to the bit-banged softIIC driver on pins 22/21.
+
+        Args:
+            budget_ms: Hard cap on one scan_card() call. Command waits abort when it runs out.
+            max_backoff_ms: Longest pause between scans after repeated bus errors.
+        """
+        if i2c is not None:
+            self.rfid = mfrc522_hwi2c(i2c, 0x28)
+        else:
+            self.rfid = mfrc522(22, 21, 0x28)
+        self.budget_ms = budget_ms
+        self.max_backoff_ms = max_backoff_ms
+        self.backoff_ms = 0
+        self.backoff = Deadline()
+        self.errors = 0
+        self.last_scan_us = 0
+        self.max_scan_us = 0
+        self.online = False
+        self._init_reader()
+
+    def _init_reader(self):
+        """Initialise the reader. A missing or wedged reader is left offline and
+        retried by scan_card() on the error backoff instead of failing startup."""
+        try:
+            self.rfid.PCD_Init()
+            self.rfid.ShowReaderDetails()
+        except (RFIDTimeoutError, IICNackError) as e:
+            self._recover(e)
+            return False
+        self.online = True
+        self.backoff_ms = 0
+        print("[RFIDSensor] Reader online")
+        return True
 
     def scan_card(self):
-        if self.rfid.PICC_IsNewCardPresent():
-            if self.rfid.PICC_ReadCardSerial():
-                return True
-        return False
+        if self.backoff.active() and not self.backoff.expired():
+            return False  # Backing off after bus errors - cost of this call is ~0
+        if not self.online and not self._init_reader():
+            return False
+
+        start = time.ticks_us()
+        self.rfid.budget_due = time.ticks_add(time.ticks_ms(), self.budget_ms)
+        found = False
+        try:
+            if self.rfid.PICC_IsNewCardPresent():
+                found = self.rfid.PICC_ReadCardSerial()
+            self.backoff_ms = 0
+        except (RFIDTimeoutError, IICNackError) as e:
+            self._recover(e)
+        self.rfid.budget_due = None
+
+        self.last_scan_us = time.ticks_diff(time.ticks_us(), start)
+        if self.last_scan_us > self.max_scan_us:
+            self.max_scan_us = self.last_scan_us
+        return found
+
+    def _recover(self, error):
+        """Free the bus and back off exponentially so a faulty reader can't stall the loop."""
+        self.errors += 1
+        self.rfid.PCD_Recover()
+        self.backoff_ms = min(self.max_backoff_ms, self.backoff_ms * 2 if self.backoff_ms else 200)
+        self.backoff.start(self.backoff_ms)
+        print(f"[RFIDSensor] {error} - backing off {self.backoff_ms} ms")
 
     def get_card_id(self):
         if self.rfid.uid.size > 0:
@@ -25,4 +83,13 @@ class RFIDSensor:
         """Reset the stored card UID to allow re-scanning"""
         self.rfid.uid.size = 0
         for i in range(10):
-            self.rfid.uid.uidByte[i] = 0
\ No newline at end of file
+            self.rfid.uid.uidByte[i] = 0
+
+    def stats(self):
+        return {
+            "last_scan_us": self.last_scan_us,
+            "max_scan_us": self.max_scan_us,
+            "online": self.online,
+            "errors": self.errors,
+            "backoff_ms": self.backoff_ms,
+        }
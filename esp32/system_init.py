@@ -48,11 +48,11 @@ class SystemInit:
         self.memory.collect("After WiFi connect")
 
     def _sync_time(self):
-        from utils.time_sync import TimeSync
+        from utils.time_sync import get_clock
         from outputs.oled import OLED
 
         oled = OLED()
-        time_sync = TimeSync()
+        time_sync = get_clock()
 
         oled.show_text("Time Sync", "Connecting...")
         if time_sync.sync_time():
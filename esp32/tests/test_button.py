@@ -0,0 +1,32 @@
+from outputs.button import Button, BUTTON_GAS_ALARM_PIN
+from tests.TestingSuite import PicoTestBase
+import time
+
+class testButton(PicoTestBase):
+    def __init__(self):
+        self.button = Button(BUTTON_GAS_ALARM_PIN)
+
+    def _edges(self, *edges):
+        """Queue (level, ms from now) edges as the IRQ would - the pin itself stays released."""
+        start = time.ticks_ms()
+        for level, offset in edges:
+            self.button.button._push(level, time.ticks_add(start, offset))
+
+    def test_press(self):
+        print("TestButton: press")
+        self.button.was_pressed()
+        time.sleep(0.2)
+        self._edges((0, 0), (1, 120))
+        assert self.button.was_pressed(), "Press not detected"
+        assert not self.button.was_pressed(), "Press reported twice"
+        time.sleep(1)
+
+    def test_late_release_bounce(self):
+        print("TestButton: late release bounce")
+        self.button.was_pressed()
+        time.sleep(0.2)
+        # Press, release, then a bounce 60 ms after the release - past the 50 ms debounce
+        self._edges((0, 0), (1, 120), (0, 180), (1, 240))
+        assert self.button.was_pressed(), "Press not detected"
+        assert not self.button.was_pressed(), "Release bounce counted as a second press"
+        time.sleep(1)
@@ -1,5 +1,6 @@
 from outputs.buzzer import Buzzer
 from outputs.buzzer import BuzzerManager
+from utils.timers import get_timers
 from tests.TestingSuite import PicoTestBase
 import time
 
@@ -39,12 +40,37 @@ class testBuzzerManager(PicoTestBase):
         print("TestBuzzerManager: update")
         self.buzzer_manager.start(3)
         self.buzzer_manager.update()
-        assert self.buzzer_manager.countdown == 2, "Countdown is not 2"
+        assert 2900 <= self.buzzer_manager.deadline.remaining_ms() <= 3000, "Deadline is not ~3000 ms"
+        time.sleep(2)
+        get_timers().run_due()
+        assert self.buzzer_manager.is_running, "Buzzer stopped early"
+        time.sleep(1.1)
+        get_timers().run_due()
+        assert not self.buzzer_manager.deadline.active(), "Deadline is still active"
+        assert not self.buzzer_manager.is_running, "Buzzer is still running"
         time.sleep(1)
+
+    def test_pattern(self):
+        print("TestBuzzerManager: pattern")
+        from outputs.buzzer import morse
+        pattern = morse("SOS", unit_ms=50)
+        assert len(pattern) == 17, "Morse pattern has wrong number of steps"
+        assert self.buzzer_manager.play(pattern), "Pattern did not start"
+        time.sleep(0.06)
         self.buzzer_manager.update()
-        assert self.buzzer_manager.countdown == 1, "Countdown is not 1"
-        time.sleep(1)
+        assert self.buzzer_manager.index == 1, "Sequencer did not advance to the next step"
+        time.sleep(1.5)
         self.buzzer_manager.update()
-        assert self.buzzer_manager.countdown == 0, "Countdown is not 0"
-        assert not self.buzzer_manager.is_running, "Buzzer is still running"
-        time.sleep(1)
\ No newline at end of file
+        assert not self.buzzer_manager.is_running, "One-shot pattern did not finish"
+
+    def test_preempt(self):
+        print("TestBuzzerManager: preempt")
+        from outputs.buzzer import INFO, ALARM
+        assert self.buzzer_manager.play('gas_alarm', ALARM, duration=1), "Alarm did not start"
+        assert not self.buzzer_manager.play('birthday', INFO), "Melody pre-empted the alarm"
+        self.buzzer_manager.stop()
+        assert self.buzzer_manager.play('birthday', INFO), "Melody did not start"
+        assert self.buzzer_manager.play('gas_alarm', ALARM, duration=1), "Alarm did not pre-empt the melody"
+        assert self.buzzer_manager.name == 'gas_alarm', "Alarm is not playing"
+        self.buzzer_manager.stop()
+        time.sleep(1)
@@ -0,0 +1,49 @@
+from utils.card_cache import CardCache, card_hash
+from tests.TestingSuite import PicoTestBase
+import os
+import time
+
+class testCardCache(PicoTestBase):
+    PATH = 'test_cards.bin'
+
+    def _cache(self):
+        self._remove()
+        return CardCache(self.PATH)
+
+    def _remove(self):
+        try:
+            os.remove(self.PATH)
+        except OSError:
+            pass
+
+    def test_same_second_updates(self):
+        print("TestCardCache: same_second_updates")
+        try:
+            cache = self._cache()
+            # Two API publishes within one second - millisecond versions one apart
+            version = 1760000000000
+            assert cache.update(version, [card_hash("111")]), "First allowlist rejected"
+            assert cache.update(version + 1, []), "Revocation in the same second rejected"
+            assert not cache.is_authorised("111"), "Revoked card still authorised"
+            assert not cache.update(version, [card_hash("111")]), "Stale allowlist accepted"
+        finally:
+            self._remove()
+        time.sleep(1)
+
+    def test_persist(self):
+        print("TestCardCache: persist")
+        try:
+            cache = self._cache()
+            cache.update(1, [card_hash("222")])
+            loaded = CardCache(self.PATH)
+            assert loaded.version == cache.version, "Version not persisted"
+            assert loaded.is_authorised("222"), "Card not persisted"
+            assert not loaded.is_authorised("223"), "Unlisted card authorised"
+        finally:
+            self._remove()
+        time.sleep(1)
+
+    def test_hash_width(self):
+        print("TestCardCache: hash_width")
+        assert card_hash("a") == 0xAF63DC4C8601EC8C, "Not 64-bit FNV-1a - must match the API"
+        time.sleep(1)
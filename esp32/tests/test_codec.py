@@ -0,0 +1,68 @@
+from comms.codec import JsonCodec, StructCodec, FRAME_SIZE
+from utils.time_sync import get_clock
+from tests.TestingSuite import PicoTestBase
+import time
+
+class testCodec(PicoTestBase):
+    """Payload size and encode time per message: JSON vs struct frame."""
+    COUNT = 200
+
+    def __init__(self):
+        time_sync = get_clock()
+        self.json = JsonCodec(time_sync)
+        self.struct = StructCodec(time_sync)
+
+    def _record(self):
+        return {"sensor_type": "temperature", "value": 23, "unit": "C"}
+
+    def _encode_us(self, codec):
+        start = time.ticks_us()
+        for _ in range(self.COUNT):
+            payload = codec.encode(self._record())
+        return time.ticks_diff(time.ticks_us(), start) // self.COUNT, len(payload)
+
+    def test_struct_roundtrip(self):
+        print("TestCodec: struct_roundtrip")
+        record = StructCodec.decode(self.struct.encode({"sensor_type": "gas", "detected": True}))
+        assert record["sensor_type"] == "gas", "Sensor type not preserved"
+        assert record["detected"] is True, "Detected flag not preserved"
+        record = StructCodec.decode(self.struct.encode({"state": "open"}))
+        assert record["state"] == "open", "State not preserved"
+        time.sleep(1)
+
+    def test_struct_timestamp(self):
+        print("TestCodec: struct_timestamp")
+        record = StructCodec.decode(self.struct.encode({"state": "open"}))
+        now = get_clock().now()
+        assert abs(record["timestamp"] - now) <= 1, "Timestamp not taken from the synced clock"
+        time.sleep(1)
+
+    def test_struct_fallback(self):
+        print("TestCodec: struct_fallback")
+        payload = self.struct.encode({"sensor_type": "unknown", "value": 1})
+        assert isinstance(payload, str), "Unknown sensor type did not fall back to JSON"
+        time.sleep(1)
+
+    def test_benchmark(self):
+        print("TestCodec: json vs struct")
+        json_us, json_bytes = self._encode_us(self.json)
+        struct_us, struct_bytes = self._encode_us(self.struct)
+        print(f"JSON: {json_bytes} bytes, {json_us} us/msg - struct: {struct_bytes} bytes, {struct_us} us/msg")
+        assert struct_bytes == FRAME_SIZE, "Struct frame has the wrong size"
+        assert struct_bytes < json_bytes, "Struct frame is not smaller than JSON"
+        time.sleep(1)
+
+    def test_status_template(self):
+        print("TestCodec: status_template")
+        import gc
+        import ujson
+        payload = self.json.status("closed")
+        assert ujson.loads(bytes(payload))["state"] == "closed", "Template is not valid JSON"
+        gc.collect()
+        before = gc.mem_alloc()
+        for _ in range(self.COUNT):
+            self.json.status("open")
+        per_msg = (gc.mem_alloc() - before) // self.COUNT
+        print(f"Status template: {per_msg} bytes allocated per message")
+        assert ujson.loads(bytes(payload))["state"] == "open", "Template was not patched in place"
+        time.sleep(1)
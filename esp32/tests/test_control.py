@@ -0,0 +1,59 @@
+from handlers.control_handler import ControlHandler
+from outputs.rgb import RGBManager
+from outputs.oled import OLEDManager
+from outputs.servo import DoorServoManager, WindowServoManager
+from outputs.buzzer import BuzzerManager
+from outputs.fan import FanManager
+from comms.codec import TelemetryCodec
+from utils.time_sync import get_clock
+from tests.TestingSuite import PicoTestBase
+import time
+
+GRANTED = b'{"access": "granted", "card_id": "123"}'
+
+class _NoMqtt:
+    """Broker that is down - publish reports failure."""
+    def publish(self, topic, payload):
+        return False
+
+class testControlHandler(PicoTestBase):
+    def __init__(self):
+        self.control = ControlHandler(RGBManager(), OLEDManager(), DoorServoManager(),
+                                      WindowServoManager(), BuzzerManager(), FanManager())
+        self.mqtt = _NoMqtt()
+        self.control.set_mqtt(self.mqtt, TelemetryCodec(get_clock(), {}))
+        self.door = self.control.door_servo_manager
+
+    def test_live_grant(self):
+        print("TestControlHandler: live grant")
+        self.door.close()
+        self.control.expect_response("123")
+        self.control.handle_rfid_response("rfid/response", GRANTED)
+        assert self.door.opening(), "Answered scan did not open the door"
+        self.door.close()
+        time.sleep(1)
+
+    def test_window_angle(self):
+        print("TestControlHandler: window angle")
+        window = self.control.window_servo_manager
+        self.control.handle_window_control("control/window", b'{"angle": 90.0}', self.mqtt)
+        assert window.servo.target == 90, "Float angle rejected"
+        self.control.handle_window_control("control/window", b'{"angle": 250}', self.mqtt)
+        assert window.servo.target == 180, "Angle not clamped"
+        window.close()
+        time.sleep(1)
+
+    def test_replayed_grant(self):
+        print("TestControlHandler: replayed grant")
+        self.door.close()
+        # Scan replayed after an outage - nothing on the device is waiting for it
+        self.control.handle_rfid_response("rfid/response", GRANTED)
+        assert not self.door.opening(), "Grant with no scan waiting opened the door"
+        # Answer arriving after the response window
+        self.control.response_timeout_ms = 50
+        self.control.expect_response("123")
+        time.sleep(0.1)
+        self.control.handle_rfid_response("rfid/response", GRANTED)
+        assert not self.door.opening(), "Late grant opened the door"
+        self.control.response_timeout_ms = 5000
+        time.sleep(1)
@@ -0,0 +1,27 @@
+from utils.devices import DeviceRegistry, register_defaults
+from tests.TestingSuite import PicoTestBase
+import time
+
+class testDeviceRegistry(PicoTestBase):
+    def __init__(self):
+        self.devices = register_defaults(DeviceRegistry())
+
+    def test_release(self):
+        print("TestDeviceRegistry: release")
+        led = self.devices.get('led')
+        assert self.devices.is_loaded('led'), "LED not loaded after get"
+        assert self.devices.release('led'), "Release reported nothing to free"
+        assert not self.devices.is_loaded('led'), "LED still loaded after release"
+        assert 'led' not in self.devices.report(), "Released driver still reported"
+        assert self.devices.get('led') is not led, "get did not rebuild the released driver"
+        assert not self.devices.release('pir'), "Released a driver that was never loaded"
+        self.devices.release('led')
+        time.sleep(1)
+
+    def test_nested_size(self):
+        print("TestDeviceRegistry: nested size")
+        self.devices.get('oled')
+        sizes = self.devices.report()
+        assert sizes['i2c'] > 0, "Shared I2C bus not measured"
+        assert sizes['oled'] >= 0, "OLED charged negative bytes"
+        time.sleep(1)
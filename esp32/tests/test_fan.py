@@ -1,4 +1,5 @@
 from outputs.fan import Fan
+from outputs.fan import FanManager, MIN_DUTY, AUTO, MANUAL
 from tests.TestingSuite import PicoTestBase
 import time
 
@@ -19,3 +20,32 @@ class TestFan(PicoTestBase):
         time.sleep(1)
 
 
+class TestFanManager(PicoTestBase):
+    def __init__(self):
+        self.fan_manager = FanManager()
+
+    def test_soft_start(self):
+        print("TestFanManager: soft start")
+        self.fan_manager.set_speed(100)
+        assert self.fan_manager.fan.duty == MIN_DUTY, "Fan did not kick to the stall threshold"
+        time.sleep(0.5)
+        self.fan_manager.update()
+        assert MIN_DUTY < self.fan_manager.fan.duty < 1023, "Fan did not ramp"
+        time.sleep(2)
+        self.fan_manager.update()
+        assert self.fan_manager.duty_percent() == 100, "Fan did not reach full speed"
+        self.fan_manager.set_speed(0)
+        assert self.fan_manager.fan.duty == 0, "Fan did not stop at once"
+        time.sleep(1)
+
+    def test_auto(self):
+        print("TestFanManager: auto")
+        self.fan_manager.set_mode(AUTO)
+        assert self.fan_manager.control(20, 40) == 0, "Fan runs below target temperature"
+        assert self.fan_manager.control(30, 40) > 0, "Fan idle above target temperature"
+        self.fan_manager.set_gas(True)
+        assert self.fan_manager.target_percent() == 100, "Gas did not run the fan flat out"
+        self.fan_manager.set_gas(False)
+        self.fan_manager.off()
+        assert self.fan_manager.mode == MANUAL, "Manual command did not leave auto mode"
+        time.sleep(1)
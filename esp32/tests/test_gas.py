@@ -10,4 +10,23 @@ class testGasSensor(PicoTestBase):
         print("TestGasSensor: is_gas_detected")
         result = self.gas_sensor.is_gas_detected()
         assert isinstance(result, bool), "Result is not a boolean"
-        time.sleep(1)
\ No newline at end of file
+        time.sleep(1)
+
+    def test_has_changed(self):
+        print("TestGasSensor: has_changed")
+        sensor = GasSensor()
+        assert sensor.has_changed() == True, "First call should force a level read"
+        assert sensor.has_changed() == False, "Idle sensor reported a change"
+        time.sleep(1)
+
+    def test_resync(self):
+        print("TestGasSensor: resync")
+        sensor = GasSensor()
+        sensor.has_changed()
+        # Pretend the last reported edge was the opposite level, as after chatter in the debounce window
+        sensor.gas.last_level = 1 - sensor.gas.value()
+        time.sleep(0.2)
+        assert sensor.has_changed() == True, "Settled level was not resynced"
+        assert sensor.gas.resynced == 1, "Synthetic edge not counted"
+        assert sensor.has_changed() == False, "Resync queued a second edge"
+        time.sleep(1)
@@ -1,5 +1,6 @@
 from outputs.oled import OLED
 from outputs.oled import OLEDManager
+from utils.timers import get_timers
 from tests.TestingSuite import PicoTestBase
 import time
 
@@ -13,12 +14,62 @@ class testOLED(PicoTestBase):
         assert result == True, "OLED is not showing text"
         time.sleep(1)
 
+    def test_diff_render(self):
+        print("TestOLED: diff_render")
+        self.oled.show_text("Temp: 21C", "Humid: 40%")
+        before = self.oled.lcd.transactions
+        self.oled.show_text("Temp: 21C", "Humid: 40%")
+        assert self.oled.lcd.transactions == before, "Identical re-show wrote to the LCD"
+        cells = self.oled.cells
+        self.oled.show_text("Temp: 22C", "Humid: 40%")
+        assert self.oled.cells - cells == 1, "More than the changed cell was written"
+        print(f"OLED stats: {self.oled.stats()}")
+        time.sleep(1)
+
     def test_clear(self):
         print("TestOLED: clear")
         result = self.oled.clear()
         assert result == True, "OLED is not clearing"
         time.sleep(1)
 
+class testLCDBurstBenchmark(PicoTestBase):
+    """Characters per second: four writeto calls per byte vs one burst per line."""
+    COUNT = 10
+
+    def __init__(self):
+        self.oled = OLED()
+
+    def _write_per_byte(self, lcd, text):
+        # The original I2cLcd.hal_write_data - four writeto calls and allocations per character
+        from i2c_lcd import MASK_RS, MASK_E, SHIFT_BACKLIGHT, SHIFT_DATA
+        for char in text:
+            data = ord(char)
+            byte = (MASK_RS | (lcd.backlight << SHIFT_BACKLIGHT) | (((data >> 4) & 0x0f) << SHIFT_DATA))
+            lcd.i2c.writeto(lcd.i2c_addr, bytearray([byte | MASK_E]))
+            lcd.i2c.writeto(lcd.i2c_addr, bytearray([byte]))
+            byte = (MASK_RS | (lcd.backlight << SHIFT_BACKLIGHT) | ((data & 0x0f) << SHIFT_DATA))
+            lcd.i2c.writeto(lcd.i2c_addr, bytearray([byte | MASK_E]))
+            lcd.i2c.writeto(lcd.i2c_addr, bytearray([byte]))
+
+    def _chars_per_second(self, write):
+        lcd = self.oled.lcd
+        text = "0123456789ABCDEF"
+        start = time.ticks_us()
+        for _ in range(self.COUNT):
+            lcd.move_to(0, 0)
+            write(lcd, text)
+        elapsed = time.ticks_diff(time.ticks_us(), start)
+        return self.COUNT * len(text) * 1000000 // elapsed
+
+    def test_benchmark_burst(self):
+        print("TestLCDBurstBenchmark: per-byte vs burst")
+        before = self._chars_per_second(self._write_per_byte)
+        after = self._chars_per_second(lambda lcd, text: lcd.write_burst(text.encode()))
+        print(f"Per-byte: {before} chars/s, burst: {after} chars/s ({after * 100 // before}%)")
+        assert after > before, "Burst writes are not faster"
+        self.oled.lcd.clear()
+        time.sleep(1)
+
 class testOLEDManager(PicoTestBase):
     def __init__(self):
         self.oled_manager = OLEDManager()
@@ -31,13 +82,25 @@ class testOLEDManager(PicoTestBase):
     def test_update(self):
         print("TestOLEDManager: update")
         self.oled_manager.show('gas', "Hello", 3)
-        self.oled_manager.update()
-        assert self.oled_manager.countdown == 2, "Countdown is not 2"
-        time.sleep(1)
-        self.oled_manager.update()
-        assert self.oled_manager.countdown == 1, "Countdown is not 1"
+        assert 2900 <= self.oled_manager.deadline.remaining_ms() <= 3000, "Deadline is not ~3000 ms"
+        time.sleep(2)
+        get_timers().run_due()
+        assert self.oled_manager.owner == 'gas', "Owner released early"
+        time.sleep(1.1)
+        get_timers().run_due()
+        assert not self.oled_manager.deadline.active(), "Deadline is still active"
+        assert self.oled_manager.owner == None, "Owner is not None"
         time.sleep(1)
-        self.oled_manager.update()
-        assert self.oled_manager.countdown == 0, "Countdown is not 0"
+
+    def test_queue(self):
+        print("TestOLEDManager: queue")
+        self.oled_manager.show('gas', "Gas", 1, "detected")
+        assert self.oled_manager.show('motion', "Motion", 1) == False, "Lower priority was not queued"
+        assert self.oled_manager.stats()['depth'] == 1, "Queue depth is not 1"
+        time.sleep(1.1)
+        get_timers().run_due()
+        assert self.oled_manager.owner == 'motion', "Queued message was not shown after expiry"
+        time.sleep(1.1)
+        get_timers().run_due()
         assert self.oled_manager.owner == None, "Owner is not None"
-        time.sleep(1)
\ No newline at end of file
+        time.sleep(1)
@@ -0,0 +1,54 @@
+from comms.outbox import Outbox, LATEST
+from tests.TestingSuite import PicoTestBase
+import os
+import time
+
+class testOutbox(PicoTestBase):
+    PATH = 'test_outbox.log'
+
+    def _outbox(self):
+        return Outbox({'status': LATEST}, ram_size=2, path=self.PATH)
+
+    def _remove(self):
+        try:
+            os.remove(self.PATH)
+        except OSError:
+            pass
+
+    def test_replay_order(self):
+        print("TestOutbox: replay order across RAM and flash")
+        sent = []
+
+        def send(topic, payload):
+            # RAM entries come back as queued, flash entries as bytes
+            sent.append(payload if isinstance(payload, str) else payload.decode())
+            return True
+
+        try:
+            outbox = self._outbox()
+            outbox.put('alarm', "1")
+            outbox.put('alarm', "2")
+            outbox.put('alarm', "3")       # RAM full - spills to flash
+            assert outbox.stats()['spilled'] == 1, "Third message did not spill to flash"
+            outbox.replay(send, 1)          # Frees a RAM slot
+            outbox.put('status', "S")       # RAM only, but queued after "3"
+            outbox.put('alarm', "4")
+            outbox.replay(send)
+            assert sent == ["1", "2", "3", "S", "4"], f"Replayed out of order: {sent}"
+            assert outbox.is_empty(), "Outbox not empty after replay"
+        finally:
+            self._remove()
+        time.sleep(1)
+
+    def test_reboot(self):
+        print("TestOutbox: reboot")
+        try:
+            outbox = self._outbox()
+            for payload in ("1", "2", "3", "4"):
+                outbox.put('alarm', payload)
+            reloaded = self._outbox()
+            assert reloaded.seq == outbox.seq, "Sequence did not continue after reboot"
+            assert not reloaded.is_empty(), "Spilled messages lost on reboot"
+        finally:
+            self._remove()
+        time.sleep(1)
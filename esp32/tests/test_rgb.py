@@ -1,5 +1,6 @@
 from outputs.rgb import RGB
 from outputs.rgb import RGBManager
+from utils.timers import get_timers
 from tests.TestingSuite import PicoTestBase
 import time
 
@@ -31,6 +32,34 @@ class testRGBManager(PicoTestBase):
     def test_update(self):
         print("TestRGBManager: update")
         self.rgb_manager.show('gas', (255, 0, 0), 1)
+        get_timers().run_due()
+        assert self.rgb_manager.deadline.active(), "Deadline expired early"
+        time.sleep(1.1)
+        get_timers().run_due()
+        assert not self.rgb_manager.deadline.active(), "Deadline is still active"
+        assert self.rgb_manager.owner == None, "Owner is not None"
+
+    def test_write_elision(self):
+        print("TestRGBManager: write elision")
+        rgb = self.rgb_manager.rgb
+        self.rgb_manager.show('rfid', (0, 255, 0), 1)
+        writes = rgb.writes
+        for _ in range(10):
+            self.rgb_manager.update()
+        assert rgb.writes == writes, "Solid colour was rewritten"
+        assert rgb.set_color(0, 255, 0) == False, "Unchanged colour was not elided"
+        time.sleep(1.1)
+        get_timers().run_due()
+
+    def test_blink(self):
+        print("TestRGBManager: blink")
+        from outputs.rgb import BLINK
+        self.rgb_manager.show('gas', (255, 0, 0), 1, BLINK, 400)
+        self.rgb_manager.update()
+        assert self.rgb_manager.rgb.color == (255, 0, 0), "Blink did not start on"
+        time.sleep(0.3)
         self.rgb_manager.update()
-        assert self.rgb_manager.countdown == 0, "Countdown is not 0"
+        assert self.rgb_manager.rgb.color == (0, 0, 0), "Blink did not turn off"
         time.sleep(1)
+        get_timers().run_due()
+        assert self.rgb_manager.owner == None, "Blink did not expire"
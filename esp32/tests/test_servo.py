@@ -1,5 +1,6 @@
 from outputs.servo import Servo
 from outputs.servo import DoorServoManager
+from utils.timers import get_timers
 from tests.TestingSuite import PicoTestBase
 import time
 
@@ -19,31 +20,90 @@ class testServo(PicoTestBase):
         assert not self.servo.is_open, "Servo is not closed"
         time.sleep(1)
 
+    def test_motion_profile(self):
+        print("TestServo: motion profile")
+        self.servo.move_to(0)
+        time.sleep(2)
+        self.servo.update()
+        self.servo.move_to(180, speed_dps=180)
+        assert self.servo.moving(), "Move finished instantly"
+        time.sleep(0.5)
+        self.servo.update()
+        midway = self.servo.angle
+        assert 0 < midway < 180, "Servo did not interpolate"
+        self.servo.move_to(0, speed_dps=180)
+        assert self.servo.position()["target"] == 0, "Target not updated"
+        assert self.servo.angle == midway, "Interrupted move did not start from current angle"
+        time.sleep(1.1)
+        self.servo.update()
+        assert self.servo.position() == {"angle": 0, "target": 0, "moving": False}, "Servo did not settle"
+        time.sleep(1)
+
 class testDoorServoManager(PicoTestBase):
     def __init__(self):
         self.door_servo_manager = DoorServoManager()
-    
+
+    def _finish_move(self):
+        """Run the 'servos' job until the move completes."""
+        for _ in range(150):
+            if not self.door_servo_manager.step():
+                return
+            time.sleep(0.02)
+
     def test_open(self):
         print("TestDoorServoManager: open")
         self.door_servo_manager.open()
+        self._finish_move()
         assert self.door_servo_manager.is_open, "Servo is not open"
         time.sleep(1)
-    
+
     def test_close(self):
         print("TestDoorServoManager: close")
         self.door_servo_manager.close()
+        self._finish_move()
         assert not self.door_servo_manager.is_open, "Servo is not closed"
         time.sleep(1)
-    
+
     def test_update(self):
         print("TestDoorServoManager: update")
+        self.door_servo_manager.close()
+        self._finish_move()
         self.door_servo_manager.open(duration=3)
-        self.door_servo_manager.update()
-        assert self.door_servo_manager.countdown == 2, "Countdown is not 2"
+        self.door_servo_manager.step()
+        assert not self.door_servo_manager.is_open, "Reported open mid-swing"
+        assert self.door_servo_manager.opening(), "Not reported as opening"
+        assert not self.door_servo_manager.deadline.active(), "Auto-close started before the door was open"
+        self._finish_move()
+        assert self.door_servo_manager.is_open, "Door did not finish opening"
+        assert 2900 <= self.door_servo_manager.deadline.remaining_ms() <= 3000, "Deadline is not ~3000 ms"
+        time.sleep(2)
+        get_timers().run_due()
+        assert self.door_servo_manager.is_open, "Servo closed early"
+        time.sleep(1.1)
+        get_timers().run_due()
+        assert not self.door_servo_manager.deadline.active(), "Deadline is still active"
+        self._finish_move()
+        assert not self.door_servo_manager.is_open, "Servo is not closed"
         time.sleep(1)
-        self.door_servo_manager.update()
-        assert self.door_servo_manager.countdown == 1, "Countdown is not 1"
+
+    def test_release(self):
+        print("TestDoorServoManager: release")
+        servo = self.door_servo_manager.servo
+        self.door_servo_manager.close()
+        self._finish_move()
+        time.sleep(servo.settle_ms / 1000 + 0.1)
+        get_timers().run_due()
+        assert servo.channel.armed(), "Door released while closed - it could be back-driven"
+        servo.release = True
+        self.door_servo_manager.open()
+        self._finish_move()
+        time.sleep(servo.settle_ms / 1000 + 0.1)
+        get_timers().run_due()
+        assert not servo.channel.armed(), "PWM still armed after settling"
+        servo.release = False
+        self.door_servo_manager.close()
+        assert servo.channel.armed(), "PWM not re-armed by a new move"
+        stats = servo.channel.stats()
+        assert stats["arms"] >= 2 and stats["releases"] >= 1, "Arm/release not counted"
+        self._finish_move()
         time.sleep(1)
-        self.door_servo_manager.update()
-        assert self.door_servo_manager.countdown == 0, "Countdown is not 0"
-        assert not self.door_servo_manager.is_open, "Servo is not closed"
\ No newline at end of file
@@ -0,0 +1,49 @@
+from utils.timers import TimerService, Timer
+from tests.TestingSuite import PicoTestBase
+import time
+
+class testTimerService(PicoTestBase):
+    def __init__(self):
+        self.timers = TimerService()
+        self.fired = []
+
+    def test_one_shot(self):
+        print("TestTimerService: one-shot")
+        self.timers.after(200, lambda: self.fired.append('once'))
+        assert 190 <= self.timers.next_due_ms() <= 200, "Next due is not ~200 ms"
+        time.sleep(0.1)
+        assert self.timers.run_due() == 0, "Timer fired early"
+        time.sleep(0.11)
+        assert self.timers.run_due() == 1, "Timer did not fire"
+        assert self.fired == ['once'], "Callback did not run once"
+        assert self.timers.next_due_ms() is None, "One-shot timer is still active"
+        time.sleep(1)
+
+    def test_periodic(self):
+        print("TestTimerService: periodic")
+        count = []
+        timer = self.timers.every(100, lambda: count.append(1))
+        for _ in range(3):
+            time.sleep(0.1)
+            self.timers.run_due()
+        assert len(count) == 3, "Periodic timer did not fire every period"
+        timer.cancel()
+        time.sleep(0.1)
+        self.timers.run_due()
+        assert len(count) == 3, "Cancelled timer fired"
+        time.sleep(1)
+
+    def test_restart(self):
+        print("TestTimerService: restart")
+        fired = []
+        timer = Timer(lambda: fired.append(1), service=self.timers)
+        timer.start(50)
+        time.sleep(0.03)
+        timer.start(50)
+        time.sleep(0.03)
+        self.timers.run_due()
+        assert fired == [], "Restarted timer fired at its old due time"
+        time.sleep(0.03)
+        self.timers.run_due()
+        assert fired == [1], "Restarted timer did not fire once"
+        time.sleep(1)
@@ -0,0 +1,93 @@
+import struct
+
+CACHE_FILE = 'cards.bin'
+HEADER = '<QI'     # version (API publish time, Unix ms), count
+HEADER_SIZE = 12
+HASH = '<Q'        # 64-bit card hashes - a 32-bit collision would open the door for an unlisted card
+HASH_SIZE = 8
+
+def card_hash(card_id):
+    """FNV-1a 64-bit hash of a card ID string. Must match AllowlistPublisher.CardHash in the API."""
+    h = 0xCBF29CE484222325
+    for b in card_id.encode():
+        h = ((h ^ b) * 0x100000001B3) & 0xFFFFFFFFFFFFFFFF
+    return h
+
+class CardCache:
+    """Local copy of the authorised-card allowlist for offline door decisions.
+
+    The API publishes {"version": n, "hashes": [...]} as a retained message on
+    TOPIC_RFID_ALLOWLIST. Hashes are kept sorted in one bytearray (8 bytes per card)
+    and persisted to flash, so lookups are a binary search with no per-scan allocation
+    and the cache survives reboots while the broker is down.
+    """
+
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self.version = 0
+        self.count = 0
+        self.data = bytearray(0)
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+            version, count = struct.unpack_from(HEADER, data, 0)
+            if len(data) != HEADER_SIZE + count * HASH_SIZE:
+                raise ValueError("size mismatch")
+            self.version = version
+            self.count = count
+            self.data = bytearray(data)
+            print(f"[CardCache] Loaded allowlist v{version} ({count} cards)")
+        except OSError:
+            print("[CardCache] No allowlist cached yet")
+        except ValueError as e:
+            print(f"[CardCache] Ignoring corrupt allowlist: {e}")
+
+    def save(self):
+        try:
+            with open(self.path, 'wb') as f:
+                f.write(self.data)
+        except OSError as e:
+            print(f"[CardCache] Failed to save allowlist: {e}")
+
+    def update(self, version, hashes):
+        """Replace the allowlist if version is newer. Returns True if it changed."""
+        if version <= self.version:
+            return False
+        hashes = sorted(set(h & 0xFFFFFFFFFFFFFFFF for h in hashes))
+        data = bytearray(HEADER_SIZE + len(hashes) * HASH_SIZE)
+        struct.pack_into(HEADER, data, 0, version, len(hashes))
+        for i, h in enumerate(hashes):
+            struct.pack_into(HASH, data, HEADER_SIZE + i * HASH_SIZE, h)
+        self.version = version
+        self.count = len(hashes)
+        self.data = data
+        self.save()
+        print(f"[CardCache] Allowlist updated to v{version} ({self.count} cards)")
+        return True
+
+    def handle_allowlist(self, topic, msg):
+        """MQTT callback for TOPIC_RFID_ALLOWLIST."""
+        import ujson
+
+        try:
+            data = ujson.loads(msg.decode())
+            self.update(int(data['version']), data['hashes'])
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"[CardCache] Error parsing allowlist: {e}")
+
+    def is_authorised(self, card_id):
+        target = card_hash(card_id)
+        low, high = 0, self.count - 1
+        while low <= high:
+            mid = (low + high) // 2
+            value = struct.unpack_from(HASH, self.data, HEADER_SIZE + mid * HASH_SIZE)[0]
+            if value == target:
+                return True
+            if value < target:
+                low = mid + 1
+            else:
+                high = mid - 1
+        return False
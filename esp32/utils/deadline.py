@@ -0,0 +1,33 @@
+import time
+
+class Deadline:
+    """One-shot countdown measured against time.ticks_ms (wraparound-safe).
+
+    Unlike a loop-tick counter, expiry does not depend on how long each loop
+    iteration takes - a 5 second deadline expires 5000 ms after start().
+    """
+
+    def __init__(self):
+        self.due = None
+
+    def start(self, duration_ms):
+        self.due = time.ticks_add(time.ticks_ms(), int(duration_ms))
+
+    def cancel(self):
+        self.due = None
+
+    def active(self):
+        return self.due is not None
+
+    def remaining_ms(self):
+        if self.due is None:
+            return 0
+        remaining = time.ticks_diff(self.due, time.ticks_ms())
+        return remaining if remaining > 0 else 0
+
+    def expired(self):
+        """True once the deadline has passed. Clears itself so it fires only once."""
+        if self.due is None or time.ticks_diff(time.ticks_ms(), self.due) < 0:
+            return False
+        self.due = None
+        return True
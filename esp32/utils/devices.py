@@ -0,0 +1,141 @@
+import gc
+
+class DeviceRegistry:
+    """Owns every hardware driver instance so handlers stop re-creating them.
+
+    Drivers are built on first get() (or up front with preload()). Drivers used
+    all the time are kept for the life of the app and handlers hold on to them;
+    rarely used ones (DHT11, steam sensor, LED) are borrowed per use and handed
+    back with release(), so their memory is free between uses. The heap cost of
+    each driver is measured when it is built, excluding any shared driver its
+    factory pulls in (e.g. the I2C bus), which is counted once under its own name.
+    """
+
+    def __init__(self):
+        self.factories = {}
+        self.devices = {}
+        self.sizes = {}
+        self.nested = 0     # Bytes taken by drivers built inside the factory currently running
+
+    def register(self, name, factory):
+        """Register a factory that builds the named driver. It receives the registry
+        so it can borrow shared resources such as the I2C bus."""
+        self.factories[name] = factory
+
+    def get(self, name):
+        device = self.devices.get(name)
+        if device is None:
+            # Collect before and after so the difference is only what the driver keeps
+            gc.collect()
+            before = gc.mem_alloc()
+            outer = self.nested
+            self.nested = 0
+            device = self.factories[name](self)
+            gc.collect()
+            size = gc.mem_alloc() - before
+            self.sizes[name] = size - self.nested
+            self.nested = outer + size
+            self.devices[name] = device
+        return device
+
+    def preload(self, *names):
+        """Build drivers now - needed for IRQ inputs so edges queue from startup."""
+        for name in names:
+            self.get(name)
+
+    def release(self, name):
+        """Drop a borrowed driver and collect its memory. The next get() rebuilds it.
+
+        The caller must not keep its own reference, or nothing is freed.
+        """
+        if self.devices.pop(name, None) is None:
+            return False
+        self.sizes.pop(name, None)
+        gc.collect()
+        return True
+
+    def is_loaded(self, name):
+        return name in self.devices
+
+    def report(self):
+        """Print and return the bytes held by each loaded driver."""
+        total = 0
+        for name in self.devices:
+            size = self.sizes.get(name, 0)
+            total += size
+            print(f"[DeviceRegistry] {name}: {size} bytes")
+        print(f"[DeviceRegistry] Total: {total} bytes in {len(self.devices)} drivers")
+        return self.sizes
+
+def _pir(devices):
+    from sensors.pir import PIRSensor
+    return PIRSensor()
+
+def _gas(devices):
+    from sensors.gas import GasSensor
+    return GasSensor()
+
+def _steam(devices):
+    from sensors.steam import SteamSensor
+    return SteamSensor()
+
+def _dht11(devices):
+    from sensors.dht11 import DHT11Sensor
+    return DHT11Sensor()
+
+def _i2c(devices):
+    from machine import I2C, SoftI2C, Pin
+    import config
+    freq = getattr(config, 'I2C_FREQ', 100000)
+    if getattr(config, 'I2C_BUS', 'soft') == 'hw':
+        return I2C(0, scl=Pin(22), sda=Pin(21), freq=freq)
+    return SoftI2C(scl=Pin(22), sda=Pin(21), freq=freq)
+
+def _rfid(devices):
+    from sensors.rfid import RFIDSensor
+    import config
+    budget_ms = getattr(config, 'RFID_SCAN_BUDGET_MS', 150)
+    max_backoff_ms = getattr(config, 'RFID_MAX_BACKOFF_MS', 10000)
+    if getattr(config, 'RFID_TRANSPORT', 'i2c') == 'soft_iic':
+        return RFIDSensor(None, budget_ms, max_backoff_ms)
+    return RFIDSensor(devices.get('i2c'), budget_ms, max_backoff_ms)
+
+def _led(devices):
+    from outputs.led import LED
+    return LED()
+
+def _oled(devices):
+    from outputs.oled import OLED
+    return OLED(devices.get('i2c'))
+
+def _button_gas(devices):
+    from outputs.button import Button, BUTTON_GAS_ALARM_PIN
+    return Button(BUTTON_GAS_ALARM_PIN)
+
+def _button_pir(devices):
+    from outputs.button import Button, BUTTON_PIR_TOGGLE_PIN
+    return Button(BUTTON_PIR_TOGGLE_PIN)
+
+def _time_sync(devices):
+    from utils.time_sync import get_clock
+    return get_clock()
+
+def _codec(devices):
+    from comms.codec import TelemetryCodec
+    return TelemetryCodec(devices.get('time_sync'))
+
+def register_defaults(registry):
+    """Register the factories for every driver on the board."""
+    registry.register('i2c', _i2c)
+    registry.register('pir', _pir)
+    registry.register('gas', _gas)
+    registry.register('steam', _steam)
+    registry.register('dht11', _dht11)
+    registry.register('rfid', _rfid)
+    registry.register('led', _led)
+    registry.register('oled', _oled)
+    registry.register('button_gas', _button_gas)
+    registry.register('button_pir', _button_pir)
+    registry.register('time_sync', _time_sync)
+    registry.register('codec', _codec)
+    return registry
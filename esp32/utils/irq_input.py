@@ -0,0 +1,116 @@
+from machine import Pin
+from array import array
+import micropython
+import time
+
+class IRQInput:
+    """Digital input that queues debounced edges from Pin.irq.
+
+    The IRQ handler only writes into preallocated buffers and records the
+    level and ticks_ms of each accepted edge. Consumers drain edges with pop()
+    instead of sampling the pin level every loop, which means short pulses are
+    not missed between polls. An optional on_edge callback is deferred to the
+    main thread with micropython.schedule.
+
+    Edges inside the debounce window are ignored, so a chattering input can
+    settle at a level no queued edge reports. Inputs triggered on both edges
+    should call resync() periodically to queue that final level.
+
+    Concurrency: the handler is registered as a soft IRQ, so it runs on the
+    main thread between bytecodes, never in the middle of one. The queue is
+    safe with the handler as the only writer of head and pop() the only writer
+    of tail. resync() is a second writer and a handler run can slip in between
+    its pin read and its push, so a level may occasionally be queued twice -
+    consumers must treat a repeated level as no transition.
+    """
+
+    def __init__(self, pin, pull=None, trigger=Pin.IRQ_FALLING, debounce_ms=50, size=8, on_edge=None):
+        if pull is None:
+            self.pin = Pin(pin, Pin.IN)
+        else:
+            self.pin = Pin(pin, Pin.IN, pull)
+        self.debounce_ms = debounce_ms
+        self.size = size
+        self.levels = bytearray(size)
+        self.times = array('i', [0] * size)    # ticks_ms of each queued edge
+        self.popped_ms = 0             # ticks_ms of the edge last returned by pop()
+        self.head = 0                  # Next slot the IRQ writes
+        self.tail = 0                  # Next slot pop() reads
+        self.last_edge = time.ticks_add(time.ticks_ms(), -debounce_ms)
+        self.last_level = self.pin.value()  # Level of the newest queued edge
+        self.resynced = 0
+        self.dropped = 0
+        self.on_edge = on_edge
+        self._dispatch_ref = self._dispatch  # Bound once - creating it inside the IRQ would allocate
+        self.pin.irq(handler=self._irq, trigger=trigger)
+
+    def _irq(self, pin):
+        now = time.ticks_ms()
+        if time.ticks_diff(now, self.last_edge) < self.debounce_ms:
+            return
+        if not self._push(pin.value(), now):
+            return
+        if self.on_edge is not None:
+            try:
+                micropython.schedule(self._dispatch_ref, 0)
+            except RuntimeError:
+                pass                   # Schedule queue full - edge is still queued for pop()
+
+    def _push(self, level, now):
+        self.last_edge = now
+        next_head = (self.head + 1) % self.size
+        if next_head == self.tail:
+            self.dropped += 1          # Queue full - keep the oldest edges
+            return False
+        self.levels[self.head] = level
+        self.times[self.head] = now
+        self.last_level = level
+        self.head = next_head
+        return True
+
+    def resync(self):
+        """Queue a synthetic edge if the pin settled at a level no edge reported.
+
+        Only acts once the debounce window since the last edge has closed.
+        Returns True if an edge was queued.
+        """
+        now = time.ticks_ms()
+        if time.ticks_diff(now, self.last_edge) < self.debounce_ms:
+            return False
+        level = self.pin.value()
+        if level == self.last_level:
+            return False
+        queued = self._push(level, now)
+        if queued:
+            self.resynced += 1
+        return queued
+
+    def _dispatch(self, _):
+        self.on_edge(self)
+
+    def pending(self):
+        return (self.head - self.tail) % self.size
+
+    def pop(self):
+        """Return the pin level captured at the oldest queued edge, or -1 if none.
+
+        The edge's ticks_ms is left in popped_ms.
+        """
+        if self.head == self.tail:
+            return -1
+        level = self.levels[self.tail]
+        self.popped_ms = self.times[self.tail]
+        self.tail = (self.tail + 1) % self.size
+        return level
+
+    def clear(self):
+        """Discard queued edges. Returns how many were discarded."""
+        count = self.pending()
+        self.tail = self.head
+        return count
+
+    def value(self):
+        return self.pin.value()
+
+    def disable(self):
+        self.pin.irq(handler=None)
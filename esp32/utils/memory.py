@@ -1,16 +1,148 @@
 import gc
+import time
 
-class Memory:
-    def __init__(self):
-        pass
+class GCPolicy:
+    """Decides when a full gc.collect() is actually worth its cost.
 
-    def collect(self, reason=""):
+    gc.threshold() makes the VM collect on its own after a fixed number of bytes
+    is allocated. On top of that, explicit collect requests only run when free heap
+    is below the low watermark, and idle() collects early when free heap is below
+    the high watermark and the event loop has slack - but only once at least
+    IDLE_MIN_GARBAGE bytes have been allocated since the last collect, since a
+    collect can reclaim no more than that. Every skipped request is counted
+    and priced at the average measured collect time.
+    """
+
+    IDLE_MIN_GARBAGE = 1024
+
+    def __init__(self, low_water=16384, high_water=32768, threshold=8192, log=False):
+        self.low_water = low_water
+        self.high_water = high_water
+        self.threshold = threshold
+        self.log = log
+        gc.threshold(threshold)
+        self.collections = 0
+        self.skipped = 0
+        self.collect_us = 0          # Total time spent collecting
+        self.last_alloc = gc.mem_alloc()
+        self.collected_alloc = self.last_alloc  # Heap in use right after the last collect
+        self.last_tick = time.ticks_ms()
+        self.alloc_rate = 0          # Bytes/second, exponentially smoothed
+        self.idle_expected = None
+
+    def _collect(self, reason):
+        start = time.ticks_us()
         gc.collect()
+        self.collect_us += time.ticks_diff(time.ticks_us(), start)
+        self.collections += 1
+        free = gc.mem_free()
+        if self.log:
+            print(f"[MEMORY] GC after {reason}: {free} bytes free.")
+        self.last_alloc = gc.mem_alloc()
+        self.collected_alloc = self.last_alloc
+        return free
+
+    def avg_collect_us(self):
+        if self.collections == 0:
+            return 0
+        return self.collect_us // self.collections
+
+    def request(self, reason=""):
+        """Collect only if free heap has dropped below the low watermark."""
+        free = gc.mem_free()
+        if free < self.low_water:
+            return self._collect(reason)
+        self.skipped += 1
+        return free
+
+    def force(self, reason=""):
+        return self._collect(reason)
+
+    def idle(self, period_ms):
+        """Call from a periodic job. Collects early when the loop has slack.
+
+        The job running within 10 ms of its expected time means no other task
+        hogged the loop, so a collect now will not delay anything that is due.
+        """
+        now = time.ticks_ms()
+        elapsed = time.ticks_diff(now, self.last_tick)
+        if elapsed > 0:
+            allocated = gc.mem_alloc() - self.last_alloc
+            if allocated > 0:
+                rate = allocated * 1000 // elapsed
+                self.alloc_rate = (self.alloc_rate * 3 + rate) // 4
+        self.last_tick = now
+        self.last_alloc = gc.mem_alloc()
+
+        on_time = self.idle_expected is None or time.ticks_diff(now, self.idle_expected) < 10
+        self.idle_expected = time.ticks_add(now, period_ms)
+
         free = gc.mem_free()
-        print(f"[MEMORY] GC after {reason}: {free} bytes free.")
+        if self.last_alloc < self.collected_alloc:
+            self.collected_alloc = self.last_alloc  # The VM collected on its own (gc.threshold)
+        if self.last_alloc - self.collected_alloc < self.IDLE_MIN_GARBAGE:
+            return free     # Too little allocated since the last collect to be worth one
+        # Collect before the next period would push free heap under the low watermark
+        projected = free - self.alloc_rate * period_ms // 1000
+        if free < self.low_water or (on_time and (free < self.high_water or projected < self.low_water)):
+            return self._collect("idle")
         return free
 
+    def largest_free_block(self, limit=None):
+        """Probe the largest allocatable block (binary search). Slow - report use only."""
+        low, high = 0, limit or gc.mem_free()
+        while high - low > 64:
+            mid = (low + high) // 2
+            try:
+                block = bytearray(mid)
+                del block
+                low = mid
+            except MemoryError:
+                high = mid
+        return low
+
+    def report(self):
+        free = gc.mem_free()
+        largest = self.largest_free_block()
+        fragmentation = 100 - (largest * 100 // free) if free else 0
+        saved_ms = self.skipped * self.avg_collect_us() // 1000
+        print(f"[MEMORY] {free} bytes free, largest block {largest} ({fragmentation}% fragmented)")
+        print(f"[MEMORY] {self.collections} collects ({self.avg_collect_us()} us avg), "
+              f"{self.skipped} skipped (~{saved_ms} ms saved), alloc rate {self.alloc_rate} B/s")
+        return {
+            "free": free,
+            "largest_block": largest,
+            "fragmentation": fragmentation,
+            "collections": self.collections,
+            "skipped": self.skipped,
+            "saved_ms": saved_ms,
+            "alloc_rate": self.alloc_rate,
+        }
+
+_policy = None
+
+def get_policy():
+    """Process-wide GC policy. Watermarks can be overridden in config.py."""
+    global _policy
+    if _policy is None:
+        import config
+        _policy = GCPolicy(
+            low_water=getattr(config, 'GC_LOW_WATER', 16384),
+            high_water=getattr(config, 'GC_HIGH_WATER', 32768),
+            threshold=getattr(config, 'GC_THRESHOLD', 8192),
+            log=getattr(config, 'GC_LOG', False),
+        )
+    return _policy
+
+class Memory:
+    def __init__(self):
+        self.policy = get_policy()
+
+    def collect(self, reason=""):
+        """Ask for a collection. Runs only if the GC policy says the heap needs it."""
+        return self.policy.request(reason)
+
     def mem_free(self):
         free = gc.mem_free()
         print(f"[MEMORY] Free memory: {free} bytes.")
-        return free
\ No newline at end of file
+        return free
@@ -0,0 +1,72 @@
+import uasyncio as asyncio
+import time
+
+class Scheduler:
+    """Runs each registered job as its own uasyncio task with its own period.
+
+    Jobs are paced against absolute ticks_ms deadlines, so a slow run (DHT read,
+    TLS publish) shortens the following sleep instead of pushing every later run back.
+    """
+
+    def __init__(self):
+        self.jobs = []
+        self.services = []
+
+    def every(self, name, period_ms, func, delay_ms=0):
+        """Register func to run every period_ms.
+
+        Args:
+            name: Job name used in error logs
+            period_ms: Milliseconds between runs
+            func: Callable taking no arguments. May be an async function, in
+                which case the returned coroutine is awaited before sleeping.
+            delay_ms: Optional delay before the first run (spreads startup load)
+        """
+        self.jobs.append((name, period_ms, func, delay_ms))
+
+    def service(self, name, func):
+        """Register a long-running async function (e.g. TimerService.run) to start with the jobs."""
+        self.services.append((name, func))
+
+    async def _run_service(self, name, func):
+        while True:
+            try:
+                await func()
+            except Exception as e:
+                print(f"[Scheduler] Service '{name}' failed: {e} - restarting")
+                await asyncio.sleep_ms(1000)
+
+    async def _run_job(self, name, period_ms, func, delay_ms):
+        due = time.ticks_add(time.ticks_ms(), delay_ms)
+        while True:
+            wait = time.ticks_diff(due, time.ticks_ms())
+            if wait > 0:
+                await asyncio.sleep_ms(wait)
+            else:
+                await asyncio.sleep_ms(0)  # Yield even when running late
+            try:
+                result = func()
+                if result is not None and hasattr(result, 'send'):
+                    await result
+            except Exception as e:
+                print(f"[Scheduler] Job '{name}' failed: {e}")
+
+            due = time.ticks_add(due, period_ms)
+            # Overran by more than a full period - skip the missed runs rather than bursting
+            if time.ticks_diff(time.ticks_ms(), due) > period_ms:
+                due = time.ticks_add(time.ticks_ms(), period_ms)
+
+    async def _main(self):
+        for name, period_ms, func, delay_ms in self.jobs:
+            asyncio.create_task(self._run_job(name, period_ms, func, delay_ms))
+        for name, func in self.services:
+            asyncio.create_task(self._run_service(name, func))
+        while True:
+            await asyncio.sleep_ms(60000)
+
+    def run(self):
+        """Start every registered job and block forever."""
+        try:
+            asyncio.run(self._main())
+        finally:
+            asyncio.new_event_loop()
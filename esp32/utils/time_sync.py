@@ -1,35 +1,245 @@
 from config import TIMEZONE_OFFSET_HOURS, NIGHT_START_HOUR, NIGHT_END_HOUR
+from utils.deadline import Deadline
 import ntptime
 import time
+
+ZERO = 0x30
+NTP_DELTA = 3155673600      # Seconds from 1900-01-01 (NTP epoch) to 2000-01-01
+SLEW_PPM = 500              # Fastest correction rate - 0.5 ms per second, never steps backwards
+STEP_THRESHOLD_MS = 2000    # Further off than this, a step is better than hours of slewing
+MIN_INTERVAL_S = 900
+MAX_INTERVAL_S = 86400
+
+def _digits(buf, at, value, width):
+    for i in range(width - 1, -1, -1):
+        buf[at + i] = ZERO + value % 10
+        value //= 10
+
 class TimeSync:
+    """Wall clock for the whole app - use get_clock() rather than constructing one.
+
+    get_iso_timestamp() is called on every publish, so the formatted timestamp is
+    cached: the date part is only recomputed when the day changes, the time digits
+    only when the second changes, and the string only once per second. iso_bytes()
+    returns the same timestamp as a preallocated buffer with no allocation at all.
+
+    After the boot sync the RTC is never stepped. resync_job() measures the RTC
+    offset against NTP without blocking, estimates the RTC drift rate from
+    successive offsets, and now() applies a software correction that follows the
+    predicted offset at no more than SLEW_PPM. The resync interval doubles while
+    predictions hold and halves when they miss.
+    """
+
     def __init__(self):
         self.timezone_offset = TIMEZONE_OFFSET_HOURS * 3600
         self.night_start = NIGHT_START_HOUR
         self.night_end = NIGHT_END_HOUR
         self.last_sync = None
+        self.iso_buf = bytearray(b'2000-01-01T00:00:00Z')
+        self.iso_view = memoryview(self.iso_buf)
+        self.iso_second = None      # Second the buffer currently holds
+        self.iso_day = None         # Day the date part currently holds
+        self.iso_str = None         # String form of iso_buf, made on first request each second
+        self.correction_us = 0      # Slewed correction currently added to the RTC
+        self.slew_tick = time.ticks_ms()
+        self.drift_ppm = 0          # Measured RTC rate error - positive means the RTC runs slow
+        self.ref_rtc_ms = None      # RTC reading at the last measurement
+        self.ref_offset_us = 0      # NTP minus RTC at the last measurement
+        self.interval_s = 3600
+        self.next_sync = Deadline()
+        self.syncing = False
+        self.server_addr = None     # Resolved once - getaddrinfo blocks
+        self.syncs = 0
+        self.failures = 0
+        self.last_rtt_ms = 0
+        self.last_error_ms = 0      # How far the prediction was off at the last sync
 
     def sync_time(self):
         try:
             ntptime.settime()
+            # RTC was stepped - start drift tracking from scratch against the new setting
+            self.correction_us = 0
+            self.ref_offset_us = 0
+            self.ref_rtc_ms = self._rtc_ms()
             self.last_sync = time.time()
+            self.next_sync.start(self.interval_s * 1000)
             return True  # Success
         except Exception as e:
             print(f"Error synchronizing time: {e}")
             return False
-    
+
+    def _rtc_ms(self):
+        return time.time_ns() // 1000000
+
+    def _target_us(self, rtc_ms):
+        """Offset the clock should have at rtc_ms - last measurement plus predicted drift."""
+        if self.ref_rtc_ms is None:
+            return 0
+        return self.ref_offset_us + self.drift_ppm * (rtc_ms - self.ref_rtc_ms) // 1000
+
+    def _slew(self, rtc_ms):
+        elapsed = time.ticks_diff(time.ticks_ms(), self.slew_tick)
+        if elapsed < 100:
+            return
+        self.slew_tick = time.ticks_add(self.slew_tick, elapsed)
+        step = elapsed * SLEW_PPM // 1000
+        diff = self._target_us(rtc_ms) - self.correction_us
+        if diff > step:
+            diff = step
+        elif diff < -step:
+            diff = -step
+        self.correction_us += diff
+
+    def now_ms(self):
+        """Corrected UTC milliseconds since the MicroPython epoch."""
+        rtc_ms = self._rtc_ms()
+        self._slew(rtc_ms)
+        return rtc_ms + self.correction_us // 1000
+
+    def now(self):
+        """Corrected UTC seconds since the MicroPython epoch (2000-01-01)."""
+        return self.now_ms() // 1000
+
+    def resync_job(self):
+        """Scheduler job. Returns a coroutine when a resync is due, else None."""
+        if self.syncing:
+            return None
+        # Not scheduled means the boot sync failed - try now
+        if self.next_sync.active() and not self.next_sync.expired():
+            return None
+        return self._resync()
+
+    async def _resync(self):
+        self.syncing = True
+        try:
+            offset_us, rtc_ms = await self._measure()
+            self._apply(offset_us, rtc_ms)
+            self.syncs += 1
+            self.last_sync = time.time()
+        except Exception as e:
+            self.failures += 1
+            print(f"[TimeSync] Resync failed: {e}")
+            self.next_sync.start(MIN_INTERVAL_S * 1000)
+        finally:
+            self.syncing = False
+
+    async def _measure(self):
+        """One SNTP exchange on a non-blocking socket. Returns (NTP - RTC offset in us, RTC ms)."""
+        import socket
+        import struct
+        import uasyncio as asyncio
+
+        if self.server_addr is None:
+            self.server_addr = socket.getaddrinfo(ntptime.host, 123)[0][-1]
+        query = bytearray(48)
+        query[0] = 0x1B     # LI=0, version 3, client mode
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.setblocking(False)
+            timeout = Deadline()
+            timeout.start(1000)
+            start = time.ticks_ms()
+            rtc_start = self._rtc_ms()
+            sock.sendto(query, self.server_addr)
+            while True:
+                try:
+                    msg = sock.recv(48)
+                    break
+                except OSError:
+                    if timeout.expired():
+                        raise OSError("NTP timeout")
+                    await asyncio.sleep_ms(20)
+            rtt = time.ticks_diff(time.ticks_ms(), start)
+        finally:
+            sock.close()
+        seconds, fraction = struct.unpack("!II", msg[40:48])
+        server_ms = (seconds - NTP_DELTA) * 1000 + (fraction * 1000 >> 32)
+        rtc_ms = rtc_start + rtt // 2   # Server stamped its reply about half way through
+        self.last_rtt_ms = rtt
+        return (server_ms - rtc_ms) * 1000, rtc_ms
+
+    def _apply(self, offset_us, rtc_ms):
+        predicted = self._target_us(rtc_ms)
+        error_ms = abs(offset_us - predicted) // 1000
+        self.last_error_ms = error_ms
+
+        if error_ms > STEP_THRESHOLD_MS or self.ref_rtc_ms is None:
+            print(f"[TimeSync] Stepping clock by {(offset_us - self.correction_us) // 1000} ms")
+            self.correction_us = offset_us
+        elif rtc_ms - self.ref_rtc_ms > 60000:
+            # offset change (us) per elapsed ms, x1000 = parts per million
+            measured = (offset_us - self.ref_offset_us) * 1000 // (rtc_ms - self.ref_rtc_ms)
+            self.drift_ppm = measured if self.syncs == 0 else (self.drift_ppm * 3 + measured) // 4
+
+        # Space syncs by how well the drift model predicted this offset
+        if error_ms < 100:
+            self.interval_s = min(self.interval_s * 2, MAX_INTERVAL_S)
+        elif error_ms > 500:
+            self.interval_s = max(self.interval_s // 2, MIN_INTERVAL_S)
+        self.ref_offset_us = offset_us
+        self.ref_rtc_ms = rtc_ms
+        self.next_sync.start(self.interval_s * 1000)
+        print(f"[TimeSync] Offset {offset_us // 1000} ms, drift {self.drift_ppm} ppm, "
+              f"error {error_ms} ms, next sync in {self.interval_s} s")
+
+    def stats(self):
+        return {
+            "offset_ms": self.correction_us // 1000,
+            "target_ms": self._target_us(self._rtc_ms()) // 1000,
+            "drift_ppm": self.drift_ppm,
+            "interval_s": self.interval_s,
+            "syncs": self.syncs,
+            "failures": self.failures,
+            "last_rtt_ms": self.last_rtt_ms,
+            "last_error_ms": self.last_error_ms,
+        }
+
     def get_local_time(self):
-        utc_seconds = time.time()
+        utc_seconds = self.now()
         local_seconds = utc_seconds + self.timezone_offset
         return time.localtime(local_seconds)
-    
+
     def is_nighttime(self):
         local_time = self.get_local_time()
         hour = local_time[3]
         return hour >= self.night_start or hour < self.night_end
-    
+
+    def _refresh_iso(self):
+        now = self.now()
+        if now == self.iso_second:
+            return False
+        buf = self.iso_buf
+        day = now // 86400
+        if day != self.iso_day:
+            utc_time = time.localtime(now)  # UTC time, no offset
+            _digits(buf, 0, utc_time[0], 4)
+            _digits(buf, 5, utc_time[1], 2)
+            _digits(buf, 8, utc_time[2], 2)
+            self.iso_day = day
+        seconds = now % 86400
+        _digits(buf, 11, seconds // 3600, 2)
+        _digits(buf, 14, seconds // 60 % 60, 2)
+        _digits(buf, 17, seconds % 60, 2)
+        self.iso_second = now
+        self.iso_str = None
+        return True
+
+    def iso_bytes(self):
+        """Current UTC timestamp as a 20-byte memoryview (YYYY-MM-DDTHH:MM:SSZ). Overwritten every second."""
+        self._refresh_iso()
+        return self.iso_view
+
     def get_iso_timestamp(self):
-        utc_time = time.localtime(time.time())  # UTC time, no offset
-        return "{:04d}-{:02d}-{:02d}T{:02d}:{:02d}:{:02d}Z".format(
-            utc_time[0], utc_time[1], utc_time[2],
-            utc_time[3], utc_time[4], utc_time[5]
-        )
\ No newline at end of file
+        self._refresh_iso()
+        if self.iso_str is None:
+            self.iso_str = bytes(self.iso_buf).decode()
+        return self.iso_str
+
+_clock = None
+
+def get_clock():
+    """Process-wide TimeSync, so the timestamp cache is shared by every caller."""
+    global _clock
+    if _clock is None:
+        _clock = TimeSync()
+    return _clock
@@ -0,0 +1,144 @@
+import time
+from utils.deadline import Deadline
+
+MAX_SLEEP_MS = 1000     # Longest the service sleeps with nothing due
+
+class Timer(Deadline):
+    """Deadline that the TimerService fires by calling callback when it expires.
+
+    start(), cancel(), active() and remaining_ms() behave as on Deadline. The
+    service is the only thing that handles expiry - owners do not poll
+    expired(). With period_ms the timer re-arms itself after each run, chained
+    from its previous due time so it does not drift.
+    """
+
+    def __init__(self, callback, period_ms=None, name=None, service=None):
+        super().__init__()
+        self.callback = callback
+        self.period_ms = period_ms
+        self.name = name or getattr(callback, '__name__', 'timer')
+        self.service = service
+
+    def start(self, duration_ms=None):
+        """Arm for duration_ms (default: one period). Restarting re-arms from now."""
+        super().start(self.period_ms if duration_ms is None else duration_ms)
+        (self.service or get_timers())._add(self)
+
+    def fire(self, now):
+        """Run the callback if due. Returns how late it ran in ms, or None if not due."""
+        due = self.due
+        if due is None or time.ticks_diff(now, due) < 0:
+            return None
+        late = time.ticks_diff(now, due)
+        if self.period_ms is None:
+            self.due = None
+        else:
+            self.due = time.ticks_add(due, self.period_ms)
+            # Fell more than a period behind - skip the missed runs rather than bursting
+            if time.ticks_diff(now, self.due) > self.period_ms:
+                self.due = time.ticks_add(now, self.period_ms)
+        self.callback()
+        return late
+
+class TimerService:
+    """One task that runs every active Timer at its due time.
+
+    run() sleeps until the earliest due timer (next_due_ms()) rather than
+    polling, and wakes early when a timer is started that is due sooner, so a
+    5 s timer fires 5000 ms after start() give or take scheduling latency.
+    """
+
+    def __init__(self):
+        self.timers = []
+        self.wake = None        # uasyncio.Event, created by run()
+        self.fired = 0
+        self.failures = 0
+        self.max_late_ms = 0
+
+    def after(self, delay_ms, callback, name=None):
+        """One-shot timer, already started."""
+        timer = Timer(callback, name=name, service=self)
+        timer.start(delay_ms)
+        return timer
+
+    def every(self, period_ms, callback, name=None, delay_ms=None):
+        """Periodic timer, already started. First run after delay_ms (default one period)."""
+        timer = Timer(callback, period_ms, name, self)
+        timer.start(delay_ms)
+        return timer
+
+    def _add(self, timer):
+        if timer not in self.timers:
+            self.timers.append(timer)
+        if self.wake is not None:
+            self.wake.set()
+
+    def next_due_ms(self):
+        """Milliseconds until the earliest active timer is due (0 if overdue), or None if none are."""
+        now = time.ticks_ms()
+        soonest = None
+        for timer in self.timers:
+            if timer.due is None:
+                continue
+            wait = time.ticks_diff(timer.due, now)
+            if soonest is None or wait < soonest:
+                soonest = wait
+        if soonest is None:
+            return None
+        return soonest if soonest > 0 else 0
+
+    def run_due(self):
+        """Fire every timer that is due and forget finished ones. Returns how many fired."""
+        now = time.ticks_ms()
+        count = 0
+        # Copy - a callback may start or cancel timers
+        for timer in list(self.timers):
+            try:
+                late = timer.fire(now)
+            except Exception as e:
+                self.failures += 1
+                print(f"[TimerService] Timer '{timer.name}' failed: {e}")
+                continue
+            if late is not None:
+                count += 1
+                if late > self.max_late_ms:
+                    self.max_late_ms = late
+        self.fired += count
+        self.timers = [timer for timer in self.timers if timer.due is not None]
+        return count
+
+    async def run(self):
+        """Long-running task - register with Scheduler.service()."""
+        import uasyncio as asyncio
+        self.wake = asyncio.Event()
+        while True:
+            self.run_due()
+            wait = self.next_due_ms()
+            if wait is None or wait > MAX_SLEEP_MS:
+                wait = MAX_SLEEP_MS
+            if wait == 0:
+                await asyncio.sleep_ms(0)
+                continue
+            self.wake.clear()
+            try:
+                await asyncio.wait_for_ms(self.wake.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self):
+        return {
+            "active": len(self.timers),
+            "next_due_ms": self.next_due_ms(),
+            "fired": self.fired,
+            "failures": self.failures,
+            "max_late_ms": self.max_late_ms,
+        }
+
+_timers = None
+
+def get_timers():
+    """Process-wide TimerService, shared by every output manager."""
+    global _timers
+    if _timers is None:
+        _timers = TimerService()
+    return _timers
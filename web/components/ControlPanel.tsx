@@ -38,7 +38,11 @@ export const ControlPanel = () => {
             device="fan"
             deviceState={fanStatus?.state || null}
             icon={<Wind size={25} />}
-            label="Fan"
+            label={
+              fanStatus?.state === "on" && fanStatus.duty
+                ? `Fan ${fanStatus.duty}%`
+                : "Fan"
+            }
             onPublish={publishMessage}
           />
         </div>
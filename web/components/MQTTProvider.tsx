@@ -19,6 +19,7 @@ export type RfidCheck = {
 
 export type DeviceStatus = {
   state: "open" | "closed" | "on" | "off";
+  duty?: number | null; // Fan only - actual duty in %
   timestamp: string;
 };
 